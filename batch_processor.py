@@ -0,0 +1,627 @@
+import os
+import glob
+import time
+import queue
+import signal
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+
+from .ocr_engine import OCREngine
+from .image_processor import ImageProcessor
+from .pdf_handler import PDFHandler
+from .preprocess_cache import PreprocessCache
+from .export_manager import ExportManager
+from .metrics import metrics
+from .scheduler import MemoryEstimator, MemoryScheduler, PeakTracker
+
+# Ekstensi file yang diproses dalam batch
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+PDF_EXTENSIONS = ('.pdf',)
+
+# Ekstensi file output per format ekspor
+EXPORT_FORMATS = {
+    'text': '.txt',
+    'excel': '.xlsx',
+    'pdf': '.pdf',
+    'jsonl': '.jsonl',
+    'hocr': '.hocr',
+    'alto': '.alto.xml',
+}
+
+# Komponen OCR per proses worker, dibuat sekali oleh _init_worker
+_worker_state = {}
+
+
+def collect_files(sources, recursive=True):
+    """
+    Mengumpulkan file gambar dan PDF dari daftar file, folder, atau pola glob
+    
+    Args:
+        sources (iterable): Path file, folder, atau pola glob
+        recursive (bool): Telusuri subfolder (default: True)
+        
+    Returns:
+        list: Path file yang didukung, terurut dan tanpa duplikat
+    """
+    extensions = IMAGE_EXTENSIONS + PDF_EXTENSIONS
+    found = []
+    
+    for source in sources:
+        if os.path.isdir(source):
+            if recursive:
+                for root, dirs, names in os.walk(source):
+                    dirs.sort()
+                    found.extend(os.path.join(root, name) for name in sorted(names))
+            else:
+                found.extend(os.path.join(source, name) for name in sorted(os.listdir(source)))
+        elif os.path.isfile(source):
+            found.append(source)
+        else:
+            found.extend(sorted(glob.glob(source, recursive=recursive)))
+    
+    files = []
+    seen = set()
+    for path in found:
+        key = os.path.abspath(path)
+        if key not in seen and os.path.isfile(path) and path.lower().endswith(extensions):
+            seen.add(key)
+            files.append(path)
+    
+    return files
+
+
+def _init_worker(tesseract_cmd=None, progress_queue=None, ignore_sigint=False, cache_dir=None):
+    """
+    Membuat komponen OCR sekali per proses worker
+    """
+    if ignore_sigint:
+        # Ctrl+C ditangani proses utama (batalkan dengan rapi), bukan oleh worker
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    # Worker hasil fork mewarisi metrik proses utama; kosongkan agar tidak terhitung dua kali
+    metrics.reset()
+    
+    ocr_engine = OCREngine(tesseract_cmd)
+    image_processor = ImageProcessor()
+    _worker_state['ocr_engine'] = ocr_engine
+    _worker_state['image_processor'] = image_processor
+    _worker_state['pdf_handler'] = PDFHandler(ocr_engine, image_processor)
+    _worker_state['progress'] = progress_queue
+    # Setiap file batch biasanya hanya diproses sekali, jadi cache hanya disimpan di disk
+    _worker_state['preprocess_cache'] = (PreprocessCache(image_processor, max_bytes=0, cache_dir=cache_dir)
+                                         if cache_dir else None)
+
+
+def _iter_file_pages(path, steps, dpi, skip_blank):
+    """
+    Mengiterasi halaman file satu per satu tanpa memuat semuanya ke memori
+    
+    skip_blank berlaku untuk semua jenis file: halaman PDF diperiksa lewat
+    is_blank_page sebelum dirender, gambar dan frame TIFF lewat is_blank.
+    Gambar satu halaman memakai PreprocessCache di disk jika diaktifkan.
+    
+    Yields:
+        tuple: (nomor halaman, jumlah halaman, gambar hasil pipeline atau None untuk halaman kosong)
+    """
+    image_processor = _worker_state['image_processor']
+    
+    def prepare(image):
+        if skip_blank and image_processor.is_blank(image):
+            return None
+        return image_processor.apply_pipeline(image, steps) if steps else image
+    
+    if path.lower().endswith(PDF_EXTENSIONS):
+        pdf_handler = _worker_state['pdf_handler']
+        with fitz.open(path) as pdf_document:
+            total = len(pdf_document)
+            for page_index in range(total):
+                page = pdf_document.load_page(page_index)
+                if skip_blank and pdf_handler.is_blank_page(page):
+                    yield page_index + 1, total, None
+                else:
+                    image = pdf_handler.render_page(page, dpi=dpi, grayscale=True)
+                    yield page_index + 1, total, image_processor.apply_pipeline(image, steps) if steps else image
+        return
+    
+    total = image_processor.count_frames(path)
+    cache = _worker_state.get('preprocess_cache')
+    if total > 1:
+        for page_index, image in enumerate(image_processor.iter_frames(path)):
+            yield page_index + 1, total, prepare(image)
+    elif steps and cache is not None:
+        # Seperti prepare(), halaman kosong dideteksi dari gambar sumber sebelum pipeline
+        source = cache.load_source(path, steps) if skip_blank else None
+        if source is not None and image_processor.is_blank(source):
+            yield 1, 1, None
+        else:
+            yield 1, 1, cache.run(path, steps, source=source)
+    else:
+        yield 1, 1, prepare(image_processor.load_for_pipeline(path, steps or []))
+
+
+def ocr_file(path, lang='eng', config='', steps=None, dpi=300, skip_blank=False, track_memory=False):
+    """
+    Menjalankan OCR pada satu file gambar atau PDF (dijalankan di proses worker)
+    
+    Setiap halaman hanya di-OCR sekali dengan image_to_data; teks disusun
+    dari data tersebut. Kemajuan per halaman dikirim ke antrean progress.
+    
+    Args:
+        path (str): Path ke file
+        lang (str): Kode bahasa untuk OCR (default: 'eng')
+        config (str): Konfigurasi tambahan untuk Tesseract
+        steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+        dpi (int): DPI render halaman PDF (default: 300)
+        skip_blank (bool): Lewati halaman kosong pada PDF maupun gambar (default: False)
+        track_memory (bool): Ukur puncak memori file untuk MemoryScheduler (default: False)
+        
+    Returns:
+        dict: path, status ('ok' atau 'error'), pages berisi tuple
+              (nomor_halaman, teks, DataFrame), seconds, error, metrics
+              (snapshot metrik worker jika instrumentasi aktif), dan memory
+              (hasil PeakTracker jika track_memory)
+    """
+    if not _worker_state:
+        _init_worker()
+    
+    ocr_engine = _worker_state['ocr_engine']
+    progress = _worker_state['progress']
+    
+    started = time.perf_counter()
+    tracker = PeakTracker().start() if track_memory else None
+    pages = []
+    try:
+        for page_num, total, image in _iter_file_pages(path, steps, dpi, skip_blank):
+            if image is None:
+                pages.append((page_num, '', None))
+            else:
+                data = ocr_engine.image_to_data(image, lang, config, words_only=False)
+                pages.append((page_num, ocr_engine.data_to_text(data), data))
+            metrics.count('pages')
+            
+            if progress is not None:
+                progress.put((path, page_num, total))
+        
+        status, error = 'ok', None
+    except Exception as e:
+        status, error = 'error', str(e)
+    
+    seconds = time.perf_counter() - started
+    metrics.observe('file', seconds, error=error is not None)
+    metrics.count('files', status=status)
+    
+    # Metrik dikirim bersama hasil karena registry worker terpisah dari proses utama
+    return {'path': path, 'status': status, 'pages': pages, 'seconds': seconds, 'error': error,
+            'metrics': metrics.snapshot(reset=True) if metrics.enabled else None,
+            'memory': tracker.result() if tracker is not None else None}
+
+
+class CrashTracker:
+    """
+    Mencari file penyebab worker mati ketika ProcessPoolExecutor rusak
+    
+    Saat satu worker mati, semua file yang sedang berjalan ikut gagal sehingga
+    penyebabnya tidak diketahui. File-file tersebut menjadi tersangka dan
+    dijalankan ulang satu per satu; hanya crash saat berjalan sendirian yang
+    dihitung untuk file tersebut.
+    """
+    
+    def __init__(self, max_crashes=2):
+        """
+        Inisialisasi Crash Tracker
+        
+        Args:
+            max_crashes (int): Jumlah crash saat berjalan sendirian sebelum file menyerah (default: 2)
+        """
+        self.max_crashes = max_crashes
+        self.suspects = set()
+        self.counts = {}
+    
+    def can_submit(self, key, running):
+        """
+        Mengecek apakah item boleh dikirim: tersangka hanya berjalan sendirian
+        
+        Args:
+            key: Item terdepan antrean
+            running (iterable): Item yang sedang berjalan
+        """
+        running = list(running)
+        if any(item in self.suspects for item in running):
+            return False
+        return key not in self.suspects or not running
+    
+    def crashed(self, keys):
+        """
+        Mencatat item yang sedang berjalan saat pool rusak
+        
+        Args:
+            keys (list): Item yang sedang berjalan
+            
+        Returns:
+            list: Item yang sudah mencapai max_crashes dan tidak perlu diulang
+        """
+        if len(keys) != 1:
+            self.suspects.update(keys)
+            return []
+        
+        # Hanya satu item yang berjalan: pasti item ini penyebabnya
+        key = keys[0]
+        self.suspects.add(key)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if self.counts[key] >= self.max_crashes:
+            self.suspects.discard(key)
+            del self.counts[key]
+            return [key]
+        return []
+    
+    def succeeded(self, key):
+        """
+        Menghapus item dari daftar tersangka setelah selesai tanpa mematikan worker
+        """
+        self.suspects.discard(key)
+        self.counts.pop(key, None)
+
+
+class BatchProcessor:
+    """
+    Kelas untuk menjalankan OCR banyak file dengan pool proses
+    """
+    
+    def __init__(self, output_dir=None, formats=('text',), workers=None, lang='eng', config='',
+                 steps=None, dpi=300, skip_blank=False, tesseract_cmd=None, export_manager=None,
+                 memory_budget=None, max_crashes=2, cache_dir=None):
+        """
+        Inisialisasi Batch Processor
+        
+        Args:
+            output_dir (str, optional): Folder untuk menyimpan hasil ekspor. Wajib jika formats tidak kosong.
+            formats (iterable): Format ekspor, kunci dari EXPORT_FORMATS (default: ('text',))
+            workers (int, optional): Jumlah proses worker. Default jumlah core CPU.
+            lang (str): Kode bahasa untuk OCR (default: 'eng')
+            config (str): Konfigurasi tambahan untuk Tesseract
+            steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+            dpi (int): DPI render halaman PDF (default: 300)
+            skip_blank (bool): Lewati halaman kosong pada PDF maupun gambar (default: False)
+            tesseract_cmd (str, optional): Path ke executable tesseract
+            export_manager (ExportManager, optional): Instance ExportManager
+            memory_budget (int, optional): Anggaran RSS total dalam byte. Jika diisi, file
+                                           dijalankan bersamaan sebanyak yang muat dalam
+                                           anggaran (paling banyak workers).
+            max_crashes (int): Berapa kali sebuah file boleh membuat worker mati saat
+                               berjalan sendirian sebelum dianggap gagal (default: 2)
+            cache_dir (str, optional): Folder PreprocessCache di disk untuk hasil pipeline
+                                       gambar, dipakai ulang antar worker dan antar eksekusi
+        """
+        unknown = set(formats) - set(EXPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Format ekspor tidak dikenal: {', '.join(sorted(unknown))}")
+        if formats and not output_dir:
+            raise ValueError("Folder output wajib diisi jika ada format ekspor")
+        
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.lang = lang
+        self.config = config
+        self.steps = steps
+        self.dpi = dpi
+        self.skip_blank = skip_blank
+        self.tesseract_cmd = tesseract_cmd
+        self.export_manager = export_manager or ExportManager()
+        self.max_crashes = max(1, max_crashes)
+        self.cache_dir = cache_dir
+        
+        self.scheduler = None
+        self.estimator = None
+        if memory_budget:
+            self.scheduler = MemoryScheduler(memory_budget, self.workers)
+            self.estimator = MemoryEstimator(steps, dpi)
+            self.workers = self.scheduler.max_workers
+        
+        # Event resume di-set berarti tidak sedang dijeda
+        self._resume = threading.Event()
+        self._resume.set()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._paused_at = None
+        self._paused_total = 0.0
+        self._root = None
+    
+    @property
+    def is_paused(self):
+        return not self._resume.is_set()
+    
+    def pause(self):
+        """
+        Menjeda batch: file baru tidak dikirim, file yang sedang berjalan tetap selesai
+        """
+        with self._lock:
+            if self._resume.is_set():
+                self._paused_at = time.monotonic()
+                self._resume.clear()
+    
+    def resume(self):
+        """
+        Melanjutkan batch yang dijeda
+        """
+        with self._lock:
+            if not self._resume.is_set():
+                self._paused_total += time.monotonic() - self._paused_at
+                self._paused_at = None
+                self._resume.set()
+    
+    def cancel(self):
+        """
+        Membatalkan batch: file yang belum dikirim dibatalkan, file yang sedang berjalan tetap diekspor
+        """
+        self._cancel.set()
+        self.resume()
+    
+    def _create_executor(self, progress_queue=None):
+        """
+        Membuat pool proses worker; dipanggil lagi jika pool rusak karena worker mati
+        """
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.tesseract_cmd, progress_queue, True, self.cache_dir))
+    
+    def _output_path(self, path, ext, root=None):
+        """
+        Menentukan path output dengan struktur subfolder yang sama seperti sumber
+        """
+        relative = os.path.relpath(os.path.abspath(path), root or self._root)
+        output_path = os.path.join(self.output_dir, os.path.splitext(relative)[0] + ext)
+        
+        # Jangan pernah menimpa file sumber (misalnya PDF ke PDF di folder yang sama)
+        if os.path.abspath(output_path) == os.path.abspath(path):
+            output_path = os.path.join(self.output_dir, os.path.splitext(relative)[0] + '_ocr' + ext)
+        
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        return output_path
+    
+    def _words(self, pages):
+        """
+        Mengambil baris kata saja dari data halaman untuk ekspor tabel
+        """
+        for page_num, _, data in pages:
+            if data is None:
+                continue
+            words = data[data['level'] == 5] if 'level' in data.columns else data
+            yield page_num, words[words['text'].notna()]
+    
+    def export(self, result, root=None):
+        """
+        Menulis hasil OCR satu file ke semua format yang dipilih
+        
+        Args:
+            result (dict): Hasil dari ocr_file
+            root (str, optional): Folder acuan struktur subfolder output.
+                                  Default folder induk bersama file batch.
+            
+        Returns:
+            list: Path file yang ditulis
+        """
+        path = result['path']
+        pages = result['pages']
+        text = '\f'.join(text for _, text, _ in pages)
+        image_name = os.path.basename(path)
+        
+        outputs = []
+        for fmt in self.formats:
+            output_path = self._output_path(path, EXPORT_FORMATS[fmt], root)
+            
+            if fmt == 'text':
+                self.export_manager.export_text(text, output_path)
+            elif fmt == 'excel':
+                self.export_manager.stream_excel(self._words(pages), output_path)
+            elif fmt == 'pdf':
+                self.export_manager.export_pdf(text, output_path, title=image_name)
+            elif fmt == 'jsonl':
+                self.export_manager.stream_jsonl(self._words(pages), output_path)
+            elif fmt == 'hocr':
+                self.export_manager.stream_hocr(
+                    ((page_num, data) for page_num, _, data in pages if data is not None),
+                    output_path, image_name)
+            elif fmt == 'alto':
+                self.export_manager.stream_alto(
+                    ((page_num, data) for page_num, _, data in pages if data is not None),
+                    output_path, image_name)
+            
+            outputs.append(output_path)
+        
+        return outputs
+    
+    def _elapsed(self, started):
+        """
+        Menghitung waktu aktif batch tanpa durasi jeda
+        """
+        with self._lock:
+            paused = self._paused_total
+            if self._paused_at is not None:
+                paused += time.monotonic() - self._paused_at
+        return max(0.0, time.monotonic() - started - paused)
+    
+    def run(self, files, on_file_progress=None, on_progress=None, on_file_done=None, on_result=None):
+        """
+        Menjalankan OCR semua file dan mengekspor setiap file segera setelah selesai
+        
+        Jumlah file yang berjalan bersamaan dibatasi sebanyak worker (dan anggaran
+        memori jika memory_budget diisi), sehingga jeda dan pembatalan langsung
+        berlaku untuk file berikutnya.
+        
+        Args:
+            files (iterable): Path file gambar atau PDF
+            on_file_progress (callable, optional): Dipanggil dengan (path, halaman_selesai, jumlah_halaman)
+            on_progress (callable, optional): Dipanggil dengan dict statistik keseluruhan
+            on_file_done (callable, optional): Dipanggil dengan dict ringkasan per file
+            on_result (callable, optional): Dipanggil dengan hasil lengkap per file (termasuk
+                                            pages dan outputs), misalnya untuk streaming
+            
+        Returns:
+            dict: Statistik akhir batch
+        """
+        files = list(files)
+        self._cancel.clear()
+        self._paused_total = 0.0
+        self._root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else '.'
+        
+        stats = {
+            'total': len(files), 'done': 0, 'failed': 0, 'cancelled': 0, 'pages': 0,
+            'elapsed': 0.0, 'files_per_sec': 0.0, 'pages_per_sec': 0.0, 'eta': None, 'paused': False,
+        }
+        scheduler = self.scheduler
+        estimates = {}
+        if scheduler is not None:
+            # Hanya header file yang dibaca, jauh lebih murah daripada OCR-nya
+            estimates = {path: self.estimator.estimate_file(path) for path in files}
+            stats['memory'] = scheduler.stats()
+        
+        started = time.monotonic()
+        pending = deque(files)
+        running = {}
+        
+        progress_queue = multiprocessing.Queue()
+        
+        def drain_progress():
+            while True:
+                try:
+                    path, page_num, total = progress_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if on_file_progress is not None:
+                    on_file_progress(path, page_num, total)
+        
+        def update_stats():
+            finished = stats['done'] + stats['failed']
+            stats['elapsed'] = self._elapsed(started)
+            stats['paused'] = self.is_paused
+            if stats['elapsed'] > 0:
+                stats['files_per_sec'] = finished / stats['elapsed']
+                stats['pages_per_sec'] = stats['pages'] / stats['elapsed']
+            remaining = stats['total'] - finished - stats['cancelled']
+            stats['eta'] = remaining / stats['files_per_sec'] if stats['files_per_sec'] > 0 else None
+            if scheduler is not None:
+                stats['memory'] = scheduler.stats()
+            if on_progress is not None:
+                on_progress(dict(stats))
+        
+        def finish(path, result):
+            metrics.merge(result.pop('metrics', None))
+            
+            outputs = []
+            if result['status'] == 'ok':
+                try:
+                    outputs = self.export(result)
+                except Exception as e:
+                    result['status'] = 'error'
+                    result['error'] = str(e)
+            
+            if result['status'] == 'ok':
+                stats['done'] += 1
+            else:
+                stats['failed'] += 1
+            stats['pages'] += len(result['pages'])
+            
+            if on_result is not None:
+                result['outputs'] = outputs
+                on_result(result)
+            
+            if on_file_done is not None:
+                on_file_done({
+                    'path': path,
+                    'status': result['status'],
+                    'pages': len(result['pages']),
+                    'seconds': result['seconds'],
+                    'outputs': outputs,
+                    'error': result['error'],
+                })
+        
+        crashes = CrashTracker(self.max_crashes)
+        executor = self._create_executor(progress_queue)
+        try:
+            while pending or running:
+                if self._cancel.is_set() and pending:
+                    stats['cancelled'] += len(pending)
+                    pending.clear()
+                
+                broken = False
+                while pending and len(running) < self.workers and self._resume.is_set():
+                    if not crashes.can_submit(pending[0], running.values()):
+                        break  # Tersangka crash dijalankan sendirian
+                    if scheduler is None:
+                        path = pending.popleft()
+                    else:
+                        path = scheduler.pick(pending, estimates.__getitem__)
+                        if path is None:
+                            break  # Tunggu file yang berjalan selesai dan melepas memori
+                    try:
+                        future = executor.submit(ocr_file, path, self.lang, self.config, self.steps,
+                                                 self.dpi, self.skip_blank, scheduler is not None)
+                    except BrokenProcessPool:
+                        # Pool rusak oleh worker yang mati; file ini belum sempat berjalan
+                        pending.appendleft(path)
+                        if scheduler is not None:
+                            scheduler.release(path)
+                        broken = True
+                        break
+                    running[future] = path
+                
+                if not running and not broken:
+                    # Dijeda tanpa file yang berjalan: tunggu resume atau cancel
+                    self._resume.wait(0.2)
+                    update_stats()
+                    continue
+                
+                done = set()
+                if not broken:
+                    done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                drain_progress()
+                
+                crashed = []
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(path)
+                        continue
+                    except Exception as e:
+                        result = {'path': path, 'status': 'error', 'pages': [], 'seconds': 0.0, 'error': str(e)}
+                    if scheduler is not None:
+                        scheduler.release(path, result.pop('memory', None))
+                    crashes.succeeded(path)
+                    finish(path, result)
+                
+                if crashed or broken:
+                    # Semua file yang sedang berjalan ikut gagal saat satu worker mati
+                    # (misalnya dibunuh OOM killer); buat pool baru dan ulangi file
+                    # yang tidak terbukti menjadi penyebabnya
+                    crashed.extend(running.values())
+                    running.clear()
+                    executor.shutdown(wait=True)
+                    executor = self._create_executor(progress_queue)
+                    stats['worker_restarts'] = stats.get('worker_restarts', 0) + 1
+                    metrics.count('worker_restarts')
+                    
+                    failed = crashes.crashed(crashed)
+                    for path in reversed(crashed):
+                        if scheduler is not None:
+                            scheduler.release(path)
+                        if path not in failed:
+                            pending.appendleft(path)
+                    for path in failed:
+                        finish(path, {'path': path, 'status': 'error', 'pages': [], 'seconds': 0.0,
+                                      'error': f"Proses worker berhenti tidak normal {self.max_crashes} kali "
+                                               "saat memproses file ini"})
+                
+                update_stats()
+        finally:
+            executor.shutdown(wait=True)
+        
+        drain_progress()
+        update_stats()
+        return stats
\ No newline at end of file
@@ -0,0 +1,2 @@
+# Paket benchmark untuk mengukur performa aplikasi OCR
+# Jalankan dari folder induk paket, misalnya: python -m app.benchmarks.bench_excel_export
\ No newline at end of file
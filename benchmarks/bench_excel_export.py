@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from ..export_manager import ExportManager
+
+try:
+    import resource
+except ImportError:
+    # Modul resource tidak tersedia di Windows
+    resource = None
+
+
+def synthetic_page(page_num, words, seed=0):
+    """
+    Membuat DataFrame tiruan dengan kolom yang sama seperti image_to_data
+    
+    Args:
+        page_num (int): Nomor halaman
+        words (int): Jumlah kata dalam halaman
+        seed (int): Seed generator acak
+        
+    Returns:
+        DataFrame: Data kata tiruan
+    """
+    rng = np.random.default_rng(seed + page_num)
+    vocab = np.array(['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'dokumen', 'halaman', 'teks', 'OCR', '2023'])
+    return pd.DataFrame({
+        'level': 5,
+        'page_num': page_num,
+        'block_num': np.arange(words) // 200 + 1,
+        'par_num': 1,
+        'line_num': np.arange(words) // 12 + 1,
+        'word_num': np.arange(words) % 12 + 1,
+        'left': rng.integers(0, 2400, words),
+        'top': rng.integers(0, 3400, words),
+        'width': rng.integers(10, 200, words),
+        'height': rng.integers(20, 40, words),
+        'conf': rng.uniform(30, 99, words).round(2),
+        'text': vocab[rng.integers(0, len(vocab), words)],
+    })
+
+
+def peak_rss_mb():
+    """
+    Mengembalikan puncak RSS proses saat ini dalam MB, atau None jika tidak didukung
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def run_mode(mode, pages, words, output_path, queue):
+    """
+    Menjalankan satu varian ekspor di proses terpisah agar puncak RSS terukur sendiri
+    """
+    manager = ExportManager()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    
+    if mode == 'to_excel':
+        # Cara lama: satu DataFrame besar ditulis dengan openpyxl mode normal
+        data = pd.concat([synthetic_page(p, words) for p in range(1, pages + 1)], ignore_index=True)
+        data.to_excel(output_path, index=False)
+    elif mode == 'stream':
+        manager.stream_excel(((p, synthetic_page(p, words)) for p in range(1, pages + 1)), output_path)
+    elif mode == 'stream_sheets':
+        manager.stream_excel(((p, synthetic_page(p, words)) for p in range(1, pages + 1)), output_path,
+                             sheet_per_page=True)
+    
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    queue.put((elapsed, None if peak is None else peak - baseline))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ekspor Excel")
+    parser.add_argument('--pages', type=int, default=50, help="Jumlah halaman")
+    parser.add_argument('--words', type=int, default=2000, help="Jumlah kata per halaman")
+    parser.add_argument('--modes', default='to_excel,stream,stream_sheets', help="Varian yang diukur")
+    args = parser.parse_args(argv)
+    
+    rows = args.pages * args.words
+    print(f"{args.pages} halaman x {args.words} kata = {rows} baris")
+    print(f"{'varian':<15}{'detik':>10}{'baris/detik':>15}{'RSS MB':>10}")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for mode in args.modes.split(','):
+            output_path = os.path.join(temp_dir, f"{mode}.xlsx")
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=run_mode,
+                                              args=(mode, args.pages, args.words, output_path, queue))
+            process.start()
+            elapsed, peak = queue.get()
+            process.join()
+            
+            peak_text = '-' if peak is None else f"{peak:.1f}"
+            print(f"{mode:<15}{elapsed:>10.2f}{rows / elapsed:>15.0f}{peak_text:>10}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,333 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+import numpy as np
+import pytesseract
+
+from ..ocr_engine import OCREngine
+from ..image_processor import ImageProcessor
+from ..pdf_handler import PDFHandler
+from ..export_manager import ExportManager
+from .bench_excel_export import synthetic_page, peak_rss_mb
+from .synthetic import make_document, render_pages, degrade, char_accuracy
+
+# Benchmark pipeline OCR per tahap dengan dokumen sintetis dan baseline regresi.
+# Contoh:
+#   python -m app.benchmarks.bench_pipeline --save-baseline baseline.json
+#   python -m app.benchmarks.bench_pipeline --baseline baseline.json   (exit 1 jika regresi)
+
+# Langkah ImageProcessor yang diukur; grayscale menerima gambar BGR, sisanya grayscale
+PREPROCESS_STEPS = ('grayscale', 'denoise', 'threshold', 'adaptive_threshold', 'deskew',
+                    'remove_borders', 'crop_content', 'is_blank')
+
+# Selisih absolut minimum sebelum perlambatan dianggap regresi, agar tahap
+# yang sangat cepat tidak gagal karena jitter timer
+MIN_SLACK_MS = 0.5
+
+
+class StageTimer:
+    """
+    Mengumpulkan durasi per tahap beserta jumlah halaman yang diproses
+    """
+    
+    def __init__(self):
+        self.samples = {}
+    
+    def measure(self, name, func, *args, pages=1, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.samples.setdefault(name, []).append((time.perf_counter() - started, pages))
+        return result
+    
+    def summary(self):
+        """
+        Ringkasan per tahap: n, p50/p95 dalam milidetik, dan halaman per detik
+        """
+        stages = {}
+        for name, samples in sorted(self.samples.items()):
+            seconds = np.array([s for s, _ in samples])
+            pages = sum(p for _, p in samples)
+            stages[name] = {
+                'n': len(samples),
+                'p50_ms': round(float(np.percentile(seconds, 50)) * 1000, 3),
+                'p95_ms': round(float(np.percentile(seconds, 95)) * 1000, 3),
+                'pages_per_sec': round(pages / seconds.sum(), 2) if seconds.sum() > 0 else None,
+            }
+        return stages
+
+
+def tesseract_languages():
+    """
+    Bahasa Tesseract yang terpasang, atau set kosong jika Tesseract tidak tersedia
+    """
+    # OCREngine.get_available_languages jatuh ke ['eng'] saat gagal, jadi tanya pytesseract langsung
+    try:
+        return set(pytesseract.get_languages())
+    except Exception:
+        return set()
+
+
+def bench_pdf(timer, pdf_handler, document, pdf_path, dpi, temp_dir):
+    pages = len(document)
+    timer.measure(f'pdf.convert_pdf_to_images@{dpi}', pdf_handler.convert_pdf_to_images,
+                  pdf_path, os.path.join(temp_dir, f'convert_{dpi}'), dpi=dpi, pages=pages)
+    for page in document:
+        timer.measure(f'pdf.render_page@{dpi}', pdf_handler.render_page, page, dpi=dpi, grayscale=True)
+
+
+def bench_preprocess(timer, image_processor, image, dpi, steps=PREPROCESS_STEPS):
+    """
+    Mengukur langkah ImageProcessor pada satu halaman
+    
+    Args:
+        steps (tuple): Langkah yang diukur; grayscale dan deskew selalu dijalankan
+                       karena hasilnya dipakai tahap OCR
+        
+    Returns:
+        numpy.ndarray: Gambar grayscale hasil deskew untuk tahap OCR
+    """
+    gray = timer.measure(f'preprocess.grayscale@{dpi}', image_processor.grayscale, image)
+    deskewed = gray
+    for step in PREPROCESS_STEPS[1:]:
+        if step not in steps and step != 'deskew':
+            continue
+        result = timer.measure(f'preprocess.{step}@{dpi}', getattr(image_processor, step), gray)
+        if step == 'deskew':
+            deskewed = result
+    return deskewed
+
+
+def bench_ocr(timer, ocr_engine, image, lang, dpi):
+    """
+    Mengukur OCR satu halaman: panggilan Tesseract dan penyusunan teks dari data
+    
+    Returns:
+        tuple: (teks hasil OCR, DataFrame image_to_data)
+    """
+    data = timer.measure(f'ocr.image_to_data@{dpi}', ocr_engine.image_to_data, image, lang, words_only=False)
+    text = timer.measure(f'ocr.data_to_text@{dpi}', ocr_engine.data_to_text, data)
+    return text, data
+
+
+def bench_export(timer, export_manager, pages, temp_dir):
+    """
+    Mengukur setiap writer ExportManager untuk satu dokumen
+    
+    Args:
+        pages (list): Tuple (nomor halaman, teks, DataFrame) per halaman
+    """
+    count = len(pages)
+    text = '\f'.join(text for _, text, _ in pages)
+    output = os.path.join(temp_dir, 'export')
+    
+    def frames():
+        for page_num, _, data in pages:
+            words = data[data['level'] == 5] if 'level' in data.columns else data
+            yield page_num, words[words['text'].notna()]
+    
+    timer.measure('export.text', export_manager.export_text, text, output + '.txt', pages=count)
+    timer.measure('export.pdf', export_manager.export_pdf, text, output + '.pdf', pages=count)
+    timer.measure('export.excel', export_manager.stream_excel, frames(), output + '.xlsx', pages=count)
+    timer.measure('export.jsonl', export_manager.stream_jsonl, frames(), output + '.jsonl', pages=count)
+    timer.measure('export.hocr', export_manager.stream_hocr,
+                  ((page_num, data) for page_num, _, data in pages), output + '.hocr', pages=count)
+    timer.measure('export.alto', export_manager.stream_alto,
+                  ((page_num, data) for page_num, _, data in pages), output + '.alto.xml', pages=count)
+
+
+def run_suite(args):
+    """
+    Menjalankan semua tahap benchmark
+    
+    Returns:
+        dict: Laporan berisi meta, stages, accuracy, dan peak_rss_mb
+    """
+    ocr_engine = OCREngine(args.tesseract_cmd)
+    image_processor = ImageProcessor()
+    pdf_handler = PDFHandler(ocr_engine, image_processor)
+    export_manager = ExportManager()
+    timer = StageTimer()
+    accuracy = {}
+    notes = []
+    
+    stages = set(args.stages.split(','))
+    dpis = [int(dpi) for dpi in args.dpis.split(',')]
+    noises = [float(noise) for noise in args.noise.split(',')]
+    skews = [float(skew) for skew in args.skew.split(',')]
+    langs = args.langs.split(',')
+    
+    installed = tesseract_languages() if 'ocr' in stages else set()
+    if 'ocr' in stages and not installed:
+        notes.append("Tesseract tidak tersedia: tahap ocr dan akurasi dilewati")
+    
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for lang in langs:
+            document, truths = make_document(args.pages, lang, seed=args.seed)
+            pdf_path = os.path.join(temp_dir, f'{lang}.pdf')
+            document.save(pdf_path)
+            run_ocr = 'ocr' in stages and lang in installed
+            if 'ocr' in stages and installed and not run_ocr:
+                notes.append(f"Bahasa {lang} tidak terpasang di Tesseract: OCR dilewati")
+            
+            for repeat in range(args.repeat):
+                for dpi in dpis:
+                    if 'pdf' in stages:
+                        bench_pdf(timer, pdf_handler, document, pdf_path, dpi, temp_dir)
+                    
+                    clean_pages = list(render_pages(document, dpi=dpi))
+                    for noise in noises:
+                        for skew in skews:
+                            variant = f'{lang}@{dpi}dpi,noise={noise:g},skew={skew:g}'
+                            ocr_pages = []
+                            scores = []
+                            # Semua langkah diukur sekali per halaman dan DPI; varian lain hanya
+                            # menjalankan langkah yang dibutuhkan OCR karena denoise sangat lambat
+                            first_variant = noise == noises[0] and skew == skews[0]
+                            steps = PREPROCESS_STEPS if 'preprocess' in stages and first_variant else ()
+                            for page_index, clean in enumerate(clean_pages):
+                                image = degrade(clean, noise, skew, seed=args.seed + page_index)
+                                if steps or run_ocr:
+                                    prepared = bench_preprocess(timer, image_processor, image, dpi, steps)
+                                if run_ocr:
+                                    text, data = bench_ocr(timer, ocr_engine, prepared, lang, dpi)
+                                    ocr_pages.append((page_index + 1, text, data))
+                                    scores.append(char_accuracy(truths[page_index], text))
+                            
+                            if scores and repeat == 0:
+                                accuracy[variant] = round(float(np.mean(scores)), 4)
+                            
+                            if 'export' in stages and ocr_pages and repeat == 0:
+                                bench_export(timer, export_manager, ocr_pages, temp_dir)
+            
+            if 'export' in stages and not run_ocr:
+                # Tanpa OCR, writer diukur dengan data kata sintetis yang ukurannya setara
+                pages = [(page_num, truths[page_num - 1], synthetic_page(page_num, 400, args.seed))
+                         for page_num in range(1, args.pages + 1)]
+                for _ in range(args.repeat):
+                    bench_export(timer, export_manager, pages, temp_dir)
+            document.close()
+    
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'pages': args.pages,
+            'dpis': dpis,
+            'noise': noises,
+            'skew': skews,
+            'langs': langs,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'seconds': round(time.perf_counter() - started, 2),
+        },
+        'notes': notes,
+        'stages': timer.summary(),
+        'accuracy': accuracy,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def compare(report, baseline, tolerance, accuracy_tolerance):
+    """
+    Membandingkan laporan dengan baseline
+    
+    Args:
+        report (dict): Laporan dari run_suite
+        baseline (dict): Laporan baseline tersimpan
+        tolerance (float): Perlambatan relatif yang diizinkan, misalnya 0.25 untuk 25%
+        accuracy_tolerance (float): Penurunan akurasi absolut yang diizinkan
+        
+    Returns:
+        list: Pesan regresi, kosong jika tidak ada
+    """
+    regressions = []
+    for name, stage in report['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if base is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            limit = max(base[key] * (1 + tolerance), base[key] + MIN_SLACK_MS)
+            if stage[key] > limit:
+                regressions.append(f"{name} {key}: {stage[key]:.2f} > {base[key]:.2f} (batas {limit:.2f})")
+    
+    for variant, score in report['accuracy'].items():
+        base = baseline.get('accuracy', {}).get(variant)
+        if base is not None and score < base - accuracy_tolerance:
+            regressions.append(f"akurasi {variant}: {score:.4f} < {base:.4f}")
+    
+    base_rss = baseline.get('peak_rss_mb')
+    if base_rss and report['peak_rss_mb'] and report['peak_rss_mb'] > base_rss * (1 + tolerance):
+        regressions.append(f"peak RSS: {report['peak_rss_mb']:.1f} MB > {base_rss:.1f} MB")
+    
+    return regressions
+
+
+def print_report(report):
+    for note in report['notes']:
+        print(f"Catatan: {note}")
+    
+    print(f"{'tahap':<36}{'n':>6}{'p50 ms':>12}{'p95 ms':>12}{'hlm/detik':>12}")
+    for name, stage in report['stages'].items():
+        rate = '-' if stage['pages_per_sec'] is None else f"{stage['pages_per_sec']:.2f}"
+        print(f"{name:<36}{stage['n']:>6}{stage['p50_ms']:>12.2f}{stage['p95_ms']:>12.2f}{rate:>12}")
+    
+    if report['accuracy']:
+        print(f"\n{'varian':<44}{'akurasi karakter':>18}")
+        for variant, score in report['accuracy'].items():
+            print(f"{variant:<44}{score:>18.2%}")
+    
+    peak = report['peak_rss_mb']
+    print(f"\nPeak RSS: {'-' if peak is None else f'{peak:.1f} MB'}, total {report['meta']['seconds']} detik")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline OCR per tahap")
+    parser.add_argument('--pages', type=int, default=3, help="Jumlah halaman per dokumen")
+    parser.add_argument('--dpis', default='150,300', help="DPI render dipisah koma")
+    parser.add_argument('--noise', default='0,12', help="Simpangan baku noise dipisah koma")
+    parser.add_argument('--skew', default='0,2', help="Sudut kemiringan (derajat) dipisah koma")
+    parser.add_argument('--langs', default='eng', help="Bahasa dipisah koma: eng, ind, deu, fra")
+    parser.add_argument('--stages', default='pdf,preprocess,ocr,export', help="Tahap yang diukur")
+    parser.add_argument('--repeat', type=int, default=1, help="Jumlah pengulangan pengukuran")
+    parser.add_argument('--seed', type=int, default=0, help="Seed data sintetis")
+    parser.add_argument('--tesseract-cmd', help="Path ke executable Tesseract")
+    parser.add_argument('--output', help="Simpan laporan JSON ke path ini")
+    parser.add_argument('--baseline', help="Bandingkan dengan laporan baseline JSON")
+    parser.add_argument('--save-baseline', help="Simpan laporan sebagai baseline baru")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Perlambatan relatif yang diizinkan")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.01, help="Penurunan akurasi yang diizinkan")
+    args = parser.parse_args(argv)
+    
+    # Tesseract dengan satu thread membuat waktu antar run lebih stabil
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    
+    report = run_suite(args)
+    print_report(report)
+    
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.accuracy_tolerance)
+        if regressions:
+            print(f"\nREGRESI ({len(regressions)}):", file=sys.stderr)
+            for message in regressions:
+                print(f"  {message}", file=sys.stderr)
+            return 1
+        print("\nTidak ada regresi dibanding baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
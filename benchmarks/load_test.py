@@ -0,0 +1,165 @@
+import io
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+from collections import Counter
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Uji beban layanan OCR (python -m app.server) dari localhost.
+# Setiap "user" virtual mengirim request berulang dengan jeda acak seperti locust,
+# lalu latensi dan kode status dikumpulkan untuk p50/p95/p99 dan throughput.
+# Contoh: python -m app.benchmarks.load_test --users 16 --duration 60
+
+
+def sample_image(text="Lorem ipsum dolor sit amet 12345", width=1200, height=300):
+    """
+    Membuat gambar PNG berisi teks untuk dikirim ke server
+    
+    Returns:
+        bytes: Isi file PNG
+    """
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype('DejaVuSans.ttf', 40)
+    except OSError:
+        font = ImageFont.load_default()
+    draw.text((40, height // 2 - 30), text, fill=0, font=font)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float('nan')
+
+
+class VirtualUser(threading.Thread):
+    """
+    Satu user virtual dengan koneksi keep-alive sendiri
+    """
+    
+    def __init__(self, host, port, path, body, content_type, deadline, wait, seed, results, lock):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.path = path
+        self.body = body
+        self.content_type = content_type
+        self.deadline = deadline
+        self.wait = wait
+        self.rng = np.random.default_rng(seed)
+        self.results = results
+        self.lock = lock
+    
+    def request(self, connection):
+        connection.request('POST', self.path, body=self.body, headers={'Content-Type': self.content_type})
+        response = connection.getresponse()
+        payload = response.read()
+        if response.status == 202:
+            # Mode job: ikuti stream sampai baris akhir agar latensi mencakup seluruh PDF
+            job_id = json.loads(payload)['id']
+            connection.request('GET', f"/jobs/{job_id}/stream")
+            stream = connection.getresponse()
+            stream.read()
+            return 200 if stream.status == 200 else stream.status
+        return response.status
+    
+    def run(self):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=300)
+        while time.monotonic() < self.deadline:
+            started = time.perf_counter()
+            try:
+                status = self.request(connection)
+            except (OSError, http.client.HTTPException):
+                status = 'conn_error'
+                connection.close()
+                connection = http.client.HTTPConnection(self.host, self.port, timeout=300)
+            latency = time.perf_counter() - started
+            
+            with self.lock:
+                self.results.append((status, latency))
+            
+            if self.wait > 0:
+                time.sleep(self.rng.uniform(0, self.wait))
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban layanan OCR HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="Host server (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="Port server (default: 8080)")
+    parser.add_argument('--users', type=int, default=8, help="Jumlah user virtual bersamaan")
+    parser.add_argument('--spawn-rate', type=float, default=4.0, help="User baru per detik saat ramp-up")
+    parser.add_argument('--duration', type=float, default=30.0, help="Lama uji dalam detik")
+    parser.add_argument('--wait', type=float, default=0.0, help="Jeda acak maksimum antar request per user")
+    parser.add_argument('--file', help="File gambar atau PDF yang dikirim (default: gambar sintetis)")
+    parser.add_argument('--mode', choices=('ocr', 'jobs'), default=None,
+                        help="Endpoint yang diuji (default: jobs untuk PDF, ocr untuk gambar)")
+    parser.add_argument('--query', default='', help="Query string tambahan, misalnya lang=ind&psm=6")
+    parser.add_argument('--json', action='store_true', help="Cetak hasil sebagai JSON")
+    args = parser.parse_args(argv)
+    
+    if args.file:
+        with open(args.file, 'rb') as f:
+            body = f.read()
+    else:
+        body = sample_image()
+    
+    is_pdf = body[:5] == b'%PDF-'
+    mode = args.mode or ('jobs' if is_pdf else 'ocr')
+    path = f"/{mode}" + (f"?{args.query}" if args.query else '')
+    content_type = 'application/pdf' if is_pdf else 'application/octet-stream'
+    
+    results = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + args.duration
+    
+    users = []
+    for index in range(args.users):
+        user = VirtualUser(args.host, args.port, path, body, content_type, deadline, args.wait, index, results, lock)
+        user.start()
+        users.append(user)
+        if args.spawn_rate > 0 and index < args.users - 1:
+            time.sleep(1.0 / args.spawn_rate)
+    
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - started
+    
+    statuses = Counter(str(status) for status, _ in results)
+    ok = [latency for status, latency in results if status == 200]
+    report = {
+        'mode': mode,
+        'users': args.users,
+        'seconds': round(elapsed, 2),
+        'requests': len(results),
+        'statuses': dict(statuses),
+        'ok_per_sec': round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(ok, 50) * 1000, 1),
+        'p95_ms': round(percentile(ok, 95) * 1000, 1),
+        'p99_ms': round(percentile(ok, 99) * 1000, 1),
+        'max_ms': round(max(ok) * 1000, 1) if ok else None,
+    }
+    
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print(f"{report['requests']} request dari {args.users} user dalam {report['seconds']} detik ({mode})")
+        print("Status: " + ', '.join(f"{code}={count}" for code, count in sorted(statuses.items())))
+        print(f"{'berhasil/detik':<16}{report['ok_per_sec']:>10}")
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'max_ms'):
+            print(f"{key:<16}{report[key]:>10}")
+    
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
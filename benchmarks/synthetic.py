@@ -0,0 +1,138 @@
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+from ..pdf_handler import PDFHandler
+
+# Kalimat contoh per bahasa Tesseract. Hanya karakter Latin-1 agar bisa
+# ditulis dengan font Helvetica bawaan PyMuPDF, sehingga hasil render sama
+# di semua mesin tanpa bergantung pada font sistem.
+SAMPLE_TEXT = {
+    'eng': ("The quick brown fox jumps over the lazy dog. Invoice number 4821 was issued on "
+            "12 March 2023 for a total amount of 1,250.00 dollars. Please keep this receipt."),
+    'ind': ("Dokumen ini berisi laporan keuangan tahunan perusahaan. Nomor faktur 4821 "
+            "diterbitkan pada tanggal 12 Maret 2023 dengan jumlah total Rp 1.250.000."),
+    'deu': ("Die Rechnung Nummer 4821 wurde am 12. März 2023 ausgestellt. Bitte überweisen "
+            "Sie den Gesamtbetrag von 1.250,00 Euro innerhalb von vierzehn Tagen."),
+    'fra': ("La facture numéro 4821 a été émise le 12 mars 2023. Veuillez régler le montant "
+            "total de 1 250,00 euros avant la fin du mois. Merci de votre confiance."),
+}
+
+
+def page_text(lang, page_num, sentences=12, seed=0):
+    """
+    Menyusun teks satu halaman dari kalimat contoh secara deterministik
+    
+    Args:
+        lang (str): Kode bahasa, kunci dari SAMPLE_TEXT
+        page_num (int): Nomor halaman
+        sentences (int): Jumlah kalimat dalam halaman
+        seed (int): Seed generator acak
+        
+    Returns:
+        str: Teks halaman, satu paragraf per baris
+    """
+    rng = np.random.default_rng(seed * 1000 + page_num)
+    parts = [part.strip() + '.' for part in SAMPLE_TEXT[lang].split('.') if part.strip()]
+    order = rng.integers(0, len(parts), sentences)
+    return '\n'.join(f"{page_num}. {parts[index]}" if i == 0 else parts[index] for i, index in enumerate(order))
+
+
+def make_document(pages=5, lang='eng', fontsize=11, seed=0):
+    """
+    Membuat PDF sintetis berisi teks yang diketahui
+    
+    Args:
+        pages (int): Jumlah halaman
+        lang (str): Kode bahasa, kunci dari SAMPLE_TEXT
+        fontsize (float): Ukuran font dalam poin
+        seed (int): Seed generator acak
+        
+    Returns:
+        tuple: (fitz.Document, daftar teks ground truth per halaman)
+    """
+    document = fitz.open()
+    truths = []
+    for page_num in range(1, pages + 1):
+        text = page_text(lang, page_num, seed=seed)
+        page = document.new_page(width=595, height=842)  # A4
+        rect = fitz.Rect(72, 72, 595 - 72, 842 - 72)
+        page.insert_textbox(rect, text, fontsize=fontsize, fontname='helv', lineheight=1.6)
+        truths.append(text)
+    return document, truths
+
+
+def degrade(image, noise=0.0, skew=0.0, seed=0):
+    """
+    Menambahkan noise Gaussian dan kemiringan seperti hasil scan
+    
+    Args:
+        image (numpy.ndarray): Gambar grayscale atau BGR
+        noise (float): Simpangan baku noise dalam level intensitas
+        skew (float): Sudut kemiringan dalam derajat
+        seed (int): Seed generator acak
+        
+    Returns:
+        numpy.ndarray: Gambar yang sudah diturunkan kualitasnya
+    """
+    if skew:
+        height, width = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), skew, 1.0)
+        image = cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                               borderMode=cv2.BORDER_CONSTANT, borderValue=(255, 255, 255))
+    if noise:
+        rng = np.random.default_rng(seed)
+        noisy = image.astype(np.float32) + rng.normal(0, noise, image.shape).astype(np.float32)
+        image = np.clip(noisy, 0, 255).astype(np.uint8)
+    return image
+
+
+def render_pages(document, dpi=300, grayscale=False):
+    """
+    Merender semua halaman dokumen sintetis ke array OpenCV
+    
+    Yields:
+        numpy.ndarray: Gambar halaman
+    """
+    pdf_handler = PDFHandler()
+    for page in document:
+        yield pdf_handler.render_page(page, dpi=dpi, grayscale=grayscale)
+
+
+def normalize_text(text):
+    """
+    Menyatukan whitespace agar perbedaan tata letak baris tidak dihitung sebagai error
+    """
+    return ' '.join(text.split())
+
+
+def edit_distance(a, b):
+    """
+    Jarak Levenshtein antar dua string
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def char_accuracy(truth, text):
+    """
+    Akurasi karakter: 1 - (jarak edit / panjang ground truth), minimal 0
+    
+    Args:
+        truth (str): Teks ground truth
+        text (str): Teks hasil OCR
+        
+    Returns:
+        float: Akurasi antara 0 dan 1
+    """
+    truth, text = normalize_text(truth), normalize_text(text)
+    if not truth:
+        return 1.0 if not text else 0.0
+    return max(0.0, 1.0 - edit_distance(truth, text) / len(truth))
\ No newline at end of file
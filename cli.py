@@ -0,0 +1,230 @@
+import sys
+import json
+import inspect
+import signal
+import argparse
+
+from .image_processor import ImageProcessor
+from .batch_processor import BatchProcessor, EXPORT_FORMATS, collect_files
+from .metrics import metrics
+from .scheduler import parse_size, format_size
+
+# Entry point OCR tanpa GUI. Modul ini tidak boleh mengimpor PyQt6 (langsung
+# maupun lewat gui.py) agar bisa dipakai di server tanpa display.
+# Contoh: python -m app.cli scan/ dokumen.pdf -j 4 --jsonl hasil.jsonl
+
+
+def _parse_value(value):
+    """
+    Mengubah nilai parameter teks menjadi int atau float jika memungkinkan
+    """
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_steps(text):
+    """
+    Mengurai langkah pipeline dari teks baris perintah
+    
+    Format: langkah dipisah koma, parameter dipisah titik dua, misalnya
+    'grayscale,resize:scale=1.5,threshold:method=otsu'. Nama parameter
+    dicocokkan dengan signature method ImageProcessor sehingga kesalahan
+    ketik langsung ditolak, bukan baru gagal saat OCR berjalan.
+    
+    Args:
+        text (str): Teks langkah pipeline
+        
+    Returns:
+        list: Daftar langkah berupa (nama, parameter)
+    """
+    steps = []
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        name, *params = item.split(':')
+        if name not in ImageProcessor.PIPELINE_STEPS:
+            raise ValueError(f"Langkah pipeline tidak dikenal: {name}")
+        allowed = [key for key in inspect.signature(getattr(ImageProcessor, name)).parameters
+                   if key not in ('self', 'image')]
+        
+        kwargs = {}
+        for param in params:
+            key, sep, value = param.partition('=')
+            if not sep:
+                raise ValueError(f"Parameter langkah harus berformat kunci=nilai: {param}")
+            if key not in allowed:
+                hint = ', '.join(allowed) if allowed else 'tidak ada'
+                raise ValueError(f"Parameter tidak dikenal untuk langkah {name}: {key} (yang tersedia: {hint})")
+            kwargs[key] = _parse_value(value)
+        steps.append((name, kwargs))
+    return steps
+
+
+def result_record(result, include_words=False):
+    """
+    Menyusun satu record JSONL dari hasil OCR satu file
+    
+    Args:
+        result (dict): Hasil dari ocr_file
+        include_words (bool): Sertakan kata beserta kotak dan confidence
+        
+    Returns:
+        dict: Record yang siap di-serialisasi ke JSON
+    """
+    pages = []
+    for page_num, text, data in result['pages']:
+        page = {'page': page_num, 'text': text}
+        if include_words:
+            words = []
+            if data is not None:
+                if 'level' in data.columns:
+                    data = data[data['level'] == 5]
+                data = data[data['text'].notna()]
+                words = [
+                    {'text': str(row.text), 'left': int(row.left), 'top': int(row.top),
+                     'width': int(row.width), 'height': int(row.height), 'conf': float(row.conf)}
+                    for row in data.itertuples(index=False)
+                ]
+            page['words'] = words
+        pages.append(page)
+    
+    return {'path': result['path'], 'status': result['status'], 'seconds': round(result['seconds'], 3),
+            'error': result['error'], 'outputs': result.get('outputs', []), 'pages': pages}
+
+
+def build_parser():
+    """
+    Membuat parser argumen baris perintah
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m app.cli',
+        description="OCR batch tanpa GUI untuk file gambar dan PDF"
+    )
+    parser.add_argument('inputs', nargs='+', help="File, folder, atau pola glob")
+    parser.add_argument('-o', '--output-dir', help="Folder output untuk --format")
+    parser.add_argument('-f', '--format', default='',
+                        help=f"Format ekspor dipisah koma: {', '.join(EXPORT_FORMATS)}")
+    parser.add_argument('--jsonl', metavar='PATH',
+                        help="Tulis hasil per file sebagai JSONL ('-' untuk stdout, default jika tanpa --format)")
+    parser.add_argument('--words', action='store_true', help="Sertakan kata dan kotak di output JSONL")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Jumlah proses worker")
+    parser.add_argument('-l', '--lang', default='eng', help="Kode bahasa Tesseract (default: eng)")
+    parser.add_argument('--psm', type=int, default=None, help="Page segmentation mode Tesseract")
+    parser.add_argument('--config', default='', help="Konfigurasi tambahan Tesseract")
+    parser.add_argument('--steps', default='', help="Langkah pipeline, misalnya grayscale,resize:scale=1.5,threshold:method=otsu")
+    parser.add_argument('--dpi', type=int, default=300, help="DPI render halaman PDF (default: 300)")
+    parser.add_argument('--skip-blank', action='store_true', help="Lewati OCR halaman kosong (PDF maupun gambar)")
+    parser.add_argument('--no-recursive', action='store_true', help="Jangan masuk ke subfolder")
+    parser.add_argument('--tesseract-cmd', help="Path ke executable Tesseract")
+    parser.add_argument('--memory-budget', type=parse_size, default=None, metavar='SIZE',
+                        help="Batas RSS total, misalnya 4G; jumlah file bersamaan disesuaikan agar muat")
+    parser.add_argument('--cache-dir', help="Folder cache hasil pipeline gambar di disk, dipakai ulang antar eksekusi")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Hanya tampilkan ringkasan akhir")
+    parser.add_argument('--metrics', metavar='PATH', help="Tulis metrik per tahap dalam format Prometheus")
+    parser.add_argument('--metrics-log', metavar='PATH', help="Tulis span dan counter sebagai log JSON")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    formats = [fmt.strip() for fmt in args.format.split(',') if fmt.strip()]
+    if formats and not args.output_dir:
+        parser.error("--output-dir wajib diisi jika --format dipakai")
+    
+    jsonl_path = args.jsonl
+    if jsonl_path is None and not formats:
+        jsonl_path = '-'
+    
+    config = args.config
+    if args.psm is not None:
+        config = f"--psm {args.psm} {config}".strip()
+    
+    try:
+        steps = parse_steps(args.steps)
+        processor = BatchProcessor(
+            args.output_dir, formats=formats, workers=args.workers, lang=args.lang, config=config,
+            steps=steps, dpi=args.dpi, skip_blank=args.skip_blank, tesseract_cmd=args.tesseract_cmd,
+            memory_budget=args.memory_budget, cache_dir=args.cache_dir
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Diaktifkan sebelum pool dibuat agar worker ikut mengumpulkan metrik
+    if args.metrics or args.metrics_log:
+        metrics.enable(log_path=args.metrics_log)
+    
+    files = collect_files(args.inputs, recursive=not args.no_recursive)
+    if not files:
+        print("Tidak ada file gambar atau PDF yang ditemukan", file=sys.stderr)
+        return 1
+    
+    if jsonl_path == '-':
+        jsonl_file = sys.stdout
+    elif jsonl_path:
+        jsonl_file = open(jsonl_path, 'w', encoding='utf-8')
+    else:
+        jsonl_file = None
+    
+    def on_result(result):
+        # Tulis dan flush segera agar pembaca hilir bisa memproses sambil batch berjalan
+        if jsonl_file is not None:
+            record = result_record(result, include_words=args.words)
+            jsonl_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            jsonl_file.flush()
+    
+    def on_file_done(summary):
+        if args.quiet:
+            return
+        line = f"[{summary['status']}] {summary['path']} ({summary['pages']} halaman, {summary['seconds']:.2f} detik)"
+        if summary['error']:
+            line += f": {summary['error']}"
+        print(line, file=sys.stderr, flush=True)
+    
+    interrupted = []
+    
+    def on_interrupt(signum, frame):
+        # Ctrl+C pertama: batalkan file yang belum dimulai dan tunggu yang sedang berjalan.
+        # Ctrl+C kedua menghentikan proses seketika.
+        interrupted.append(signum)
+        signal.signal(signal.SIGINT, previous_handler)
+        processor.cancel()
+        print("Dibatalkan, menunggu file yang sedang berjalan...", file=sys.stderr, flush=True)
+    
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    try:
+        stats = processor.run(files, on_file_done=on_file_done, on_result=on_result)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        if jsonl_file is not None and jsonl_file is not sys.stdout:
+            jsonl_file.close()
+    
+    print(f"Selesai: {stats['done']} berhasil, {stats['failed']} gagal, {stats['cancelled']} dibatalkan "
+          f"dari {stats['total']} file ({stats['pages']} halaman, {stats['elapsed']:.1f} detik, "
+          f"{stats['pages_per_sec']:.2f} halaman/detik)", file=sys.stderr)
+    if 'memory' in stats and not args.quiet:
+        memory = stats['memory']
+        print(f"Memori: anggaran {format_size(memory['budget'])}, puncak per file {format_size(memory['peak_item'])}, "
+              f"faktor koreksi {memory['ratio']}, maksimum {memory['max_workers']} file bersamaan", file=sys.stderr)
+    
+    if metrics.enabled:
+        if args.metrics:
+            metrics.write_prometheus(args.metrics)
+        if not args.quiet:
+            print("Tahap terlama (total detik semua worker):", file=sys.stderr)
+            for row in metrics.summary()[:10]:
+                labels = ','.join(f"{key}={value}" for key, value in row['labels'].items())
+                name = f"{row['span']}[{labels}]" if labels else row['span']
+                print(f"  {name:<40}{row['total_seconds']:>10.2f}{row['count']:>8}x{row['mean_ms']:>10.1f} ms",
+                      file=sys.stderr)
+    
+    if interrupted:
+        return 130
+    return 1 if stats['failed'] or stats['cancelled'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
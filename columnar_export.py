@@ -0,0 +1,191 @@
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Skema tetap untuk hasil OCR tingkat kata; ubah SCHEMA_VERSION jika skema berubah
+SCHEMA_VERSION = '1'
+
+SCHEMA = pa.schema([
+    ('doc_id', pa.dictionary(pa.int32(), pa.string())),
+    ('page', pa.int32()),
+    ('block_num', pa.int32()),
+    ('par_num', pa.int32()),
+    ('line_num', pa.int32()),
+    ('word_num', pa.int32()),
+    ('left', pa.int32()),
+    ('top', pa.int32()),
+    ('width', pa.int32()),
+    ('height', pa.int32()),
+    ('conf', pa.float32()),
+    ('text', pa.dictionary(pa.int32(), pa.string())),
+], metadata={'schema_version': SCHEMA_VERSION})
+
+# Kolom numerik yang diambil langsung dari output image_to_data
+INT_COLUMNS = ('block_num', 'par_num', 'line_num', 'word_num', 'left', 'top', 'width', 'height')
+
+
+class ColumnarBatchWriter:
+    """
+    Kelas untuk menulis hasil OCR banyak dokumen ke file kolumnar (Parquet atau Arrow IPC)
+    """
+    
+    def __init__(self, output_dir, fmt='parquet', partition=None, row_group_rows=100000,
+                 max_rows_per_file=5000000):
+        """
+        Inisialisasi Columnar Batch Writer
+        
+        Args:
+            output_dir (str): Folder dataset
+            fmt (str): Format file: 'parquet' atau 'arrow' (default: 'parquet')
+            partition (str, optional): Nilai partisi batch. Default tanggal hari ini.
+            row_group_rows (int): Jumlah baris per row group (default: 100000)
+            max_rows_per_file (int): Jumlah baris maksimum per file (default: 5000000)
+        """
+        if fmt not in ('parquet', 'arrow'):
+            raise ValueError(f"Format kolumnar tidak dikenal: {fmt}")
+        
+        self.fmt = fmt
+        self.row_group_rows = row_group_rows
+        self.max_rows_per_file = max_rows_per_file
+        
+        partition = partition or datetime.now().strftime('%Y-%m-%d')
+        self.folder = os.path.join(output_dir, f"batch={partition}")
+        os.makedirs(self.folder, exist_ok=True)
+        
+        # Prefix unik agar beberapa writer dapat menulis ke partisi yang sama
+        self._prefix = uuid.uuid4().hex[:8]
+        self._file_index = 0
+        self._file_rows = 0
+        self._writer = None
+        self._sink = None
+        self._batches = []
+        self._buffered_rows = 0
+        
+        self.files = []
+        self.rows_written = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _to_batch(self, doc_id, page, data):
+        """
+        Mengkonversi DataFrame image_to_data satu halaman ke RecordBatch
+        
+        Args:
+            doc_id (str): ID dokumen
+            page (int): Nomor halaman
+            data (DataFrame): Data hasil image_to_data
+            
+        Returns:
+            pyarrow.RecordBatch: Baris tingkat kata sesuai SCHEMA
+        """
+        # Hanya baris kata (level 5) yang memiliki teks
+        if 'level' in data.columns:
+            data = data[data['level'] == 5]
+        data = data[data['text'].notna()]
+        
+        n = len(data)
+        columns = {
+            'doc_id': pa.DictionaryArray.from_arrays(
+                pa.array(np.zeros(n, dtype=np.int32)), pa.array([str(doc_id)])),
+            'page': pa.array(np.full(n, page, dtype=np.int32)),
+        }
+        for col in INT_COLUMNS:
+            columns[col] = pa.array(data[col].to_numpy(dtype=np.int32))
+        columns['conf'] = pa.array(data['conf'].to_numpy(dtype=np.float32))
+        columns['text'] = pa.array(data['text'].astype(str).to_numpy(dtype=object),
+                                   type=pa.string()).dictionary_encode()
+        
+        return pa.RecordBatch.from_pydict(columns, schema=SCHEMA)
+    
+    def _open_file(self):
+        """
+        Membuka file part baru di folder partisi
+        """
+        ext = 'parquet' if self.fmt == 'parquet' else 'arrows'
+        path = os.path.join(self.folder, f"part-{self._prefix}-{self._file_index:05d}.{ext}")
+        self._file_index += 1
+        self._file_rows = 0
+        
+        if self.fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, SCHEMA, compression='zstd',
+                                            use_dictionary=['doc_id', 'text'])
+        else:
+            # Format stream mengizinkan dictionary berbeda per batch
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_stream(self._sink, SCHEMA)
+        
+        self.files.append(path)
+    
+    def _close_file(self):
+        """
+        Menutup file part yang sedang ditulis
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+    
+    def flush(self):
+        """
+        Menulis baris yang ditampung sebagai satu row group
+        """
+        if not self._batches:
+            return
+        
+        if self._writer is None:
+            self._open_file()
+        
+        # Satukan dictionary antar halaman agar row group hanya punya satu dictionary
+        table = pa.Table.from_batches(self._batches, schema=SCHEMA).unify_dictionaries().combine_chunks()
+        if self.fmt == 'parquet':
+            self._writer.write_table(table, row_group_size=len(table))
+        else:
+            self._writer.write_table(table)
+        
+        self._file_rows += len(table)
+        self.rows_written += len(table)
+        self._batches = []
+        self._buffered_rows = 0
+        
+        if self._file_rows >= self.max_rows_per_file:
+            self._close_file()
+    
+    def write_page(self, doc_id, page, data):
+        """
+        Menambahkan hasil OCR satu halaman ke dataset
+        
+        Args:
+            doc_id (str): ID dokumen
+            page (int): Nomor halaman
+            data (DataFrame): Data hasil image_to_data
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("Data harus berupa pandas DataFrame")
+        
+        batch = self._to_batch(doc_id, page, data)
+        if batch.num_rows == 0:
+            return
+        
+        self._batches.append(batch)
+        self._buffered_rows += batch.num_rows
+        
+        if self._buffered_rows >= self.row_group_rows:
+            self.flush()
+    
+    def close(self):
+        """
+        Menulis sisa baris dan menutup file
+        """
+        self.flush()
+        self._close_file()
\ No newline at end of file
@@ -1,22 +1,86 @@
 import os
 import pandas as pd
-from fpdf import FPDF
+import fitz  # PyMuPDF
+from openpyxl import Workbook
 import json
 import csv
-import xml.dom.minidom as md
-import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+from .metrics import metrics
 
 class ExportManager:
     """
     Kelas untuk menangani ekspor hasil OCR ke berbagai format
     """
     
+    # Jumlah baris yang diformat sekaligus oleh exporter streaming
+    CHUNK_ROWS = 50000
+    
+    # Jumlah baris maksimum dalam satu sheet Excel
+    EXCEL_MAX_ROWS = 1048576
+    
+    # Font Unicode yang dicoba berurutan untuk ekspor PDF
+    UNICODE_FONTS = [
+        'C:/Windows/Fonts/arial.ttf',
+        'C:/Windows/Fonts/segoeui.ttf',
+        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+        '/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf',
+        '/usr/share/fonts/noto/NotoSans-Regular.ttf',
+        '/Library/Fonts/Arial Unicode.ttf',
+        '/System/Library/Fonts/Supplemental/Arial Unicode.ttf',
+    ]
+    
     def __init__(self):
         """
         Inisialisasi Export Manager
         """
         pass
     
+    def _iter_page_frames(self, pages):
+        """
+        Menormalkan iterator hasil halaman menjadi pasangan (nomor halaman, DataFrame)
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            
+        Yields:
+            tuple: (nomor halaman atau None, DataFrame)
+        """
+        for page in pages:
+            page_num, data = page if isinstance(page, tuple) else (None, page)
+            
+            if not isinstance(data, pd.DataFrame):
+                raise ValueError("Data halaman harus berupa pandas DataFrame")
+            
+            yield page_num, data
+    
+    def _iter_pages(self, pages):
+        """
+        Menormalkan iterator hasil halaman menjadi potongan DataFrame
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            
+        Yields:
+            DataFrame: Potongan data paling banyak CHUNK_ROWS baris
+        """
+        for page_num, data in self._iter_page_frames(pages):
+            if page_num is not None:
+                data = data.assign(page_num=page_num)
+            
+            for start in range(0, len(data), self.CHUNK_ROWS):
+                yield data.iloc[start:start + self.CHUNK_ROWS]
+    
+    def _xml_escape(self, values):
+        """
+        Meng-escape karakter khusus XML pada Series string secara vektor
+        """
+        return (values.astype(str)
+                .str.replace('&', '&amp;', regex=False)
+                .str.replace('<', '&lt;', regex=False)
+                .str.replace('>', '&gt;', regex=False))
+    
+    @metrics.timed('export', format='text', method='export_text')
     def export_text(self, text, output_path):
         """
         Mengekspor teks ke file teks biasa
@@ -35,6 +99,7 @@ class ExportManager:
         except Exception as e:
             raise Exception(f"Error saat mengekspor teks: {str(e)}")
     
+    @metrics.timed('export', format='excel', method='export_excel')
     def export_excel(self, data, output_path):
         """
         Mengekspor data ke file Excel
@@ -51,12 +116,82 @@ class ExportManager:
             if not isinstance(data, pd.DataFrame):
                 raise ValueError("Data harus berupa pandas DataFrame")
             
-            # Ekspor ke Excel
-            data.to_excel(output_path, index=False)
+            # Ekspor ke Excel dengan mode write-only agar memori tetap rendah
+            return self.stream_excel([data], output_path)
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke Excel: {str(e)}")
+    
+    @metrics.timed('export', format='excel', method='stream_excel')
+    def stream_excel(self, pages, output_path, sheet_per_page=False):
+        """
+        Mengekspor hasil banyak halaman ke file Excel secara bertahap
+        
+        Menggunakan workbook write-only openpyxl sehingga baris langsung
+        ditulis ke file dan memori tidak bertambah seiring jumlah halaman.
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            output_path (str): Path untuk menyimpan file
+            sheet_per_page (bool): Satu sheet per halaman; jika False semua halaman
+                                   ditulis ke satu sheet dengan kolom page_num (default: False)
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        try:
+            workbook = Workbook(write_only=True)
+            sheet = None
+            sheet_rows = 0
+            title = "Sheet1"
+            part = 1
+            columns = None
+            
+            for index, page in enumerate(pages, 1):
+                page_num, data = page if isinstance(page, tuple) else (index, page)
+                if not isinstance(data, pd.DataFrame):
+                    raise ValueError("Data halaman harus berupa pandas DataFrame")
+                
+                if sheet_per_page:
+                    # Sheet dibuat saat baris pertama halaman ditulis
+                    sheet = None
+                    title = f"Halaman {page_num}"
+                    part = 1
+                    columns = list(data.columns)
+                else:
+                    if isinstance(page, tuple):
+                        data = data.assign(page_num=page_num)
+                    if columns is None:
+                        columns = list(data.columns)
+                    data = data.reindex(columns=columns)
+                
+                for start in range(0, len(data), self.CHUNK_ROWS):
+                    chunk = data.iloc[start:start + self.CHUNK_ROWS]
+                    
+                    # Sel kosong untuk NaN, nilai lain sebagai tipe Python biasa
+                    rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+                    for row in rows:
+                        # Sheet lanjutan jika batas baris Excel tercapai
+                        if sheet is None or sheet_rows >= self.EXCEL_MAX_ROWS:
+                            sheet = workbook.create_sheet(title if part == 1 else f"{title} ({part})")
+                            sheet.append(columns)
+                            sheet_rows = 1
+                            part += 1
+                        
+                        sheet.append(row)
+                        sheet_rows += 1
+            
+            # Workbook harus memiliki paling tidak satu sheet
+            if not workbook.worksheets:
+                sheet = workbook.create_sheet(title)
+                if columns:
+                    sheet.append(columns)
+            
+            workbook.save(output_path)
             return True
         except Exception as e:
             raise Exception(f"Error saat mengekspor ke Excel: {str(e)}")
     
+    @metrics.timed('export', format='csv', method='export_csv')
     def export_csv(self, data, output_path, delimiter=','):
         """
         Mengekspor data ke file CSV
@@ -80,6 +215,7 @@ class ExportManager:
         except Exception as e:
             raise Exception(f"Error saat mengekspor ke CSV: {str(e)}")
     
+    @metrics.timed('export', format='json', method='export_json')
     def export_json(self, data, output_path, orient='records'):
         """
         Mengekspor data ke file JSON
@@ -103,46 +239,195 @@ class ExportManager:
         except Exception as e:
             raise Exception(f"Error saat mengekspor ke JSON: {str(e)}")
     
-    def export_pdf(self, text, output_path, title=None):
+    def _pdf_font(self, font_path=None):
+        """
+        Memuat font Unicode untuk ekspor PDF
+        
+        Args:
+            font_path (str, optional): Path ke file font TTF/OTF
+            
+        Returns:
+            fitz.Font: Font yang akan di-embed ke PDF
+        """
+        candidates = [font_path] if font_path else self.UNICODE_FONTS
+        for path in candidates:
+            if path and os.path.exists(path):
+                return fitz.Font(fontfile=path)
+        
+        if font_path:
+            raise ValueError(f"File font tidak ditemukan: {font_path}")
+        
+        # Font bawaan hanya mendukung Latin; dipakai jika tidak ada font Unicode di sistem
+        print("Peringatan: font Unicode tidak ditemukan, memakai Helvetica bawaan")
+        return fitz.Font("helv")
+    
+    def _wrap_lines(self, text, font, fontsize, max_width, widths=None):
+        """
+        Memecah teks menjadi baris-baris yang muat dalam lebar tertentu
+        
+        Lebar setiap kata diukur sekali lalu di-cache, sehingga teks panjang
+        dengan kosakata berulang dapat dipecah dengan cepat. Cache dapat
+        diberikan lewat widths agar dipakai bersama antar halaman.
+        
+        Returns:
+            list: Daftar (teks baris, lebar baris)
+        """
+        widths = {} if widths is None else widths
+        
+        def measure(word):
+            width = widths.get(word)
+            if width is None:
+                width = widths[word] = font.text_length(word, fontsize=fontsize)
+            return width
+        
+        space = measure(' ')
+        lines = []
+        for paragraph in text.split('\n'):
+            line, line_width = [], 0.0
+            for word in paragraph.split(' '):
+                width = measure(word)
+                
+                # Kata yang lebih panjang dari satu baris dipotong per karakter
+                while width > max_width:
+                    if line:
+                        lines.append((' '.join(line), line_width))
+                        line, line_width = [], 0.0
+                    cut = 1
+                    while cut < len(word) and measure(word[:cut + 1]) <= max_width:
+                        cut += 1
+                    lines.append((word[:cut], measure(word[:cut])))
+                    word = word[cut:]
+                    width = measure(word)
+                
+                extra = width + (space if line else 0.0)
+                if line and line_width + extra > max_width:
+                    lines.append((' '.join(line), line_width))
+                    line, line_width = [word], width
+                else:
+                    line.append(word)
+                    line_width += extra
+            
+            lines.append((' '.join(line), line_width))
+        
+        return lines
+    
+    def _layout_pdf(self, pdf, text, title, font, fontsize, right_to_left):
+        """
+        Menata teks ke halaman-halaman baru dalam dokumen PyMuPDF
+        
+        Form feed ('\f') pemisah halaman hasil OCR multi-halaman selalu
+        memulai halaman PDF baru, sehingga halaman sumber tetap terpisah.
+        
+        Returns:
+            int: Nomor halaman pertama (0-based) dari teks ini
+        """
+        width, height = fitz.paper_size("a4")
+        margin = 50
+        line_height = fontsize * 1.4
+        max_width = width - 2 * margin
+        
+        segments = (text or '').split('\f')
+        # Tesseract mengakhiri teks setiap halaman dengan '\f'; jangan buat halaman kosong di akhir
+        if len(segments) > 1 and not segments[-1].strip():
+            segments.pop()
+        first_page = len(pdf)
+        widths = {}
+        
+        page, writer, y = None, None, 0.0
+        
+        def new_page():
+            if writer is not None:
+                writer.write_text(page)
+            new = pdf.new_page(width=width, height=height)
+            return new, fitz.TextWriter(new.rect), margin + fontsize
+        
+        page, writer, y = new_page()
+        
+        # Tambahkan judul jika ada
+        if title:
+            title_size = fontsize * 1.5
+            title_width = font.text_length(title, fontsize=title_size)
+            writer.append(((width - title_width) / 2, y + title_size / 2), title, font=font,
+                          fontsize=title_size, right_to_left=right_to_left)
+            y += title_size * 2
+        
+        # Tulis setiap baris; satu TextWriter per halaman agar penulisan dilakukan sekaligus
+        for index, segment in enumerate(segments):
+            if index > 0:
+                page, writer, y = new_page()
+            
+            for line, line_width in self._wrap_lines(segment, font, fontsize, max_width, widths):
+                if y > height - margin:
+                    page, writer, y = new_page()
+                
+                if line:
+                    x = width - margin - line_width if right_to_left else margin
+                    writer.append((x, y), line, font=font, fontsize=fontsize, right_to_left=right_to_left)
+                y += line_height
+        
+        writer.write_text(page)
+        return first_page
+    
+    @metrics.timed('export', format='pdf', method='export_pdf')
+    def export_pdf(self, text, output_path, title=None, font_path=None, fontsize=11, right_to_left=False):
         """
         Mengekspor teks ke file PDF
         
+        Teks ditata sekaligus per halaman dengan PyMuPDF dan font Unicode yang
+        di-embed, sehingga karakter non-Latin (misalnya Arab) tetap tampil.
+        
         Args:
             text (str): Teks yang akan diekspor
             output_path (str): Path untuk menyimpan file
             title (str, optional): Judul dokumen
+            font_path (str, optional): Path ke file font TTF/OTF
+            fontsize (float): Ukuran font teks (default: 11)
+            right_to_left (bool): Tulis teks dari kanan ke kiri (default: False)
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        return self.export_pdf_batch([(title, text)], output_path, font_path=font_path,
+                                     fontsize=fontsize, right_to_left=right_to_left)
+    
+    @metrics.timed('export', format='pdf', method='export_pdf_batch')
+    def export_pdf_batch(self, documents, output_path, font_path=None, fontsize=11, right_to_left=False):
+        """
+        Mengekspor teks banyak dokumen ke satu file PDF
+        
+        Setiap dokumen dimulai di halaman baru dan dicatat sebagai bookmark.
+        
+        Args:
+            documents (iterable): Tuple (judul, teks) per dokumen
+            output_path (str): Path untuk menyimpan file
+            font_path (str, optional): Path ke file font TTF/OTF
+            fontsize (float): Ukuran font teks (default: 11)
+            right_to_left (bool): Tulis teks dari kanan ke kiri (default: False)
             
         Returns:
             bool: True jika berhasil
         """
         try:
-            # Buat objek PDF
-            pdf = FPDF()
-            pdf.add_page()
-            
-            # Atur font
-            pdf.set_font("Arial", size=12)
-            
-            # Tambahkan judul jika ada
-            if title:
-                pdf.set_font("Arial", 'B', 16)
-                pdf.cell(200, 10, txt=title, ln=True, align='C')
-                pdf.ln(10)
-                pdf.set_font("Arial", size=12)
-            
-            # Tambahkan teks
-            # Pisahkan teks menjadi baris-baris
-            lines = text.split('\n')
-            for line in lines:
-                # Pecah baris panjang
-                pdf.multi_cell(0, 10, txt=line)
+            font = self._pdf_font(font_path)
+            pdf = fitz.open()
+            
+            toc = []
+            for title, text in documents:
+                first_page = self._layout_pdf(pdf, text, title, font, fontsize, right_to_left)
+                if title:
+                    toc.append([1, title, first_page + 1])
+            
+            if toc:
+                pdf.set_toc(toc)
             
             # Simpan PDF
-            pdf.output(output_path)
+            pdf.save(output_path, deflate=True)
+            pdf.close()
             return True
         except Exception as e:
             raise Exception(f"Error saat mengekspor ke PDF: {str(e)}")
     
+    @metrics.timed('export', format='xml', method='export_xml')
     def export_xml(self, data, output_path, root_name='document'):
         """
         Mengekspor data ke file XML
@@ -160,25 +445,344 @@ class ExportManager:
             if not isinstance(data, pd.DataFrame):
                 raise ValueError("Data harus berupa pandas DataFrame")
             
-            # Buat elemen root
-            root = ET.Element(root_name)
+            # Tulis secara streaming tanpa membangun pohon XML di memori
+            return self.stream_xml([data], output_path, root_name=root_name)
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke XML: {str(e)}")
+    
+    @metrics.timed('export', format='xml', method='stream_xml')
+    def stream_xml(self, pages, output_path, root_name='document'):
+        """
+        Mengekspor hasil banyak halaman ke file XML secara bertahap
+        
+        Setiap potongan baris diformat secara vektor lalu langsung ditulis,
+        sehingga pemakaian memori tetap walaupun jumlah kata sangat besar.
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            output_path (str): Path untuk menyimpan file
+            root_name (str): Nama elemen root (default: 'document')
             
-            # Konversi setiap baris ke elemen XML
-            for _, row in data.iterrows():
-                item = ET.SubElement(root, 'item')
-                for col, value in row.items():
-                    if pd.notna(value):
-                        child = ET.SubElement(item, col)
-                        child.text = str(value)
+        Returns:
+            bool: True jika berhasil
+        """
+        try:
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(f'<?xml version="1.0" ?>\n<{root_name}>\n')
+                
+                for chunk in self._iter_pages(pages):
+                    if chunk.empty:
+                        continue
+                    
+                    # Bangun elemen setiap kolom untuk semua baris sekaligus
+                    rows = pd.Series('  <item>\n', index=chunk.index)
+                    for col in chunk.columns:
+                        values = chunk[col]
+                        element = f'    <{col}>' + self._xml_escape(values) + f'</{col}>\n'
+                        rows = rows + element.where(values.notna(), '')
+                    rows = rows + '  </item>\n'
+                    
+                    f.write(''.join(rows.tolist()))
+                
+                f.write(f'</{root_name}>\n')
+            
+            return True
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke XML: {str(e)}")
+    
+    @metrics.timed('export', format='jsonl', method='stream_jsonl')
+    def stream_jsonl(self, pages, output_path):
+        """
+        Mengekspor hasil banyak halaman ke file JSON Lines secara bertahap
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            output_path (str): Path untuk menyimpan file
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        try:
+            with open(output_path, "w", encoding="utf-8") as f:
+                for chunk in self._iter_pages(pages):
+                    if chunk.empty:
+                        continue
+                    
+                    lines = chunk.to_json(orient='records', lines=True, force_ascii=False)
+                    f.write(lines if lines.endswith('\n') else lines + '\n')
+            
+            return True
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke JSONL: {str(e)}")
+    
+    @metrics.timed('export', format='csv', method='stream_csv')
+    def stream_csv(self, pages, output_path, delimiter=','):
+        """
+        Mengekspor hasil banyak halaman ke file CSV secara bertahap
+        
+        Kolom ditentukan oleh halaman pertama; halaman berikutnya disesuaikan
+        ke kolom yang sama agar file tetap konsisten.
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            output_path (str): Path untuk menyimpan file
+            delimiter (str): Karakter pemisah (default: ',')
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        try:
+            columns = None
+            with open(output_path, "w", encoding="utf-8", newline='') as f:
+                for chunk in self._iter_pages(pages):
+                    if columns is None:
+                        columns = list(chunk.columns)
+                        chunk.to_csv(f, index=False, sep=delimiter)
+                    else:
+                        chunk.reindex(columns=columns).to_csv(f, index=False, header=False, sep=delimiter)
+            
+            return True
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke CSV: {str(e)}")
+    
+    @metrics.timed('export', format='columnar', method='export_columnar')
+    def export_columnar(self, pages, output_dir, fmt='parquet', partition=None):
+        """
+        Mengekspor hasil OCR banyak dokumen ke dataset kolumnar (Parquet atau Arrow IPC)
+        
+        Args:
+            pages (iterable): Tuple (doc_id, nomor_halaman, DataFrame) per halaman
+            output_dir (str): Folder dataset
+            fmt (str): Format file: 'parquet' atau 'arrow' (default: 'parquet')
+            partition (str, optional): Nilai partisi batch. Default tanggal hari ini.
+            
+        Returns:
+            list: Daftar path file yang ditulis
+        """
+        try:
+            # pyarrow hanya dibutuhkan untuk ekspor kolumnar
+            from .columnar_export import ColumnarBatchWriter
+            
+            with ColumnarBatchWriter(output_dir, fmt=fmt, partition=partition) as writer:
+                for doc_id, page, data in pages:
+                    writer.write_page(doc_id, page, data)
+            
+            return writer.files
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke format kolumnar: {str(e)}")
+    
+    @metrics.timed('export', format='index', method='export_index')
+    def export_index(self, pages, index_path, doc_key, path=None):
+        """
+        Menambahkan hasil OCR satu dokumen ke indeks pencarian SQLite FTS5
+        
+        Args:
+            pages (iterable): Tuple (nomor_halaman, teks, DataFrame image_to_data) per halaman
+            index_path (str): Path ke file database indeks
+            doc_key (str): Kunci unik dokumen; dokumen dengan kunci sama akan diganti
+            path (str, optional): Path file sumber
             
-            # Buat XML tree
-            tree = ET.ElementTree(root)
+        Returns:
+            bool: True jika berhasil
+        """
+        from .search_index import SearchIndex
+        
+        with SearchIndex(index_path) as index:
+            index.add_document(doc_key, pages, path=path)
+        return True
+    
+    def _layout_page(self, data):
+        """
+        Menyusun hierarki blok, paragraf, baris, dan kata dari data TSV Tesseract satu halaman
+        
+        Args:
+            data (DataFrame): Data hasil image_to_data (boleh berisi semua level)
             
-            # Tulis ke file dengan format yang rapi
-            xmlstr = md.parseString(ET.tostring(root)).toprettyxml(indent="  ")
+        Returns:
+            tuple: (bbox halaman, daftar blok). Setiap blok, paragraf, dan baris
+                   berupa [nomor, bbox, anak]; kata berupa (bbox, conf, teks).
+                   bbox berupa (x0, y0, x1, y1).
+        """
+        words = data[data['level'] == 5] if 'level' in data.columns else data
+        words = words[words['text'].notna()]
+        words = words[words['text'].astype(str).str.strip() != '']
+        words = words.sort_values(['block_num', 'par_num', 'line_num', 'word_num'])
+        
+        columns = ['block_num', 'par_num', 'line_num', 'left', 'top', 'width', 'height', 'conf', 'text']
+        blocks = []
+        for block, par, line, left, top, width, height, conf, text in words[columns].itertuples(index=False, name=None):
+            if not blocks or blocks[-1][0] != block:
+                blocks.append([block, None, []])
+            pars = blocks[-1][2]
+            if not pars or pars[-1][0] != par:
+                pars.append([par, None, []])
+            lines = pars[-1][2]
+            if not lines or lines[-1][0] != line:
+                lines.append([line, None, []])
+            lines[-1][2].append(((int(left), int(top), int(left + width), int(top + height)),
+                                 float(conf), str(text)))
+        
+        def union(boxes):
+            x0s, y0s, x1s, y1s = zip(*boxes)
+            return min(x0s), min(y0s), max(x1s), max(y1s)
+        
+        # bbox setiap tingkat adalah gabungan bbox anak-anaknya
+        for block in blocks:
+            for par in block[2]:
+                for line in par[2]:
+                    line[1] = union([word[0] for word in line[2]])
+                par[1] = union([line[1] for line in par[2]])
+            block[1] = union([par[1] for par in block[2]])
+        
+        # Ukuran halaman diambil dari baris level 1 jika ada
+        page_rows = data[data['level'] == 1] if 'level' in data.columns else data.iloc[0:0]
+        if not page_rows.empty:
+            row = page_rows.iloc[0]
+            page_box = (0, 0, int(row['left'] + row['width']), int(row['top'] + row['height']))
+        elif blocks:
+            page_box = (0, 0) + union([block[1] for block in blocks])[2:]
+        else:
+            page_box = (0, 0, 0, 0)
+        
+        return page_box, blocks
+    
+    @metrics.timed('export', format='hocr', method='stream_hocr')
+    def stream_hocr(self, pages, output_path, image_name=''):
+        """
+        Mengekspor hasil OCR ke hOCR secara bertahap per halaman
+        
+        Hierarki dibangun langsung dari data TSV image_to_data (sebaiknya dengan
+        words_only=False), sehingga tidak perlu menjalankan OCR ulang.
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            output_path (str): Path untuk menyimpan file
+            image_name (str): Nama gambar sumber yang dicatat di setiap halaman
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        def title(box, extra=''):
+            return quoteattr(f"bbox {box[0]} {box[1]} {box[2]} {box[3]}{extra}")
+        
+        try:
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN"\n'
+                        '    "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+                        '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+                        ' <head>\n'
+                        '  <title></title>\n'
+                        '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+                        '  <meta name="ocr-system" content="tesseract"/>\n'
+                        '  <meta name="ocr-capabilities" content="ocr_page ocr_carea ocr_par ocr_line ocrx_word"/>\n'
+                        ' </head>\n'
+                        ' <body>\n')
+                
+                for index, (page_num, data) in enumerate(self._iter_page_frames(pages), 1):
+                    page_num = page_num or index
+                    page_box, blocks = self._layout_page(data)
+                    
+                    # Setiap halaman diformat dan ditulis sendiri agar memori tetap kecil
+                    page_title = title(page_box, '; image "%s"; ppageno %d' % (image_name, page_num - 1))
+                    out = [f'  <div class="ocr_page" id="page_{page_num}" title={page_title}>\n']
+                    for block_num, block_box, pars in blocks:
+                        bid = f"{page_num}_{block_num}"
+                        out.append(f'   <div class="ocr_carea" id="block_{bid}" title={title(block_box)}>\n')
+                        for par_num, par_box, lines in pars:
+                            pid = f"{bid}_{par_num}"
+                            out.append(f'    <p class="ocr_par" id="par_{pid}" title={title(par_box)}>\n')
+                            for line_num, line_box, words in lines:
+                                lid = f"{pid}_{line_num}"
+                                out.append(f'     <span class="ocr_line" id="line_{lid}" title={title(line_box)}>')
+                                out.extend(
+                                    f'<span class="ocrx_word" id="word_{lid}_{i}" '
+                                    f'title={title(box, f"; x_wconf {int(round(conf))}")}>{escape(text)}</span> '
+                                    for i, (box, conf, text) in enumerate(words, 1)
+                                )
+                                out.append('</span>\n')
+                            out.append('    </p>\n')
+                        out.append('   </div>\n')
+                    out.append('  </div>\n')
+                    f.write(''.join(out))
+                
+                f.write(' </body>\n</html>\n')
+            
+            return True
+        except Exception as e:
+            raise Exception(f"Error saat mengekspor ke hOCR: {str(e)}")
+    
+    @metrics.timed('export', format='alto', method='stream_alto')
+    def stream_alto(self, pages, output_path, image_name=''):
+        """
+        Mengekspor hasil OCR ke ALTO XML v4 secara bertahap per halaman
+        
+        ALTO tidak memiliki tingkat paragraf, sehingga setiap paragraf Tesseract
+        menjadi satu TextBlock.
+        
+        Args:
+            pages (iterable): DataFrame per halaman, atau tuple (nomor_halaman, DataFrame)
+            output_path (str): Path untuk menyimpan file
+            image_name (str): Nama gambar sumber
+            
+        Returns:
+            bool: True jika berhasil
+        """
+        def geometry(box):
+            return f'HPOS="{box[0]}" VPOS="{box[1]}" WIDTH="{box[2] - box[0]}" HEIGHT="{box[3] - box[1]}"'
+        
+        try:
             with open(output_path, "w", encoding="utf-8") as f:
-                f.write(xmlstr)
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#"\n'
+                        '      xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"\n'
+                        '      xsi:schemaLocation="http://www.loc.gov/standards/alto/ns-v4# '
+                        'http://www.loc.gov/alto/v4/alto-4-2.xsd">\n'
+                        ' <Description>\n'
+                        '  <MeasurementUnit>pixel</MeasurementUnit>\n'
+                        '  <sourceImageInformation>\n'
+                        f'   <fileName>{escape(image_name)}</fileName>\n'
+                        '  </sourceImageInformation>\n'
+                        '  <OCRProcessing ID="OCR_0">\n'
+                        '   <ocrProcessingStep>\n'
+                        '    <processingSoftware>\n'
+                        '     <softwareName>tesseract</softwareName>\n'
+                        '    </processingSoftware>\n'
+                        '   </ocrProcessingStep>\n'
+                        '  </OCRProcessing>\n'
+                        ' </Description>\n'
+                        ' <Layout>\n')
+                
+                for index, (page_num, data) in enumerate(self._iter_page_frames(pages), 1):
+                    page_num = page_num or index
+                    page_box, blocks = self._layout_page(data)
+                    width, height = page_box[2], page_box[3]
+                    
+                    out = [f'  <Page ID="page_{page_num}" PHYSICAL_IMG_NR="{page_num}" '
+                           f'WIDTH="{width}" HEIGHT="{height}">\n',
+                           f'   <PrintSpace {geometry(page_box)}>\n']
+                    for block_num, _, pars in blocks:
+                        for par_num, par_box, lines in pars:
+                            pid = f"{page_num}_{block_num}_{par_num}"
+                            out.append(f'    <TextBlock ID="block_{pid}" {geometry(par_box)}>\n')
+                            for line_num, line_box, words in lines:
+                                lid = f"{pid}_{line_num}"
+                                out.append(f'     <TextLine ID="line_{lid}" {geometry(line_box)}>\n')
+                                for i, (box, conf, text) in enumerate(words, 1):
+                                    if i > 1:
+                                        # Spasi antar kata diletakkan di celah setelah kata sebelumnya
+                                        prev = words[i - 2][0]
+                                        out.append(f'      <SP WIDTH="{max(0, box[0] - prev[2])}" '
+                                                   f'HPOS="{prev[2]}" VPOS="{prev[1]}"/>\n')
+                                    out.append(f'      <String ID="string_{lid}_{i}" {geometry(box)} '
+                                               f'WC="{max(conf, 0) / 100:.2f}" CONTENT={quoteattr(text)}/>\n')
+                                out.append('     </TextLine>\n')
+                            out.append('    </TextBlock>\n')
+                    out.append('   </PrintSpace>\n  </Page>\n')
+                    f.write(''.join(out))
+                
+                f.write(' </Layout>\n</alto>\n')
             
             return True
         except Exception as e:
-            raise Exception(f"Error saat mengekspor ke XML: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error saat mengekspor ke ALTO: {str(e)}")
\ No newline at end of file
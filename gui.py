@@ -1,21 +1,31 @@
 import os
 import sys
+import shutil
+import tempfile
+from collections import OrderedDict
+import cv2
+import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QPushButton, QFileDialog, QTabWidget, QTextEdit, 
                             QComboBox, QSpinBox, QCheckBox, QMessageBox, QProgressBar,
-                            QStatusBar, QToolBar, QMenu, QMenuBar, QSplitter)
+                            QStatusBar, QToolBar, QMenu, QMenuBar, QSplitter,
+                            QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView,
+                            QListWidget, QListWidgetItem)
 from PyQt6.QtGui import QPixmap, QImage, QAction, QIcon
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize, QPoint, QTimer, QEvent
 
 from .ocr_engine import OCREngine
 from .image_processor import ImageProcessor
-from .pdf_handler import PDFHandler
+from .pdf_handler import PDFHandler, PDFDocument
 from .webcam_capture import WebcamCapture
 from .export_manager import ExportManager
+from .preprocess_tuner import PreprocessTuner
+from .preprocess_cache import PreprocessCache
+from .batch_processor import BatchProcessor, collect_files
 
 class OCRWorker(QThread):
     """Thread terpisah untuk menjalankan OCR agar UI tetap responsif"""
-    finished = pyqtSignal(str)
+    finished = pyqtSignal(dict)
     progress = pyqtSignal(int)
     error = pyqtSignal(str)
     
@@ -28,18 +38,330 @@ class OCRWorker(QThread):
         
     def run(self):
         try:
-            # Simulasi progress
             self.progress.emit(10)
             
-            # Jalankan OCR
-            result = self.ocr_engine.image_to_text(self.image_path, self.lang, self.config)
+            # Sumber berupa fungsi (misalnya render halaman PDF) dijalankan di thread ini
+            if callable(self.image_path):
+                self.image_path = self.image_path()
+            
+            # Satu kali OCR: teks disusun dari data terstruktur, tidak perlu OCR kedua
+            data = self.ocr_engine.image_to_data(self.image_path, self.lang, self.config, words_only=False)
+            self.progress.emit(90)
+            
+            text = self.ocr_engine.data_to_text(data)
+            words = data.dropna(subset=['text']).reset_index(drop=True)
             
             self.progress.emit(100)
-            self.finished.emit(result)
+            self.finished.emit({'text': text, 'data': words})
+        except Exception as e:
+            self.error.emit(str(e))
+
+class TaskWorker(QThread):
+    """Thread untuk menjalankan fungsi berat (OpenCV, PyMuPDF, ekspor) di luar thread UI"""
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+    
+    def run(self):
+        try:
+            self.finished.emit(self.func(*self.args, **self.kwargs))
+        except Exception as e:
+            self.error.emit(str(e))
+
+class BatchWorker(QThread):
+    """Thread untuk mengendalikan pool proses batch agar UI tetap responsif"""
+    file_progress = pyqtSignal(str, int, int)
+    file_finished = pyqtSignal(dict)
+    progress = pyqtSignal(dict)
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, processor, files):
+        super().__init__()
+        self.processor = processor
+        self.files = files
+    
+    def run(self):
+        try:
+            stats = self.processor.run(
+                self.files,
+                on_file_progress=self.file_progress.emit,
+                on_progress=self.progress.emit,
+                on_file_done=self.file_finished.emit
+            )
+            self.finished.emit(stats)
         except Exception as e:
             self.error.emit(str(e))
 
+class BatchPanel(QWidget):
+    """Panel untuk menjalankan OCR pada banyak file sekaligus"""
+    
+    # Checkbox format ekspor: (kunci EXPORT_FORMATS, label)
+    FORMATS = [("text", "Teks"), ("excel", "Excel"), ("pdf", "PDF"), ("jsonl", "JSONL"), ("hocr", "hOCR")]
+    
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window
+        self.files = []
+        self.rows = {}
+        self.worker = None
+        self.processor = None
+        
+        layout = QVBoxLayout(self)
+        
+        # Pilihan file sumber
+        source_controls = QHBoxLayout()
+        
+        self.add_folder_btn = QPushButton("Tambah Folder")
+        self.add_folder_btn.clicked.connect(self.add_folder)
+        source_controls.addWidget(self.add_folder_btn)
+        
+        self.add_files_btn = QPushButton("Tambah File")
+        self.add_files_btn.clicked.connect(self.add_files)
+        source_controls.addWidget(self.add_files_btn)
+        
+        self.clear_btn = QPushButton("Kosongkan")
+        self.clear_btn.clicked.connect(self.clear_files)
+        source_controls.addWidget(self.clear_btn)
+        
+        layout.addLayout(source_controls)
+        
+        # Folder output dan format ekspor
+        output_controls = QHBoxLayout()
+        
+        output_controls.addWidget(QLabel("Output:"))
+        self.output_edit = QLineEdit(os.path.abspath("output"))
+        output_controls.addWidget(self.output_edit)
+        
+        self.output_btn = QPushButton("Pilih...")
+        self.output_btn.clicked.connect(self.choose_output)
+        output_controls.addWidget(self.output_btn)
+        
+        layout.addLayout(output_controls)
+        
+        format_controls = QHBoxLayout()
+        
+        self.format_cbs = {}
+        for key, label in self.FORMATS:
+            checkbox = QCheckBox(label)
+            checkbox.setChecked(key == "text")
+            format_controls.addWidget(checkbox)
+            self.format_cbs[key] = checkbox
+        
+        format_controls.addWidget(QLabel("Worker:"))
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setValue(max(1, os.cpu_count() or 1))
+        format_controls.addWidget(self.workers_spin)
+        
+        layout.addLayout(format_controls)
+        
+        # Daftar file dengan status per file
+        self.file_table = QTableWidget(0, 3)
+        self.file_table.setHorizontalHeaderLabels(["File", "Status", "Halaman"])
+        self.file_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.file_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.file_table)
+        
+        # Progress keseluruhan, throughput, dan ETA
+        self.overall_bar = QProgressBar()
+        self.overall_bar.setRange(0, 100)
+        self.overall_bar.setValue(0)
+        layout.addWidget(self.overall_bar)
+        
+        self.stats_label = QLabel("Belum ada file")
+        layout.addWidget(self.stats_label)
+        
+        # Kontrol batch
+        run_controls = QHBoxLayout()
+        
+        self.start_btn = QPushButton("Mulai Batch")
+        self.start_btn.clicked.connect(self.start_batch)
+        self.start_btn.setEnabled(False)
+        run_controls.addWidget(self.start_btn)
+        
+        self.pause_btn = QPushButton("Jeda")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.pause_btn.setEnabled(False)
+        run_controls.addWidget(self.pause_btn)
+        
+        self.cancel_btn = QPushButton("Batal")
+        self.cancel_btn.clicked.connect(self.cancel_batch)
+        self.cancel_btn.setEnabled(False)
+        run_controls.addWidget(self.cancel_btn)
+        
+        layout.addLayout(run_controls)
+    
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Pilih Folder")
+        if folder:
+            self.add_sources([folder])
+    
+    def add_files(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Pilih File", "", "Gambar dan PDF (*.png *.jpg *.jpeg *.bmp *.tif *.tiff *.pdf)"
+        )
+        if file_paths:
+            self.add_sources(file_paths)
+    
+    def add_sources(self, sources):
+        for path in collect_files(sources):
+            if path in self.rows:
+                continue
+            
+            row = self.file_table.rowCount()
+            self.file_table.insertRow(row)
+            self.file_table.setItem(row, 0, QTableWidgetItem(path))
+            self.file_table.setItem(row, 1, QTableWidgetItem("Menunggu"))
+            self.file_table.setItem(row, 2, QTableWidgetItem(""))
+            self.files.append(path)
+            self.rows[path] = row
+        
+        self.start_btn.setEnabled(bool(self.files))
+        self.stats_label.setText(f"{len(self.files)} file dalam antrean")
+    
+    def clear_files(self):
+        self.files = []
+        self.rows = {}
+        self.file_table.setRowCount(0)
+        self.overall_bar.setValue(0)
+        self.start_btn.setEnabled(False)
+        self.stats_label.setText("Belum ada file")
+    
+    def choose_output(self):
+        folder = QFileDialog.getExistingDirectory(self, "Pilih Folder Output", self.output_edit.text())
+        if folder:
+            self.output_edit.setText(folder)
+    
+    def set_running(self, running):
+        self.start_btn.setEnabled(not running and bool(self.files))
+        self.pause_btn.setEnabled(running)
+        self.cancel_btn.setEnabled(running)
+        for widget in (self.add_folder_btn, self.add_files_btn, self.clear_btn, self.output_btn):
+            widget.setEnabled(not running)
+    
+    def start_batch(self):
+        formats = [key for key, checkbox in self.format_cbs.items() if checkbox.isChecked()]
+        if not formats:
+            QMessageBox.warning(self, "Peringatan", "Pilih minimal satu format ekspor")
+            return
+        
+        # Pengaturan OCR dan pemrosesan diambil dari panel utama
+        self.processor = BatchProcessor(
+            self.output_edit.text(),
+            formats=formats,
+            workers=self.workers_spin.value(),
+            lang=self.main_window.lang_combo.currentText(),
+            config=self.main_window.get_ocr_config(),
+            steps=self.main_window.get_pipeline_steps(),
+            export_manager=self.main_window.export_manager
+        )
+        
+        for path, row in self.rows.items():
+            self.file_table.item(row, 1).setText("Menunggu")
+            self.file_table.item(row, 2).setText("")
+        self.overall_bar.setValue(0)
+        self.pause_btn.setText("Jeda")
+        self.set_running(True)
+        
+        self.worker = BatchWorker(self.processor, list(self.files))
+        self.worker.file_progress.connect(self.update_file_progress)
+        self.worker.file_finished.connect(self.file_finished)
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished.connect(self.batch_finished)
+        self.worker.error.connect(self.batch_error)
+        self.worker.start()
+    
+    def toggle_pause(self):
+        if self.processor is None:
+            return
+        
+        if self.processor.is_paused:
+            self.processor.resume()
+            self.pause_btn.setText("Jeda")
+        else:
+            self.processor.pause()
+            self.pause_btn.setText("Lanjutkan")
+    
+    def cancel_batch(self):
+        if self.processor is not None:
+            self.processor.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.stats_label.setText("Membatalkan, menunggu file yang sedang berjalan...")
+    
+    def update_file_progress(self, path, page, total):
+        row = self.rows.get(path)
+        if row is None:
+            return
+        
+        self.file_table.item(row, 1).setText(f"Memproses {page * 100 // max(total, 1)}%")
+        self.file_table.item(row, 2).setText(f"{page}/{total}")
+    
+    def file_finished(self, result):
+        row = self.rows.get(result['path'])
+        if row is None:
+            return
+        
+        if result['status'] == 'ok':
+            self.file_table.item(row, 1).setText(f"Selesai ({result['seconds']:.1f} dtk)")
+        else:
+            self.file_table.item(row, 1).setText(f"Gagal: {result['error']}")
+        self.file_table.item(row, 2).setText(str(result['pages']))
+    
+    def update_progress(self, stats):
+        finished = stats['done'] + stats['failed']
+        self.overall_bar.setValue(int(finished * 100 / max(stats['total'], 1)))
+        
+        eta = "-"
+        if stats['eta'] is not None:
+            minutes, seconds = divmod(int(stats['eta']), 60)
+            hours, minutes = divmod(minutes, 60)
+            eta = f"{hours:d}:{minutes:02d}:{seconds:02d}"
+        
+        status = " (dijeda)" if stats['paused'] else ""
+        self.stats_label.setText(
+            f"{finished}/{stats['total']} file, {stats['failed']} gagal{status} | "
+            f"{stats['files_per_sec'] * 60:.1f} file/menit, {stats['pages_per_sec']:.2f} halaman/detik | "
+            f"ETA {eta}"
+        )
+    
+    def batch_finished(self, stats):
+        self.update_progress(stats)
+        self.set_running(False)
+        
+        message = f"Batch selesai: {stats['done']} berhasil, {stats['failed']} gagal"
+        if stats['cancelled']:
+            message += f", {stats['cancelled']} dibatalkan"
+        self.main_window.status_bar.showMessage(message)
+    
+    def batch_error(self, error_msg):
+        self.set_running(False)
+        QMessageBox.warning(self, "Error Batch", f"Error saat menjalankan batch: {error_msg}")
+
 class MainWindow(QMainWindow):
+    # DPI render halaman PDF untuk pemrosesan dan OCR
+    OCR_DPI = 300
+    
+    # Ukuran sisi terpanjang thumbnail halaman PDF
+    THUMBNAIL_SIZE = 96
+    
+    # Resolusi maksimum gambar yang dimuat hanya untuk ditampilkan
+    DISPLAY_MAX_SIDE = 2048
+    
+    # Jumlah ukuran label yang hasil skalanya disimpan
+    SCALED_CACHE_SIZE = 4
+    
+    # Resolusi proxy untuk pratinjau pemrosesan langsung
+    PREVIEW_MAX_SIDE = 1024
+    
+    # Jeda (ms) setelah perubahan pengaturan terakhir sebelum pratinjau dijalankan
+    PREVIEW_DELAY = 250
+    
     def __init__(self):
         super().__init__()
         
@@ -49,11 +371,42 @@ class MainWindow(QMainWindow):
         self.pdf_handler = PDFHandler(self.ocr_engine)
         self.webcam = WebcamCapture()
         self.export_manager = ExportManager()
+        self.tuner = PreprocessTuner(self.ocr_engine, self.image_processor)
+        self.preprocess_cache = PreprocessCache(self.image_processor)
         
         # Variabel untuk menyimpan path gambar saat ini
         self.current_image_path = None
         self.processed_image = None
         
+        # Hasil OCR terstruktur terakhir, dipakai ulang untuk tab data dan ekspor Excel
+        self.ocr_data = None
+        
+        # Dokumen PDF yang sedang dibuka; halaman dirender sesuai permintaan
+        self.pdf_document = None
+        self.pdf_page = 0
+        self.pdf_temp_dir = None
+        self.thumbnails_requested = set()
+        
+        # Bertambah setiap sumber gambar berganti, untuk mengabaikan hasil worker yang usang
+        self.source_id = 0
+        
+        # Gambar yang sedang ditampilkan: buffer numpy harus tetap hidup selama QImage dipakai
+        self.display_buffer = None
+        self.display_qimage = None
+        self.display_generation = 0
+        self.scaled_pixmaps = OrderedDict()
+        
+        # Pratinjau pemrosesan langsung pada proxy resolusi rendah
+        self.preview_proxy = None
+        # Pipeline hasil tuning untuk sumber aktif: (source_id, langkah atau None)
+        self.preview_profile = None
+        self.preview_generation = 0
+        self.preview_running = False
+        self.preview_pending = False
+        
+        # Worker latar belakang yang sedang berjalan (disimpan agar tidak di-garbage collect)
+        self.task_workers = set()
+        
         # Setup UI
         self.init_ui()
         
@@ -88,6 +441,49 @@ class MainWindow(QMainWindow):
         self.image_label.setStyleSheet("border: 1px solid #cccccc; background-color: #f5f5f5;")
         left_layout.addWidget(self.image_label)
         
+        # Skala ulang gambar setelah ukuran label berhenti berubah
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(80)
+        self.resize_timer.timeout.connect(self.update_display)
+        self.image_label.installEventFilter(self)
+        
+        # Thumbnail dan navigasi halaman PDF (hanya tampil saat PDF dibuka)
+        self.thumb_list = QListWidget()
+        self.thumb_list.setViewMode(QListWidget.ViewMode.IconMode)
+        self.thumb_list.setFlow(QListWidget.Flow.LeftToRight)
+        self.thumb_list.setWrapping(False)
+        self.thumb_list.setIconSize(QSize(self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE))
+        self.thumb_list.setFixedHeight(self.THUMBNAIL_SIZE + 40)
+        self.thumb_list.currentRowChanged.connect(self.show_pdf_page)
+        self.thumb_list.horizontalScrollBar().valueChanged.connect(self.load_visible_thumbnails)
+        self.thumb_list.hide()
+        left_layout.addWidget(self.thumb_list)
+        
+        self.page_nav = QWidget()
+        page_nav_layout = QHBoxLayout(self.page_nav)
+        page_nav_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.prev_page_btn = QPushButton("< Sebelumnya")
+        self.prev_page_btn.clicked.connect(lambda: self.show_pdf_page(self.pdf_page - 1))
+        page_nav_layout.addWidget(self.prev_page_btn)
+        
+        page_nav_layout.addWidget(QLabel("Halaman:"))
+        self.page_spin = QSpinBox()
+        self.page_spin.setMinimum(1)
+        self.page_spin.valueChanged.connect(lambda value: self.show_pdf_page(value - 1))
+        page_nav_layout.addWidget(self.page_spin)
+        
+        self.page_count_label = QLabel("/ 0")
+        page_nav_layout.addWidget(self.page_count_label)
+        
+        self.next_page_btn = QPushButton("Berikutnya >")
+        self.next_page_btn.clicked.connect(lambda: self.show_pdf_page(self.pdf_page + 1))
+        page_nav_layout.addWidget(self.next_page_btn)
+        
+        self.page_nav.hide()
+        left_layout.addWidget(self.page_nav)
+        
         # Kontrol gambar
         image_controls = QHBoxLayout()
         
@@ -152,8 +548,20 @@ class MainWindow(QMainWindow):
         self.deskew_cb.setChecked(True)
         img_proc_settings.addWidget(self.deskew_cb)
         
+        self.autotune_cb = QCheckBox("Otomatis")
+        self.autotune_cb.setToolTip("Pilih pemrosesan terbaik berdasarkan profil kelas dokumen")
+        img_proc_settings.addWidget(self.autotune_cb)
+        
         left_layout.addLayout(img_proc_settings)
         
+        # Pratinjau langsung setelah pengaturan berhenti berubah
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(self.PREVIEW_DELAY)
+        self.preview_timer.timeout.connect(self.start_preview)
+        for checkbox in (self.grayscale_cb, self.denoise_cb, self.threshold_cb, self.deskew_cb, self.autotune_cb):
+            checkbox.stateChanged.connect(self.schedule_preview)
+        
         # Tombol OCR
         self.ocr_btn = QPushButton("Jalankan OCR")
         self.ocr_btn.clicked.connect(self.run_ocr)
@@ -183,6 +591,10 @@ class MainWindow(QMainWindow):
         self.data_result.setReadOnly(True)
         self.result_tabs.addTab(self.data_result, "Data")
         
+        # Tab batch
+        self.batch_panel = BatchPanel(self)
+        self.result_tabs.addTab(self.batch_panel, "Batch")
+        
         right_layout.addWidget(self.result_tabs)
         
         # Kontrol ekspor
@@ -249,6 +661,10 @@ class MainWindow(QMainWindow):
         webcam_action.triggered.connect(self.toggle_webcam)
         tools_menu.addAction(webcam_action)
         
+        batch_action = QAction("Batch Folder", self)
+        batch_action.triggered.connect(lambda: self.result_tabs.setCurrentWidget(self.batch_panel))
+        tools_menu.addAction(batch_action)
+        
         # Menu Help
         help_menu = menu_bar.addMenu("Help")
         
@@ -274,15 +690,50 @@ class MainWindow(QMainWindow):
         ocr_action.triggered.connect(self.run_ocr)
         toolbar.addAction(ocr_action)
         
+    def run_task(self, func, *args, on_finished=None, on_error=None, **kwargs):
+        """Menjalankan fungsi di TaskWorker dan meneruskan hasilnya lewat sinyal"""
+        worker = TaskWorker(func, *args, **kwargs)
+        if on_finished is not None:
+            worker.finished.connect(on_finished)
+        if on_error is not None:
+            worker.error.connect(on_error)
+        
+        # Lepaskan referensi worker setelah thread benar-benar selesai
+        worker.finished.connect(lambda _: self.release_task(worker))
+        worker.error.connect(lambda _: self.release_task(worker))
+        self.task_workers.add(worker)
+        worker.start()
+        return worker
+    
+    def release_task(self, worker):
+        # Sinyal dikirim di akhir run(), jadi wait() hanya menunggu sesaat
+        worker.wait()
+        self.task_workers.discard(worker)
+    
+    def reset_source(self):
+        """Membuang hasil pemrosesan dan OCR dari sumber gambar sebelumnya"""
+        self.source_id += 1
+        self.processed_image = None
+        self.ocr_data = None
+        self.preview_proxy = None
+        self.preview_profile = None
+        self.preview_generation += 1
+    
+    def set_current_image(self, image_path):
+        """Mengganti gambar aktif dan membuang hasil dari gambar sebelumnya"""
+        self.close_pdf()
+        self.reset_source()
+        self.current_image_path = image_path
+        self.display_image(image_path)
+        self.ocr_btn.setEnabled(True)
+    
     def load_image(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Buka Gambar", "", "Image Files (*.png *.jpg *.jpeg *.bmp *.tif *.tiff)"
         )
         
         if file_path:
-            self.current_image_path = file_path
-            self.display_image(file_path)
-            self.ocr_btn.setEnabled(True)
+            self.set_current_image(file_path)
             self.status_bar.showMessage(f"Gambar dimuat: {os.path.basename(file_path)}")
     
     def load_pdf(self):
@@ -291,82 +742,428 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
+            # Dokumen hanya dibuka; tidak ada halaman yang dirender di sini
             try:
-                # Konversi halaman pertama PDF ke gambar
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    image_paths = self.pdf_handler.convert_pdf_to_images(
-                        file_path, output_folder=temp_dir, output_format='png'
-                    )
-                    
-                    if image_paths and len(image_paths) > 0:
-                        self.current_image_path = image_paths[0]
-                        self.display_image(image_paths[0])
-                        self.ocr_btn.setEnabled(True)
-                        self.status_bar.showMessage(f"PDF dimuat: {os.path.basename(file_path)} (halaman 1)")
-                    else:
-                        QMessageBox.warning(self, "Error", "Gagal mengkonversi PDF ke gambar")
+                document = PDFDocument(file_path, self.pdf_handler)
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Error saat memuat PDF: {str(e)}")
+                return
+            
+            if document.page_count == 0:
+                document.close()
+                QMessageBox.warning(self, "Error", "PDF tidak memiliki halaman")
+                return
+            
+            self.close_pdf()
+            self.reset_source()
+            self.current_image_path = None
+            self.pdf_document = document
+            self.pdf_page = 0
+            self.pdf_temp_dir = tempfile.mkdtemp(prefix="ocr_pdf_")
+            self.thumbnails_requested = set()
+            
+            # Item thumbnail dibuat tanpa gambar; gambar dirender saat terlihat
+            self.thumb_list.blockSignals(True)
+            self.thumb_list.clear()
+            for index in range(document.page_count):
+                self.thumb_list.addItem(QListWidgetItem(str(index + 1)))
+            self.thumb_list.blockSignals(False)
+            
+            self.page_spin.blockSignals(True)
+            self.page_spin.setMaximum(document.page_count)
+            self.page_spin.blockSignals(False)
+            self.page_count_label.setText(f"/ {document.page_count}")
+            
+            self.thumb_list.show()
+            self.page_nav.show()
+            self.ocr_btn.setEnabled(True)
+            
+            self.show_pdf_page(0)
+            self.load_visible_thumbnails()
+            self.status_bar.showMessage(
+                f"PDF dimuat: {os.path.basename(file_path)} ({document.page_count} halaman)"
+            )
     
-    def display_image(self, image_path):
-        pixmap = QPixmap(image_path)
+    def close_pdf(self):
+        """Menutup dokumen PDF aktif dan menghapus gambar halaman sementara"""
+        if self.pdf_document is None:
+            return
+        
+        self.pdf_document.close()
+        self.pdf_document = None
+        if self.pdf_temp_dir:
+            shutil.rmtree(self.pdf_temp_dir, ignore_errors=True)
+            self.pdf_temp_dir = None
+        
+        self.thumb_list.blockSignals(True)
+        self.thumb_list.clear()
+        self.thumb_list.blockSignals(False)
+        self.thumb_list.hide()
+        self.page_nav.hide()
+    
+    def show_pdf_page(self, index):
+        """Menampilkan satu halaman PDF pada resolusi layar"""
+        document = self.pdf_document
+        if document is None or not 0 <= index < document.page_count:
+            return
         
-        # Skala gambar agar sesuai dengan label
-        pixmap = pixmap.scaled(
-            self.image_label.width(), self.image_label.height(),
-            Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+        if index != self.pdf_page:
+            self.reset_source()
+        self.pdf_page = index
+        
+        # Sinkronkan kontrol navigasi tanpa memicu show_pdf_page lagi
+        for widget, value in ((self.page_spin, index + 1), (self.thumb_list, index)):
+            widget.blockSignals(True)
+            if widget is self.page_spin:
+                widget.setValue(value)
+            else:
+                widget.setCurrentRow(value)
+            widget.blockSignals(False)
+        self.prev_page_btn.setEnabled(index > 0)
+        self.next_page_btn.setEnabled(index < document.page_count - 1)
+        
+        width, height = self.image_label.width(), self.image_label.height()
+        source_id = self.source_id
+        self.run_task(
+            document.render, index, width, height,
+            on_finished=lambda image: self.pdf_page_rendered(document, source_id, image),
+            on_error=lambda error_msg: self.status_bar.showMessage(f"Gagal merender halaman: {error_msg}")
         )
+    
+    def pdf_page_rendered(self, document, source_id, image):
+        # Abaikan halaman yang selesai dirender setelah pengguna berpindah halaman
+        if document is not self.pdf_document or source_id != self.source_id:
+            return
+        
+        self.show_array(image)
+        
+        # Render halaman tetangga di latar belakang agar navigasi terasa instan
+        document.prefetch([self.pdf_page + 1, self.pdf_page - 1],
+                          self.image_label.width(), self.image_label.height())
+    
+    def load_visible_thumbnails(self, *args):
+        """Merender thumbnail untuk item yang sedang terlihat saja"""
+        document = self.pdf_document
+        if document is None:
+            return
         
-        self.image_label.setPixmap(pixmap)
+        visible = self.thumb_list.viewport().rect()
+        first = max(self.thumb_list.indexAt(QPoint(1, visible.height() // 2)).row(), 0)
+        
+        indices = []
+        for index in range(first, document.page_count):
+            rect = self.thumb_list.visualItemRect(self.thumb_list.item(index))
+            if not rect.intersects(visible):
+                if indices or rect.left() > visible.right():
+                    break
+                continue
+            if index not in self.thumbnails_requested:
+                indices.append(index)
+        if not indices:
+            return
+        
+        self.thumbnails_requested.update(indices)
+        self.run_task(
+            lambda: [(i, document.thumbnail(i, self.THUMBNAIL_SIZE)) for i in indices],
+            on_finished=lambda thumbnails: self.thumbnails_loaded(document, thumbnails)
+        )
+    
+    def thumbnails_loaded(self, document, thumbnails):
+        if document is not self.pdf_document:
+            return
+        
+        for index, image in thumbnails:
+            item = self.thumb_list.item(index)
+            if item is not None:
+                qimage, _ = self.array_to_qimage(image)
+                item.setIcon(QIcon(QPixmap.fromImage(qimage)))
+    
+    def pdf_page_path(self, document, index):
+        """Merender halaman PDF pada resolusi OCR ke file sementara (dipanggil dari worker)"""
+        path = os.path.join(self.pdf_temp_dir, f"page_{index + 1}.png")
+        if not os.path.exists(path):
+            document.save_page_image(index, path, dpi=self.OCR_DPI)
+        return path
+    
+    def array_to_qimage(self, image):
+        """
+        Membungkus array OpenCV (BGR atau grayscale) sebagai QImage tanpa menyalin piksel
+        
+        QImage memakai buffer numpy secara langsung, jadi array yang dikembalikan
+        harus tetap direferensikan selama QImage dipakai.
+        
+        Returns:
+            tuple: (QImage, array buffer)
+        """
+        if image.ndim == 3 and image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        
+        # Hanya menyalin jika array belum kontigu (misalnya hasil potongan ROI)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        fmt = QImage.Format.Format_Grayscale8 if image.ndim == 2 else QImage.Format.Format_BGR888
+        
+        return QImage(image.data, width, height, image.strides[0], fmt), image
+    
+    def show_array(self, image):
+        """Menampilkan array di label langsung dari memori tanpa menulis file"""
+        self.display_qimage, self.display_buffer = self.array_to_qimage(image)
+        self.display_generation += 1
+        self.scaled_pixmaps.clear()
+        self.update_display()
+    
+    def update_display(self):
+        """Menampilkan gambar sesuai ukuran label, memakai hasil skala yang tersimpan jika ada"""
+        if self.display_qimage is None:
+            return
+        
+        size = (self.image_label.width(), self.image_label.height())
+        pixmap = self.scaled_pixmaps.get(size)
+        if pixmap is not None:
+            self.scaled_pixmaps.move_to_end(size)
+            self.image_label.setPixmap(pixmap)
+            return
+        
+        # Tampilkan skala cepat sementara; skala halus dikerjakan di thread terpisah
+        current = self.image_label.pixmap()
+        if current is not None and not current.isNull():
+            self.image_label.setPixmap(current.scaled(
+                size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.FastTransformation
+            ))
+        
+        # Buffer ikut ditangkap agar tetap hidup selama QImage diskalakan
+        generation = self.display_generation
+        qimage, buffer = self.display_qimage, self.display_buffer
+        self.run_task(
+            lambda: (buffer, qimage.scaled(size[0], size[1], Qt.AspectRatioMode.KeepAspectRatio,
+                                           Qt.TransformationMode.SmoothTransformation)),
+            on_finished=lambda result: self.display_scaled(generation, size, result[1])
+        )
+    
+    def display_scaled(self, generation, size, qimage):
+        # Abaikan hasil skala untuk gambar yang sudah diganti
+        if generation != self.display_generation:
+            return
+        
+        pixmap = QPixmap.fromImage(qimage)
+        self.scaled_pixmaps[size] = pixmap
+        while len(self.scaled_pixmaps) > self.SCALED_CACHE_SIZE:
+            self.scaled_pixmaps.popitem(last=False)
+        
+        if size == (self.image_label.width(), self.image_label.height()):
+            self.image_label.setPixmap(pixmap)
+    
+    def eventFilter(self, obj, event):
+        if obj is self.image_label and event.type() == QEvent.Type.Resize:
+            self.resize_timer.start()
+        return super().eventFilter(obj, event)
+    
+    def display_image(self, image_path):
+        """Memuat gambar dengan resolusi tampilan di thread terpisah lalu menampilkannya"""
+        source_id = self.source_id
+        self.run_task(
+            self.image_processor.load_preview, image_path, max_side=self.DISPLAY_MAX_SIDE,
+            on_finished=lambda image: self.show_array(image) if source_id == self.source_id else None,
+            on_error=lambda error_msg: self.status_bar.showMessage(f"Gagal menampilkan gambar: {error_msg}")
+        )
     
     def process_image(self):
-        if not self.current_image_path:
+        if not self.current_image_path and self.pdf_document is None:
             QMessageBox.warning(self, "Peringatan", "Tidak ada gambar yang dimuat")
             return
         
-        # Muat gambar
-        image = self.image_processor.load_image(self.current_image_path)
+        # Pengaturan dibaca di thread UI, pemrosesan berjalan di thread terpisah
+        image_path = self.current_image_path
+        if image_path is None:
+            # Halaman PDF baru dirender pada resolusi OCR saat benar-benar diproses
+            document, index = self.pdf_document, self.pdf_page
+            image_path = lambda: self.pdf_page_path(document, index)
+        autotune = self.autotune_cb.isChecked()
+        lang = self.lang_combo.currentText()
+        steps = self.get_pipeline_steps()
+        source_id = self.source_id
+        generation = self.preview_generation
+        
+        self.status_bar.showMessage("Memproses gambar...")
+        self.run_task(
+            self._process_image_task, image_path, steps, autotune, lang, source_id,
+            on_finished=lambda image: self.image_processed(source_id, generation, image),
+            on_error=lambda error_msg: QMessageBox.warning(
+                self, "Error", f"Error saat memproses gambar: {error_msg}")
+        )
+    
+    def _process_image_task(self, image_path, steps, autotune, lang, source_id):
+        """Menjalankan pipeline pemrosesan (dipanggil dari TaskWorker)"""
+        if callable(image_path):
+            image_path = image_path()
+        
+        # Tentukan pemrosesan berdasarkan profil otomatis atau checkbox
+        if autotune:
+            steps = self.tuner.get_pipeline([image_path], lang=lang)
+            # Profil yang baru di-tuning langsung berlaku untuk pratinjau
+            self.preview_profile = (source_id, steps)
+        
+        # Jalankan pipeline, memakai ulang hasil antara yang sudah tersimpan
+        return self.preprocess_cache.run(image_path, steps)
+    
+    def image_processed(self, source_id, generation, image):
+        # Abaikan hasil jika gambar atau pengaturan sudah berganti selama pemrosesan
+        if source_id != self.source_id or generation != self.preview_generation:
+            return
+        
+        # Hasil tetap di memori dan langsung dipakai untuk OCR
+        self.processed_image = image
+        self.ocr_data = None
+        
+        # Tampilkan gambar yang diproses
+        self.show_array(image)
+        self.status_bar.showMessage("Gambar telah diproses")
+    
+    def schedule_preview(self, *args):
+        """Menjadwalkan pratinjau ulang; perubahan beruntun hanya memicu satu run"""
+        # Hasil proses resolusi penuh tidak lagi sesuai dengan pengaturan baru
+        self.processed_image = None
+        self.preview_generation += 1
+        
+        if self.current_image_path or self.pdf_document is not None:
+            self.preview_timer.start()
+    
+    def start_preview(self):
+        if not self.current_image_path and self.pdf_document is None:
+            return
+        
+        # Hanya satu pratinjau berjalan; perubahan selama berjalan digabung ke run berikutnya
+        if self.preview_running:
+            self.preview_pending = True
+            return
+        
+        if self.current_image_path:
+            source = full_source = self.current_image_path
+        else:
+            document, index = self.pdf_document, self.pdf_page
+            source = lambda: document.render(index, self.PREVIEW_MAX_SIDE, self.PREVIEW_MAX_SIDE)
+            full_source = lambda: self.pdf_page_path(document, index)
+        
+        self.preview_running = True
+        self.status_bar.showMessage("Memperbarui pratinjau...")
+        self.run_task(
+            self._preview_task, source, self.source_id, self.preview_generation,
+            self.get_pipeline_steps(), self.autotune_cb.isChecked(), full_source,
+            on_finished=self.preview_finished,
+            on_error=self.preview_error
+        )
+    
+    def _tuned_steps(self, full_source, source_id):
+        """
+        Mencari pipeline hasil tuning untuk sumber aktif, sekali per sumber
+        
+        Profil dicari dari gambar resolusi penuh yang sama dengan yang dipakai
+        tuning; fingerprint proxy resolusi rendah tidak akan pernah cocok.
+        """
+        cached = self.preview_profile
+        if cached is not None and cached[0] == source_id:
+            return cached[1]
+        
+        profile = self.tuner.get_profile(full_source() if callable(full_source) else full_source)
+        steps = [(name, dict(params)) for name, params in profile['steps']] if profile is not None else None
+        self.preview_profile = (source_id, steps)
+        return steps
+    
+    def _preview_task(self, source, source_id, generation, steps, autotune, full_source):
+        """Menjalankan pipeline pada proxy resolusi rendah (dipanggil dari TaskWorker)"""
+        proxy = self.preview_proxy
+        if proxy is None or proxy[0] != source_id:
+            if callable(source):
+                image = source()
+            else:
+                image = self.image_processor.load_preview(source, max_side=self.PREVIEW_MAX_SIDE)
+            proxy = (source_id, image)
+            self.preview_proxy = proxy
+        
+        image = proxy[1]
+        
+        # Tuning membutuhkan OCR; pratinjau hanya memakai profil yang sudah dikenal
+        if autotune:
+            steps = self._tuned_steps(full_source, source_id) or steps
+        
+        for step in steps:
+            # Hentikan run yang sudah usang karena pengaturan atau gambar berubah
+            if generation != self.preview_generation:
+                return None
+            image = self.image_processor.apply_step(image, step)
+        
+        return generation, image
+    
+    def preview_finished(self, result):
+        self.preview_running = False
         
-        # Terapkan pemrosesan berdasarkan checkbox
+        if self.preview_pending:
+            self.preview_pending = False
+            self.start_preview()
+            return
+        
+        if result is None or result[0] != self.preview_generation:
+            return
+        
+        self.show_array(result[1])
+        self.status_bar.showMessage("Pratinjau diperbarui (resolusi rendah)")
+    
+    def preview_error(self, error_msg):
+        self.preview_running = False
+        self.preview_pending = False
+        self.status_bar.showMessage(f"Gagal memperbarui pratinjau: {error_msg}")
+    
+    def get_pipeline_steps(self):
+        """Menyusun spesifikasi pipeline dari checkbox pemrosesan gambar"""
+        steps = []
         if self.grayscale_cb.isChecked():
-            image = self.image_processor.grayscale(image)
+            steps.append(('grayscale', {}))
         
         if self.denoise_cb.isChecked():
-            image = self.image_processor.denoise(image)
+            steps.append(('denoise', {}))
         
         if self.threshold_cb.isChecked():
-            image = self.image_processor.adaptive_threshold(image)
+            steps.append(('threshold', {'method': 'adaptive', 'block_size': 11, 'c': 2}))
         
         if self.deskew_cb.isChecked():
-            image = self.image_processor.deskew(image)
+            steps.append(('deskew', {}))
         
-        # Simpan gambar yang diproses ke file sementara
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-            temp_path = temp_file.name
-        
-        cv2.imwrite(temp_path, image)
-        self.processed_image = temp_path
+        return steps
+    
+    def get_ocr_config(self):
+        """Menyusun konfigurasi Tesseract dari pilihan mode segmentasi"""
+        psm = self.psm_combo.currentIndex()
+        if psm == 0: psm = 0
+        elif psm == 1: psm = 1
+        else: psm = psm + 1  # Karena indeks combo box tidak termasuk PSM 2
         
-        # Tampilkan gambar yang diproses
-        self.display_image(temp_path)
-        self.status_bar.showMessage("Gambar telah diproses")
+        return f"--psm {psm}"
     
     def run_ocr(self):
-        if not self.current_image_path:
+        if not self.current_image_path and self.pdf_document is None:
             QMessageBox.warning(self, "Peringatan", "Tidak ada gambar yang dimuat")
             return
         
-        # Gunakan gambar yang diproses jika ada
-        image_path = self.processed_image if self.processed_image else self.current_image_path
-        
         # Dapatkan pengaturan OCR
         lang = self.lang_combo.currentText()
-        psm = self.psm_combo.currentIndex()
-        if psm == 0: psm = 0
-        elif psm == 1: psm = 1
-        else: psm = psm + 1  # Karena indeks combo box tidak termasuk PSM 2
-        
-        config = f"--psm {psm}"
+        config = self.get_ocr_config()
+        steps = self.get_pipeline_steps()
+        autotune = self.autotune_cb.isChecked()
+        
+        # Gunakan gambar yang sudah diproses jika ada; jika tidak, pemrosesan
+        # resolusi penuh dijalankan oleh worker OCR
+        image_path = self.processed_image if self.processed_image is not None else self.current_image_path
+        if self.processed_image is None and (steps or autotune):
+            source = image_path
+            if source is None:
+                document, index = self.pdf_document, self.pdf_page
+                source = lambda: self.pdf_page_path(document, index)
+            source_id = self.source_id
+            image_path = lambda: self._process_image_task(source, steps, autotune, lang, source_id)
+        elif image_path is None:
+            # Halaman PDF dirender pada resolusi OCR langsung di memori oleh worker
+            document, index = self.pdf_document, self.pdf_page
+            image_path = lambda: document.render_for_ocr(index, dpi=self.OCR_DPI)
         
         # Nonaktifkan tombol OCR selama pemrosesan
         self.ocr_btn.setEnabled(False)
@@ -382,16 +1179,11 @@ class MainWindow(QMainWindow):
     
     def ocr_finished(self, result):
         # Tampilkan hasil OCR
-        self.text_result.setText(result)
+        self.text_result.setText(result['text'])
         
-        # Coba dapatkan data terstruktur
-        try:
-            if self.current_image_path:
-                data = self.ocr_engine.image_to_data(self.current_image_path)
-                if data is not None:
-                    self.data_result.setText(str(data))
-        except Exception as e:
-            self.data_result.setText(f"Error mendapatkan data terstruktur: {str(e)}")
+        # Data terstruktur berasal dari run OCR yang sama
+        self.ocr_data = result['data']
+        self.data_result.setText(str(self.ocr_data))
         
         # Aktifkan kembali tombol OCR dan ekspor
         self.ocr_btn.setEnabled(True)
@@ -425,24 +1217,35 @@ class MainWindow(QMainWindow):
                 self, "Simpan Excel", "", "Excel Files (*.xlsx)"
             )
             if file_path:
-                try:
-                    data = self.ocr_engine.image_to_data(self.current_image_path)
-                    if data is not None:
-                        self.export_manager.export_excel(data, file_path)
-                        self.status_bar.showMessage(f"Data diekspor ke {file_path}")
-                except Exception as e:
-                    QMessageBox.warning(self, "Error Ekspor", f"Error saat mengekspor ke Excel: {str(e)}")
+                if self.ocr_data is None:
+                    QMessageBox.warning(self, "Peringatan", "Jalankan OCR terlebih dahulu")
+                    return
+                
+                # Pakai ulang data dari run OCR terakhir; penulisan file di thread terpisah
+                self.status_bar.showMessage("Mengekspor ke Excel...")
+                self.run_task(
+                    self.export_manager.export_excel, self.ocr_data, file_path,
+                    on_finished=lambda _: self.status_bar.showMessage(f"Data diekspor ke {file_path}"),
+                    on_error=lambda error_msg: QMessageBox.warning(
+                        self, "Error Ekspor", f"Error saat mengekspor ke Excel: {error_msg}")
+                )
         
         elif format_type == "pdf":
             file_path, _ = QFileDialog.getSaveFileName(
                 self, "Simpan PDF", "", "PDF Files (*.pdf)"
             )
             if file_path:
-                try:
-                    self.export_manager.export_pdf(self.text_result.toPlainText(), file_path)
-                    self.status_bar.showMessage(f"PDF diekspor ke {file_path}")
-                except Exception as e:
-                    QMessageBox.warning(self, "Error Ekspor", f"Error saat mengekspor ke PDF: {str(e)}")
+                self.status_bar.showMessage("Mengekspor ke PDF...")
+                self.run_task(
+                    self.export_manager.export_pdf, self.text_result.toPlainText(), file_path,
+                    on_finished=lambda _: self.status_bar.showMessage(f"PDF diekspor ke {file_path}"),
+                    on_error=lambda error_msg: QMessageBox.warning(
+                        self, "Error Ekspor", f"Error saat mengekspor ke PDF: {error_msg}")
+                )
+    
+    def closeEvent(self, event):
+        self.close_pdf()
+        super().closeEvent(event)
     
     def show_about(self):
         QMessageBox.about(
@@ -1,42 +1,263 @@
 import cv2
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageOps, ImageSequence
 import math
 
+from .metrics import metrics
+
 class ImageProcessor:
     """
     Kelas untuk memproses gambar sebelum OCR untuk meningkatkan akurasi
     """
     
+    # Langkah yang boleh dipakai dalam spesifikasi pipeline, sesuai nama method
+    PIPELINE_STEPS = ('grayscale', 'denoise', 'threshold', 'adaptive_threshold',
+                      'deskew', 'remove_borders', 'crop_content', 'resize')
+    
+    # Langkah yang hanya membutuhkan kanal grayscale dari gambar input
+    GRAYSCALE_STEPS = ('grayscale', 'denoise', 'threshold', 'adaptive_threshold')
+    
+    # Flag OpenCV untuk decode dengan resolusi dikurangi, per (faktor, grayscale)
+    IMREAD_FLAGS = {
+        (1, False): cv2.IMREAD_COLOR,
+        (2, False): cv2.IMREAD_REDUCED_COLOR_2,
+        (4, False): cv2.IMREAD_REDUCED_COLOR_4,
+        (8, False): cv2.IMREAD_REDUCED_COLOR_8,
+        (1, True): cv2.IMREAD_GRAYSCALE,
+        (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+        (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+    }
+    
     def __init__(self):
         """
         Inisialisasi Image Processor
         """
         pass
     
-    def load_image(self, image_path):
+    @staticmethod
+    def pipeline_key(steps):
+        """
+        Menormalkan spesifikasi pipeline menjadi tuple yang dapat di-hash
+        
+        Args:
+            steps (list): Daftar langkah berupa (nama, parameter) atau nama saja
+            
+        Returns:
+            tuple: Tuple berurutan ((nama, ((param, nilai), ...)), ...)
+        """
+        key = []
+        for step in steps:
+            if isinstance(step, str):
+                name, params = step, {}
+            else:
+                name, params = step[0], (step[1] if len(step) > 1 else None) or {}
+            key.append((name, tuple(sorted(dict(params).items()))))
+        return tuple(key)
+    
+    def apply_step(self, image, step):
+        """
+        Menerapkan satu langkah pipeline pada gambar
+        
+        Args:
+            image (numpy.ndarray): Gambar input
+            step (tuple): Langkah berupa (nama, parameter) atau nama saja
+            
+        Returns:
+            numpy.ndarray: Gambar hasil langkah tersebut
+        """
+        name, params = self.pipeline_key([step])[0]
+        if name not in self.PIPELINE_STEPS:
+            raise ValueError(f"Langkah pipeline tidak dikenal: {name}")
+        
+        with metrics.span('preprocess', step=name):
+            return getattr(self, name)(image, **dict(params))
+    
+    def apply_pipeline(self, image, steps):
+        """
+        Menerapkan serangkaian langkah pemrosesan secara berurutan
+        
+        Args:
+            image (numpy.ndarray): Gambar input
+            steps (list): Daftar langkah berupa (nama, parameter) atau nama saja
+            
+        Returns:
+            numpy.ndarray: Gambar hasil pipeline
+        """
+        for step in steps:
+            image = self.apply_step(image, step)
+        
+        return image
+    
+    def load_image(self, image_path, reduce=1, grayscale=False, exif=True):
         """
         Memuat gambar dari file
         
         Args:
             image_path (str): Path ke file gambar
+            reduce (int): Faktor pengecilan saat decode: 1, 2, 4, atau 8 (default: 1)
+            grayscale (bool): Decode langsung ke grayscale (default: False)
+            exif (bool): Terapkan orientasi EXIF (default: True)
             
         Returns:
             numpy.ndarray: Gambar dalam format OpenCV
         """
+        if (reduce, grayscale) not in self.IMREAD_FLAGS:
+            raise ValueError(f"Faktor pengecilan tidak didukung: {reduce}")
+        
         try:
-            # Baca gambar dengan OpenCV
-            image = cv2.imread(image_path)
-            
-            if image is None:
-                # Jika OpenCV gagal, coba dengan PIL
-                pil_image = Image.open(image_path)
-                image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+            # Baca gambar dengan OpenCV, yang sudah menerapkan orientasi EXIF secara default
+            flags = self.IMREAD_FLAGS[(reduce, grayscale)]
+            if not exif:
+                flags |= cv2.IMREAD_IGNORE_ORIENTATION
+            with metrics.span('decode'):
+                image = cv2.imread(image_path, flags)
+                
+                if image is None:
+                    # Jika OpenCV gagal, coba dengan PIL
+                    with Image.open(image_path) as pil_image:
+                        image = self._pil_to_cv(pil_image, reduce, grayscale, exif)
             
+            metrics.count('images_decoded')
             return image
         except Exception as e:
             raise Exception(f"Error saat memuat gambar: {str(e)}")
     
+    def _pil_to_cv(self, pil_image, reduce=1, grayscale=False, exif=True):
+        """
+        Mengkonversi PIL Image (atau satu frame) ke format OpenCV
+        
+        Args:
+            pil_image (PIL.Image.Image): Gambar PIL yang sudah dibuka
+            reduce (int): Faktor pengecilan (default: 1)
+            grayscale (bool): Konversi ke grayscale (default: False)
+            exif (bool): Terapkan orientasi EXIF (default: True)
+            
+        Returns:
+            numpy.ndarray: Gambar dalam format OpenCV
+        """
+        mode = 'L' if grayscale else 'RGB'
+        
+        if reduce > 1:
+            w, h = pil_image.size
+            # Untuk JPEG, draft() membuat decoder langsung menghasilkan resolusi kecil
+            if pil_image.format == 'JPEG':
+                pil_image.draft(mode, (w // reduce, h // reduce))
+            
+            # Sisa pengecilan (atau format selain JPEG) dilakukan setelah decode
+            factor = max(1, round(pil_image.size[0] / max(1, w // reduce)))
+            if factor > 1:
+                pil_image = pil_image.reduce(factor)
+        
+        if exif:
+            pil_image = ImageOps.exif_transpose(pil_image)
+        
+        if pil_image.mode != mode:
+            pil_image = pil_image.convert(mode)
+        
+        if grayscale:
+            return np.array(pil_image)
+        
+        # cvtColor langsung menghasilkan salinan BGR tanpa salinan RGB perantara
+        return cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
+    
+    def image_size(self, image_path):
+        """
+        Membaca ukuran gambar dari header file tanpa decode piksel
+        
+        Args:
+            image_path (str): Path ke file gambar
+            
+        Returns:
+            tuple: (lebar, tinggi) gambar
+        """
+        with Image.open(image_path) as pil_image:
+            return pil_image.size
+    
+    def load_preview(self, image_path, max_side=1024, grayscale=False):
+        """
+        Memuat gambar dengan resolusi secukupnya untuk pratinjau
+        
+        Args:
+            image_path (str): Path ke file gambar
+            max_side (int): Panjang sisi terpanjang hasil (default: 1024)
+            grayscale (bool): Decode langsung ke grayscale (default: False)
+            
+        Returns:
+            numpy.ndarray: Gambar pratinjau dalam format OpenCV
+        """
+        w, h = self.image_size(image_path)
+        
+        # Pilih faktor decode terbesar yang masih menyisakan resolusi cukup
+        reduce = 1
+        for factor in (8, 4, 2):
+            if max(w, h) // factor >= max_side:
+                reduce = factor
+                break
+        
+        image = self.load_image(image_path, reduce=reduce, grayscale=grayscale)
+        
+        scale = max_side / float(max(image.shape[:2]))
+        if scale < 1:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        return image
+    
+    def load_for_pipeline(self, image_path, steps, reduce=1):
+        """
+        Memuat gambar dengan kanal yang dibutuhkan pipeline saja
+        
+        Jika langkah pertama pipeline hanya membutuhkan grayscale, gambar
+        langsung di-decode ke grayscale tanpa membuat salinan berwarna.
+        
+        Args:
+            image_path (str): Path ke file gambar
+            steps (list): Daftar langkah pipeline
+            reduce (int): Faktor pengecilan saat decode (default: 1)
+            
+        Returns:
+            numpy.ndarray: Gambar dalam format OpenCV
+        """
+        key = self.pipeline_key(steps)
+        grayscale = bool(key) and key[0][0] in self.GRAYSCALE_STEPS
+        return self.load_image(image_path, reduce=reduce, grayscale=grayscale)
+    
+    def count_frames(self, image_path):
+        """
+        Menghitung jumlah frame (halaman) dalam file gambar, misalnya TIFF
+        
+        Args:
+            image_path (str): Path ke file gambar
+            
+        Returns:
+            int: Jumlah frame
+        """
+        with Image.open(image_path) as pil_image:
+            return getattr(pil_image, 'n_frames', 1)
+    
+    def iter_frames(self, image_path, reduce=1, grayscale=False, exif=True):
+        """
+        Mengiterasi frame file multi-halaman (misalnya TIFF) satu per satu
+        
+        Hanya frame yang sedang diiterasi yang di-decode, sehingga dokumen
+        dengan banyak halaman tidak perlu dimuat sekaligus ke memori.
+        
+        Args:
+            image_path (str): Path ke file gambar
+            reduce (int): Faktor pengecilan (default: 1)
+            grayscale (bool): Decode ke grayscale (default: False)
+            exif (bool): Terapkan orientasi EXIF (default: True)
+            
+        Yields:
+            numpy.ndarray: Satu frame dalam format OpenCV
+        """
+        try:
+            with Image.open(image_path) as pil_image:
+                for frame in ImageSequence.Iterator(pil_image):
+                    yield self._pil_to_cv(frame, reduce, grayscale, exif)
+        except Exception as e:
+            raise Exception(f"Error saat membaca frame gambar: {str(e)}")
+    
     def save_image(self, image, output_path):
         """
         Menyimpan gambar ke file
@@ -257,4 +478,145 @@ class ImageProcessor:
         # Crop gambar
         cropped = image[y:y+h, x:x+w]
         
-        return cropped
\ No newline at end of file
+        return cropped
+    
+    def _downscale_gray(self, image, max_side):
+        """
+        Mengecilkan gambar ke grayscale dengan sisi terpanjang max_side
+        
+        Returns:
+            tuple: (gambar grayscale kecil, faktor skala terhadap gambar asli)
+        """
+        gray = self.grayscale(image)
+        scale = min(1.0, max_side / float(max(gray.shape[:2])))
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray, scale
+    
+    def _ink_mask(self, gray, contrast=40):
+        """
+        Membuat mask tinta: piksel yang jelas lebih gelap daripada latar kertas
+        
+        Ambang Otsu dibatasi oleh kecerahan latar dikurangi contrast, agar
+        halaman kosong yang hanya berisi noise tidak dianggap bertinta.
+        """
+        background = float(np.median(gray))
+        otsu, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        level = min(otsu, background - contrast)
+        return (gray < level).astype(np.uint8)
+    
+    def _trim_borders(self, mask, max_density=0.8):
+        """
+        Membuang baris/kolom tepi yang hampir seluruhnya gelap (border hasil scan)
+        
+        Returns:
+            tuple: (y0, y1, x0, x1) area di dalam border, atau None jika seluruhnya gelap
+        """
+        rows = np.flatnonzero(mask.mean(axis=1) < max_density)
+        cols = np.flatnonzero(mask.mean(axis=0) < max_density)
+        if rows.size == 0 or cols.size == 0:
+            return None
+        return rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    
+    def _content_box(self, mask, min_density=0.01):
+        """
+        Mencari kotak konten dari proyeksi kepadatan tinta per baris dan kolom
+        
+        Border dibuang terlebih dahulu, lalu konten adalah rentang baris/kolom
+        yang kepadatan tintanya di atas min_density.
+        
+        Returns:
+            tuple: (x, y, w, h) pada koordinat mask, atau None jika tidak ada konten
+        """
+        area = self._trim_borders(mask)
+        if area is None:
+            return None
+        
+        y0, y1, x0, x1 = area
+        inner = mask[y0:y1, x0:x1]
+        
+        ink_rows = np.flatnonzero(inner.mean(axis=1) > min_density)
+        ink_cols = np.flatnonzero(inner.mean(axis=0) > min_density)
+        if ink_rows.size == 0 or ink_cols.size == 0:
+            return None
+        
+        x = x0 + ink_cols[0]
+        y = y0 + ink_rows[0]
+        return x, y, ink_cols[-1] - ink_cols[0] + 1, ink_rows[-1] - ink_rows[0] + 1
+    
+    def crop_content(self, image, margin=10, max_side=1000, min_density=0.01):
+        """
+        Memotong gambar ke area konten berdasarkan proyeksi kepadatan tinta
+        
+        Analisis dilakukan pada versi kecil gambar lalu dipetakan kembali ke
+        resolusi penuh, sehingga jauh lebih murah daripada remove_borders.
+        
+        Args:
+            image (numpy.ndarray): Gambar input
+            margin (int): Margin tambahan dalam piksel resolusi penuh (default: 10)
+            max_side (int): Sisi terpanjang gambar analisis (default: 1000)
+            min_density (float): Kepadatan tinta minimum baris/kolom konten (default: 0.01)
+            
+        Returns:
+            numpy.ndarray: Gambar yang telah dipotong
+        """
+        gray, scale = self._downscale_gray(image, max_side)
+        box = self._content_box(self._ink_mask(gray), min_density=min_density)
+        
+        # Jika tidak ada konten, kembalikan gambar asli
+        if box is None:
+            return image
+        
+        # Petakan kembali ke resolusi penuh dan tambahkan margin
+        x, y, w, h = box
+        x0 = max(0, int(x / scale) - margin)
+        y0 = max(0, int(y / scale) - margin)
+        x1 = min(image.shape[1], int(math.ceil((x + w) / scale)) + margin)
+        y1 = min(image.shape[0], int(math.ceil((y + h) / scale)) + margin)
+        
+        return image[y0:y1, x0:x1]
+    
+    def is_blank(self, image, min_components=2, max_side=1800, min_height=0.003):
+        """
+        Mendeteksi halaman kosong atau hampir kosong sebelum OCR
+        
+        Halaman dianggap berisi konten jika ada cukup komponen tinta terhubung
+        seukuran karakter, sehingga satu baris pendek seperti "Approved" tetap
+        di-OCR. Bintik noise lebih kecil dari min_height diabaikan, begitu pula
+        border gelap di tepi halaman. Analisis membutuhkan resolusi setara
+        minimal 150 dpi agar huruf kecil tidak hilang saat pengecilan.
+        
+        Args:
+            image (numpy.ndarray): Gambar input
+            min_components (int): Jumlah komponen seukuran karakter minimum agar
+                                  halaman dianggap berisi (default: 2)
+            max_side (int): Sisi terpanjang gambar analisis, kira-kira A4 150 dpi (default: 1800)
+            min_height (float): Tinggi minimum komponen relatif terhadap sisi terpanjang (default: 0.003)
+            
+        Returns:
+            bool: True jika halaman dianggap kosong
+        """
+        gray, _ = self._downscale_gray(image, max_side)
+        mask = self._ink_mask(gray)
+        
+        # Halaman yang seluruhnya gelap tidak berisi teks yang dapat dibaca
+        area = self._trim_borders(mask)
+        if area is None:
+            return True
+        
+        y0, y1, x0, x1 = area
+        inner = np.ascontiguousarray(mask[y0:y1, x0:x1])
+        if not inner.any():
+            return True
+        
+        # Hitung komponen tinta yang cukup tinggi untuk menjadi karakter atau gambar
+        _, _, stats, _ = cv2.connectedComponentsWithStats(inner, connectivity=8)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        threshold = max(3, int(round(min_height * max(gray.shape[:2]))))
+        glyphs = (heights >= threshold) & (areas >= threshold)
+        
+        # Satu komponen besar (logo, tanda tangan, foto) juga merupakan konten
+        if np.any(areas >= 0.001 * inner.size):
+            return False
+        return int(np.count_nonzero(glyphs)) < min_components
\ No newline at end of file
@@ -0,0 +1,328 @@
+import os
+import time
+import threading
+from functools import wraps
+
+from loguru import logger
+
+# Instrumentasi opt-in untuk pipeline OCR: span (durasi per tahap) dan counter.
+# Saat tidak aktif setiap titik instrumentasi hanya memeriksa satu flag dan
+# mengembalikan span kosong, sehingga overhead-nya dapat diabaikan.
+#
+# Aktifkan dengan metrics.enable() atau variabel lingkungan OCR_METRICS=1
+# (diwarisi proses worker batch). Hasil tersedia sebagai log terstruktur
+# loguru dan format teks Prometheus.
+
+# Batas bucket histogram durasi dalam detik
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NullSpan:
+    """
+    Span kosong yang dipakai saat instrumentasi tidak aktif
+    """
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+    
+    def set(self, **labels):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """
+    Mengukur durasi satu blok kode dan mencatatnya ke registry saat selesai
+    """
+    
+    __slots__ = ('registry', 'name', 'labels', 'started')
+    
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started = None
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.started,
+                              error=exc_type is not None, **self.labels)
+        return False
+    
+    def set(self, **labels):
+        """
+        Menambahkan label yang baru diketahui di tengah span
+        """
+        self.labels.update(labels)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+
+class Metrics:
+    """
+    Registry span dan counter yang thread-safe
+    """
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Inisialisasi Metrics
+        
+        Args:
+            buckets (tuple): Batas bucket histogram durasi dalam detik
+        """
+        self.buckets = tuple(buckets)
+        self.enabled = False
+        self.log = False
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._log_sink = None
+    
+    def enable(self, log=False, log_path=None):
+        """
+        Mengaktifkan pengumpulan metrik
+        
+        Args:
+            log (bool): Tulis setiap span dan counter sebagai log loguru level TRACE
+            log_path (str, optional): File untuk log JSON terstruktur (mengaktifkan log)
+        """
+        self.enabled = True
+        self.log = log or bool(log_path)
+        if log_path and self._log_sink is None:
+            self._log_sink = logger.add(log_path, level='TRACE', serialize=True, enqueue=True,
+                                        filter=lambda record: 'metric' in record['extra'])
+        # Proses worker yang di-spawn (bukan fork) membaca flag ini saat impor
+        os.environ['OCR_METRICS'] = '1'
+    
+    def disable(self):
+        """
+        Mematikan pengumpulan metrik tanpa menghapus data yang sudah terkumpul
+        """
+        self.enabled = False
+        self.log = False
+        os.environ.pop('OCR_METRICS', None)
+        if self._log_sink is not None:
+            logger.remove(self._log_sink)
+            self._log_sink = None
+    
+    def span(self, name, **labels):
+        """
+        Membuat context manager yang mengukur durasi blok kode
+        
+        Args:
+            name (str): Nama tahap, misalnya 'ocr.tesseract'
+            **labels: Label tambahan, misalnya step='denoise'
+            
+        Returns:
+            context manager: Span, atau span kosong jika tidak aktif
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+    
+    def timed(self, name, **labels):
+        """
+        Dekorator yang membungkus fungsi dengan span
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, dict(labels)):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def count(self, name, value=1, **labels):
+        """
+        Menambah nilai counter
+        
+        Args:
+            name (str): Nama counter, misalnya 'pages'
+            value (float): Penambahan (default: 1)
+            **labels: Label tambahan
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        if self.log:
+            logger.bind(metric=name, metric_type='counter', value=value, **labels).trace("{} +{}", name, value)
+    
+    def observe(self, name, seconds, error=False, **labels):
+        """
+        Mencatat satu durasi span ke histogram
+        
+        Args:
+            name (str): Nama tahap
+            seconds (float): Durasi dalam detik
+            error (bool): True jika blok berakhir dengan exception
+            **labels: Label tambahan
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0, 0.0, 0, [0] * len(self.buckets)]
+            histogram[0] += 1
+            histogram[1] += seconds
+            histogram[2] += bool(error)
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[3][index] += 1
+                    break
+        if self.log:
+            logger.bind(metric=name, metric_type='span', seconds=round(seconds, 6), error=error, **labels).trace(
+                "{} {:.2f} ms", name, seconds * 1000)
+    
+    def snapshot(self, reset=False):
+        """
+        Salinan data metrik yang bisa di-pickle, misalnya untuk dikirim dari proses worker
+        
+        Args:
+            reset (bool): Kosongkan registry setelah disalin
+            
+        Returns:
+            dict: counters dan histograms
+        """
+        with self._lock:
+            data = {
+                'counters': dict(self._counters),
+                'histograms': {key: [h[0], h[1], h[2], list(h[3])] for key, h in self._histograms.items()},
+            }
+            if reset:
+                self._counters = {}
+                self._histograms = {}
+        return data
+    
+    def merge(self, snapshot):
+        """
+        Menggabungkan snapshot dari proses lain ke registry ini
+        """
+        if not snapshot:
+            return
+        with self._lock:
+            for key, value in snapshot['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (count, total, errors, buckets) in snapshot['histograms'].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = [0, 0.0, 0, [0] * len(self.buckets)]
+                histogram[0] += count
+                histogram[1] += total
+                histogram[2] += errors
+                histogram[3] = [a + b for a, b in zip(histogram[3], buckets)]
+    
+    def reset(self):
+        """
+        Menghapus semua data metrik
+        """
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+    
+    def summary(self):
+        """
+        Ringkasan span terurut dari total waktu terbesar, untuk mencari bottleneck
+        
+        Returns:
+            list: Dict berisi span, labels, count, total_seconds, mean_ms, dan errors
+        """
+        with self._lock:
+            rows = [
+                {'span': name, 'labels': dict(labels), 'count': count, 'total_seconds': round(total, 6),
+                 'mean_ms': round(total / count * 1000, 3) if count else 0.0, 'errors': errors}
+                for (name, labels), (count, total, errors, _) in self._histograms.items()
+            ]
+        return sorted(rows, key=lambda row: row['total_seconds'], reverse=True)
+    
+    def render_prometheus(self, prefix='ocr_'):
+        """
+        Menyusun metrik dalam format teks Prometheus
+        
+        Args:
+            prefix (str): Awalan nama metrik (default: 'ocr_')
+            
+        Returns:
+            str: Teks exposition format 0.0.4
+        """
+        snapshot = self.snapshot()
+        lines = []
+        
+        counters = {}
+        for (name, labels), value in snapshot['counters'].items():
+            counters.setdefault(name, []).append((labels, value))
+        for name in sorted(counters):
+            metric = f"{prefix}{name.replace('.', '_')}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in sorted(counters[name]):
+                lines.append(f"{metric}{_format_labels(labels)} {value}")
+        
+        metric = f"{prefix}span_seconds"
+        if snapshot['histograms']:
+            lines.append(f"# HELP {metric} Durasi tahap pipeline OCR")
+            lines.append(f"# TYPE {metric} histogram")
+        for (name, labels), (count, total, errors, buckets) in sorted(snapshot['histograms'].items()):
+            key = (('span', name),) + labels
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, buckets):
+                cumulative += bucket
+                lines.append(f"{metric}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{metric}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(key)} {count}")
+        
+        errors = [(name, labels, e) for (name, labels), (_, _, e, _) in sorted(snapshot['histograms'].items()) if e]
+        if errors:
+            lines.append(f"# TYPE {prefix}span_errors_total counter")
+            for name, labels, value in errors:
+                lines.append(f"{prefix}span_errors_total{_format_labels((('span', name),) + labels)} {value}")
+        
+        return '\n'.join(lines) + '\n'
+    
+    def write_prometheus(self, path, prefix='ocr_'):
+        """
+        Menulis metrik ke file teks Prometheus secara atomik (untuk textfile collector)
+        
+        Args:
+            path (str): Path file output
+            prefix (str): Awalan nama metrik (default: 'ocr_')
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus(prefix))
+        os.replace(temp_path, path)
+
+
+# Registry global yang dipakai semua modul
+metrics = Metrics()
+
+if os.environ.get('OCR_METRICS', '').lower() in ('1', 'true', 'yes'):
+    metrics.enable(log=os.environ.get('OCR_METRICS_LOG', '').lower() in ('1', 'true', 'yes'))
\ No newline at end of file
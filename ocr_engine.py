@@ -1,7 +1,12 @@
+import io
 import os
+import csv
 import pytesseract
+import numpy as np
 import pandas as pd
-from PIL import Image
+from PIL import Image, ImageOps
+
+from .metrics import metrics
 
 class OCREngine:
     """
@@ -27,12 +32,34 @@ class OCREngine:
             print(f"Peringatan: Tesseract tidak terdeteksi. Error: {str(e)}")
             print("Pastikan Tesseract OCR terinstal dan tersedia di PATH sistem.")
     
+    def _open_image(self, image):
+        """
+        Membuka gambar dari path, array OpenCV, atau PIL Image
+        
+        Args:
+            image (str | numpy.ndarray | PIL.Image.Image): Sumber gambar
+            
+        Returns:
+            PIL.Image.Image: Gambar yang siap diberikan ke Tesseract
+        """
+        if isinstance(image, Image.Image):
+            return image
+        
+        if isinstance(image, np.ndarray):
+            # Array OpenCV berwarna berurutan BGR, PIL mengharapkan RGB
+            if image.ndim == 3:
+                image = np.ascontiguousarray(image[:, :, ::-1])
+            return Image.fromarray(image)
+        
+        # Terapkan orientasi EXIF agar foto dari ponsel tidak terbaca miring
+        return ImageOps.exif_transpose(Image.open(image))
+    
     def image_to_text(self, image_path, lang='eng', config=''):
         """
         Mengkonversi gambar ke teks menggunakan Tesseract OCR
         
         Args:
-            image_path (str): Path ke file gambar
+            image_path (str | numpy.ndarray): Path ke file gambar atau gambar OpenCV
             lang (str): Kode bahasa untuk OCR (default: 'eng')
             config (str): Konfigurasi tambahan untuk Tesseract
             
@@ -41,48 +68,105 @@ class OCREngine:
         """
         try:
             # Buka gambar dengan PIL
-            image = Image.open(image_path)
+            with metrics.span('ocr.open_image'):
+                image = self._open_image(image_path)
             
             # Jalankan OCR
-            text = pytesseract.image_to_string(image, lang=lang, config=config)
+            with metrics.span('ocr.tesseract', output='text'):
+                text = pytesseract.image_to_string(image, lang=lang, config=config)
+            metrics.count('tesseract_calls')
             
             return text
         except Exception as e:
             raise Exception(f"Error saat menjalankan OCR: {str(e)}")
     
-    def image_to_data(self, image_path, lang='eng', config=''):
+    def image_to_data(self, image_path, lang='eng', config='', words_only=True):
         """
         Mengekstrak data terstruktur dari gambar
         
         Args:
-            image_path (str): Path ke file gambar
+            image_path (str | numpy.ndarray): Path ke file gambar atau gambar OpenCV
             lang (str): Kode bahasa untuk OCR (default: 'eng')
             config (str): Konfigurasi tambahan untuk Tesseract
+            words_only (bool): Hanya baris yang memiliki teks; jika False baris level
+                               halaman/blok/paragraf/baris ikut disertakan (default: True)
             
         Returns:
             DataFrame: Data terstruktur hasil OCR
         """
         try:
             # Buka gambar dengan PIL
-            image = Image.open(image_path)
+            with metrics.span('ocr.open_image'):
+                image = self._open_image(image_path)
             
-            # Jalankan OCR dengan output data
-            data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DATAFRAME)
+            # Jalankan OCR dengan output TSV; subprocess dan parsing diukur terpisah
+            with metrics.span('ocr.tesseract', output='tsv'):
+                tsv = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.BYTES)
+            metrics.count('tesseract_calls')
+            
+            # Kolom text selalu string tanpa deteksi NA bawaan pandas, sehingga kata
+            # seperti "N/A", "NULL", atau "0042" tidak berubah menjadi NaN atau float
+            with metrics.span('ocr.parse_tsv'):
+                data = pd.read_csv(io.BytesIO(tsv), quoting=csv.QUOTE_NONE, sep='\t',
+                                   keep_default_na=False, na_values=[], dtype={'text': str})
+            
+            # Baris tanpa kata (level halaman/blok/paragraf/baris) atau hanya spasi
+            # ditandai NaN secara eksplisit agar filter notna di modul lain tetap berlaku
+            data['text'] = data['text'].where(data['text'].str.strip() != '')
             
             # Filter baris yang memiliki teks
-            if not data.empty:
-                data = data.dropna(subset=['text']).reset_index(drop=True)
+            if words_only and not data.empty:
+                data = data[data['text'].notna()].reset_index(drop=True)
             
             return data
         except Exception as e:
             raise Exception(f"Error saat mengekstrak data: {str(e)}")
     
+    @metrics.timed('ocr.data_to_text')
+    def data_to_text(self, data):
+        """
+        Menyusun teks dari hasil image_to_data tanpa menjalankan OCR ulang
+        
+        Kata dalam satu baris digabung dengan spasi, baris dipisah baris baru,
+        dan paragraf dipisah baris kosong seperti output image_to_text.
+        
+        Args:
+            data (DataFrame): Data hasil image_to_data
+            
+        Returns:
+            str: Teks hasil OCR
+        """
+        if data is None or data.empty:
+            return ''
+        
+        words = data[data['level'] == 5] if 'level' in data.columns else data
+        # Hanya kata kosong yang dibuang; "N/A" atau "0042" adalah kata yang sah
+        words = words[words['text'].fillna('').astype(str).str.strip() != '']
+        if words.empty:
+            return ''
+        
+        keys = [col for col in ('page_num', 'block_num', 'par_num', 'line_num') if col in words.columns]
+        words = words.sort_values(keys + ['word_num'] if 'word_num' in words.columns else keys, kind='stable')
+        lines = words.groupby(keys, sort=False)['text'].agg(lambda texts: ' '.join(texts.astype(str)))
+        
+        output = []
+        previous = None
+        for key, line in lines.items():
+            # Baris kosong di antara paragraf yang berbeda
+            paragraph = key[:-1] if isinstance(key, tuple) else None
+            if previous is not None and paragraph != previous:
+                output.append('')
+            output.append(line)
+            previous = paragraph
+        
+        return '\n'.join(output) + '\n'
+    
     def image_to_boxes(self, image_path, lang='eng', config=''):
         """
         Mendapatkan kotak pembatas karakter dari gambar
         
         Args:
-            image_path (str): Path ke file gambar
+            image_path (str | numpy.ndarray): Path ke file gambar atau gambar OpenCV
             lang (str): Kode bahasa untuk OCR (default: 'eng')
             config (str): Konfigurasi tambahan untuk Tesseract
             
@@ -91,7 +175,7 @@ class OCREngine:
         """
         try:
             # Buka gambar dengan PIL
-            image = Image.open(image_path)
+            image = self._open_image(image_path)
             
             # Jalankan OCR dengan output boxes
             boxes = pytesseract.image_to_boxes(image, lang=lang, config=config)
@@ -1,24 +1,84 @@
 import os
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import fitz  # PyMuPDF
 from PIL import Image
 import io
 import numpy as np
 import cv2
 
+from .image_processor import ImageProcessor
+from .metrics import metrics
+
 class PDFHandler:
     """
     Kelas untuk menangani operasi terkait PDF
     """
     
-    def __init__(self, ocr_engine=None):
+    def __init__(self, ocr_engine=None, image_processor=None):
         """
         Inisialisasi PDF Handler
         
         Args:
             ocr_engine (OCREngine, optional): Instance dari OCREngine untuk OCR
+            image_processor (ImageProcessor, optional): Instance ImageProcessor
+                                                        untuk deteksi halaman kosong
         """
         self.ocr_engine = ocr_engine
+        self.image_processor = image_processor or ImageProcessor()
+    
+    def render_page(self, page, dpi=300, grayscale=False):
+        """
+        Merender satu halaman PDF langsung ke array OpenCV tanpa file perantara
+        
+        Args:
+            page (fitz.Page): Halaman PDF
+            dpi (int): DPI untuk rendering (default: 300)
+            grayscale (bool): Render langsung ke grayscale (default: False)
+            
+        Returns:
+            numpy.ndarray: Gambar halaman dalam format OpenCV
+        """
+        colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+        with metrics.span('pdf.render', dpi=dpi):
+            pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72), colorspace=colorspace, alpha=False)
+        metrics.count('pdf_pages_rendered')
+        metrics.count('pdf_bytes_rendered', len(pix.samples))
+        
+        image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)
+        image = image[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+        
+        if grayscale:
+            return image[:, :, 0].copy()
+        return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    
+    def is_blank_page(self, page, dpi=150):
+        """
+        Mendeteksi halaman kosong sebelum render penuh
+        
+        Halaman dengan lapisan teks tidak pernah dianggap kosong. Halaman tanpa
+        teks, gambar, maupun gambar vektor langsung dianggap kosong. Sisanya
+        (misalnya hasil scan) diperiksa dengan ImageProcessor.is_blank.
+        
+        Args:
+            page (fitz.Page): Halaman PDF
+            dpi (int): DPI render untuk pemeriksaan, minimal 150 (default: 150)
+            
+        Returns:
+            bool: True jika halaman dianggap kosong
+        """
+        if page.get_text().strip():
+            return False
+        
+        if not page.get_images() and not page.get_drawings():
+            blank = True
+        else:
+            blank = self.image_processor.is_blank(self.render_page(page, dpi=max(150, dpi), grayscale=True))
+        if blank:
+            metrics.count('pdf_blank_pages')
+        return blank
     
     def convert_pdf_to_images(self, pdf_path, output_folder=None, output_format='png', dpi=300):
         """
@@ -50,11 +110,15 @@ class PDFHandler:
                 page = pdf_document.load_page(page_num)
                 
                 # Render halaman ke gambar
-                pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
+                with metrics.span('pdf.render', dpi=dpi):
+                    pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
+                metrics.count('pdf_pages_rendered')
+                metrics.count('pdf_bytes_rendered', len(pix.samples))
                 
                 # Simpan gambar
                 image_path = os.path.join(output_folder, f"page_{page_num + 1}.{output_format}")
-                pix.save(image_path)
+                with metrics.span('pdf.save_image', format=output_format):
+                    pix.save(image_path)
                 
                 image_paths.append(image_path)
             
@@ -62,7 +126,7 @@ class PDFHandler:
         except Exception as e:
             raise Exception(f"Error saat mengkonversi PDF ke gambar: {str(e)}")
     
-    def ocr_pdf(self, pdf_path, lang='eng', config=''):
+    def ocr_pdf(self, pdf_path, lang='eng', config='', dpi=300, skip_blank=False):
         """
         Melakukan OCR pada PDF
         
@@ -70,29 +134,38 @@ class PDFHandler:
             pdf_path (str): Path ke file PDF
             lang (str): Kode bahasa untuk OCR (default: 'eng')
             config (str): Konfigurasi tambahan untuk Tesseract
+            dpi (int): DPI untuk rendering (default: 300)
+            skip_blank (bool): Lewati OCR untuk halaman kosong (default: False)
             
         Returns:
-            list: Daftar teks hasil OCR untuk setiap halaman
+            list: Daftar teks hasil OCR untuk setiap halaman (string kosong untuk halaman kosong)
         """
         if self.ocr_engine is None:
             raise Exception("OCR Engine tidak tersedia")
         
         try:
-            # Konversi PDF ke gambar
-            with tempfile.TemporaryDirectory() as temp_dir:
-                image_paths = self.convert_pdf_to_images(pdf_path, output_folder=temp_dir)
+            pdf_document = fitz.open(pdf_path)
+            
+            # Render dan OCR setiap halaman langsung dari memori
+            results = []
+            for page_num in range(len(pdf_document)):
+                page = pdf_document.load_page(page_num)
                 
-                # Lakukan OCR pada setiap gambar
-                results = []
-                for image_path in image_paths:
-                    text = self.ocr_engine.image_to_text(image_path, lang, config)
-                    results.append(text)
+                # Halaman kosong dan pemisah tidak perlu dirender penuh maupun di-OCR
+                if skip_blank and self.is_blank_page(page):
+                    results.append('')
+                    continue
                 
-                return results
+                image = self.render_page(page, dpi=dpi, grayscale=True)
+                text = self.ocr_engine.image_to_text(image, lang, config)
+                results.append(text)
+            
+            pdf_document.close()
+            return results
         except Exception as e:
             raise Exception(f"Error saat melakukan OCR pada PDF: {str(e)}")
     
-    def create_searchable_pdf(self, pdf_path, output_path, lang='eng', config=''):
+    def create_searchable_pdf(self, pdf_path, output_path, lang='eng', config='', skip_blank=False):
         """
         Membuat PDF yang dapat dicari (searchable PDF)
         
@@ -101,6 +174,7 @@ class PDFHandler:
             output_path (str): Path untuk menyimpan PDF hasil
             lang (str): Kode bahasa untuk OCR (default: 'eng')
             config (str): Konfigurasi tambahan untuk Tesseract
+            skip_blank (bool): Lewati OCR untuk halaman kosong (default: False)
             
         Returns:
             bool: True jika berhasil
@@ -116,23 +190,15 @@ class PDFHandler:
             for page_num in range(len(pdf_document)):
                 page = pdf_document.load_page(page_num)
                 
-                # Render halaman ke gambar
-                pix = page.get_pixmap()
-                img_data = pix.tobytes("png")
+                # Halaman kosong tidak perlu lapisan teks
+                if skip_blank and self.is_blank_page(page):
+                    continue
                 
-                # Konversi ke format yang dapat diproses oleh OCR
-                img = Image.open(io.BytesIO(img_data))
-                
-                # Simpan gambar sementara
-                with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    img.save(temp_path)
+                # Render halaman ke gambar langsung di memori
+                image = self.render_page(page, dpi=72)
                 
                 # Lakukan OCR
-                text = self.ocr_engine.image_to_text(temp_path, lang, config)
-                
-                # Hapus file sementara
-                os.unlink(temp_path)
+                text = self.ocr_engine.image_to_text(image, lang, config)
                 
                 # Tambahkan layer teks ke halaman
                 page.insert_text(
@@ -148,4 +214,220 @@ class PDFHandler:
             
             return True
         except Exception as e:
-            raise Exception(f"Error saat membuat searchable PDF: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error saat membuat searchable PDF: {str(e)}")
+
+class PDFDocument:
+    """
+    Kelas untuk menampilkan PDF halaman per halaman tanpa merender seluruh dokumen
+    """
+    
+    def __init__(self, pdf_path, pdf_handler=None, max_bytes=128 * 1024 * 1024):
+        """
+        Inisialisasi PDF Document
+        
+        Dokumen dibuka sekali dan tetap terbuka; halaman hanya dirender saat
+        diminta, sehingga membuka PDF ribuan halaman tetap instan.
+        
+        Args:
+            pdf_path (str): Path ke file PDF
+            pdf_handler (PDFHandler, optional): Instance PDFHandler untuk rendering
+            max_bytes (int): Batas memori cache halaman yang sudah dirender (default: 128 MB)
+        """
+        self.pdf_path = pdf_path
+        self.pdf_handler = pdf_handler or PDFHandler()
+        self.max_bytes = max_bytes
+        
+        try:
+            self._document = fitz.open(pdf_path)
+        except Exception as e:
+            raise Exception(f"Error saat membuka PDF: {str(e)}")
+        
+        self.page_count = len(self._document)
+        
+        # PyMuPDF tidak aman dipakai dari beberapa thread sekaligus
+        self._lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.current_bytes = 0
+        
+        # Satu thread prefetch cukup karena rendering tetap diserialkan oleh lock
+        self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PDFPrefetch")
+        self._closed = False
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _check_index(self, index):
+        if not 0 <= index < self.page_count:
+            raise IndexError(f"Halaman {index + 1} di luar jangkauan (1-{self.page_count})")
+    
+    def _cached(self, key, count=True):
+        # Pengecekan dari prefetch tidak dihitung agar hit/miss hanya mencerminkan permintaan tampilan
+        with self._cache_lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+        if count:
+            metrics.count('pdf_cache_hits' if image is not None else 'pdf_cache_misses')
+        return image
+    
+    def _store(self, key, image):
+        if image.nbytes > self.max_bytes:
+            return
+        
+        with self._cache_lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            
+            self._cache[key] = image
+            self.current_bytes += image.nbytes
+            
+            while self.current_bytes > self.max_bytes and self._cache:
+                _, evicted = self._cache.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+    
+    def _render(self, index, dpi, grayscale=False):
+        """
+        Merender satu halaman dengan DPI tertentu
+        """
+        self._check_index(index)
+        with self._lock:
+            if self._closed:
+                raise Exception("Dokumen PDF sudah ditutup")
+            page = self._document.load_page(index)
+            return self.pdf_handler.render_page(page, dpi=dpi, grayscale=grayscale)
+    
+    def fit_dpi(self, index, width, height):
+        """
+        Menghitung DPI agar halaman pas di dalam area tampilan
+        
+        Args:
+            index (int): Indeks halaman (mulai 0)
+            width (int): Lebar area tampilan
+            height (int): Tinggi area tampilan
+            
+        Returns:
+            float: DPI render
+        """
+        self._check_index(index)
+        with self._lock:
+            rect = self._document.load_page(index).rect
+        return 72.0 * min(width / rect.width, height / rect.height)
+    
+    def render(self, index, width, height):
+        """
+        Merender halaman pada resolusi layar untuk ditampilkan
+        
+        Args:
+            index (int): Indeks halaman (mulai 0)
+            width (int): Lebar area tampilan
+            height (int): Tinggi area tampilan
+            
+        Returns:
+            numpy.ndarray: Gambar halaman (BGR)
+        """
+        return self._view(index, width, height)
+    
+    def _view(self, index, width, height, prefetch=False):
+        """
+        Mengambil halaman resolusi layar dari cache atau merendernya
+        
+        Render dari prefetch dicatat sebagai pdf_prefetch_renders, terpisah
+        dari pdf_cache_misses yang hanya menghitung permintaan tampilan.
+        """
+        key = (index, 'view', int(width), int(height))
+        image = self._cached(key, count=not prefetch)
+        if image is None:
+            image = self._render(index, self.fit_dpi(index, width, height))
+            self._store(key, image)
+            if prefetch:
+                metrics.count('pdf_prefetch_renders')
+        return image
+    
+    def thumbnail(self, index, max_side=128):
+        """
+        Merender thumbnail resolusi rendah sebuah halaman
+        
+        Args:
+            index (int): Indeks halaman (mulai 0)
+            max_side (int): Ukuran sisi terpanjang thumbnail (default: 128)
+            
+        Returns:
+            numpy.ndarray: Gambar thumbnail (BGR)
+        """
+        key = (index, 'thumb', int(max_side))
+        image = self._cached(key)
+        if image is None:
+            image = self._render(index, self.fit_dpi(index, max_side, max_side))
+            self._store(key, image)
+        return image
+    
+    def render_for_ocr(self, index, dpi=300, grayscale=True):
+        """
+        Merender halaman pada resolusi OCR (tidak disimpan di cache)
+        
+        Args:
+            index (int): Indeks halaman (mulai 0)
+            dpi (int): DPI untuk rendering (default: 300)
+            grayscale (bool): Render langsung ke grayscale (default: True)
+            
+        Returns:
+            numpy.ndarray: Gambar halaman
+        """
+        return self._render(index, dpi, grayscale)
+    
+    def save_page_image(self, index, output_path, dpi=300):
+        """
+        Merender halaman pada resolusi OCR dan menyimpannya ke file
+        
+        Args:
+            index (int): Indeks halaman (mulai 0)
+            output_path (str): Path file gambar
+            dpi (int): DPI untuk rendering (default: 300)
+            
+        Returns:
+            str: Path file gambar
+        """
+        if not cv2.imwrite(output_path, self.render_for_ocr(index, dpi=dpi, grayscale=False)):
+            raise Exception(f"Tidak dapat menyimpan gambar halaman ke: {output_path}")
+        return output_path
+    
+    def _prefetch_one(self, index, width, height):
+        try:
+            self._view(index, width, height, prefetch=True)
+        except Exception:
+            # Prefetch hanya optimasi; kegagalan ditangani saat halaman benar-benar diminta
+            pass
+    
+    def prefetch(self, indices, width, height):
+        """
+        Merender halaman di latar belakang agar navigasi berikutnya langsung tampil
+        
+        Args:
+            indices (iterable): Indeks halaman yang akan dirender
+            width (int): Lebar area tampilan
+            height (int): Tinggi area tampilan
+        """
+        if self._closed:
+            return
+        
+        for index in indices:
+            if 0 <= index < self.page_count and self._cached((index, 'view', int(width), int(height)), count=False) is None:
+                self._prefetcher.submit(self._prefetch_one, index, width, height)
+    
+    def close(self):
+        """
+        Menghentikan prefetch dan menutup dokumen
+        """
+        self._prefetcher.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._document.close()
+        with self._cache_lock:
+            self._cache.clear()
+            self.current_bytes = 0
\ No newline at end of file
@@ -0,0 +1,269 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .image_processor import ImageProcessor
+from .metrics import metrics
+
+
+class PreprocessCache:
+    """
+    Kelas untuk menyimpan hasil pemrosesan gambar berdasarkan hash sumber dan pipeline
+    
+    Selain di memori, hasil dapat disimpan di folder cache_dir sebagai file
+    .npy sehingga dipakai ulang antar proses worker dan antar eksekusi.
+    """
+    
+    def __init__(self, image_processor=None, max_bytes=512 * 1024 * 1024, cache_dir=None,
+                 max_disk_bytes=2 * 1024 * 1024 * 1024):
+        """
+        Inisialisasi Preprocess Cache
+        
+        Args:
+            image_processor (ImageProcessor, optional): Instance ImageProcessor
+            max_bytes (int): Batas memori untuk semua hasil tersimpan (default: 512 MB)
+            cache_dir (str, optional): Folder penyimpanan hasil di disk. Jika None,
+                                       cache hanya ada di memori.
+            max_disk_bytes (int): Batas ukuran folder cache di disk (default: 2 GB)
+        """
+        self.image_processor = image_processor or ImageProcessor()
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.disk_bytes = sum(size for _, size, _ in self._disk_entries())
+        self.hits = 0
+        self.misses = 0
+        
+        # Urutan entri mengikuti pemakaian terakhir (LRU)
+        self._entries = OrderedDict()
+        self._hashes = {}
+        self._lock = threading.Lock()
+    
+    def source_hash(self, image_path):
+        """
+        Menghitung hash isi file sumber, di-memo berdasarkan ukuran dan waktu modifikasi
+        
+        Args:
+            image_path (str): Path ke file gambar
+            
+        Returns:
+            str: Hash isi file
+        """
+        stat = os.stat(image_path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        
+        cached = self._hashes.get(image_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        digest = hashlib.blake2b(digest_size=16)
+        with open(image_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        
+        value = digest.hexdigest()
+        self._hashes[image_path] = (stamp, value)
+        return value
+    
+    def _disk_path(self, key):
+        """
+        Path file cache di disk untuk sebuah kunci
+        """
+        name = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, name + '.npy')
+    
+    def _disk_entries(self):
+        """
+        Daftar file cache di disk berupa (path, ukuran, waktu akses terakhir)
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npy'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+    
+    def _load_disk(self, key):
+        """
+        Membaca hasil dari disk, atau None jika tidak ada atau rusak
+        """
+        path = self._disk_path(key)
+        try:
+            image = np.load(path, allow_pickle=False)
+            # Waktu modifikasi dipakai sebagai urutan LRU saat folder dipangkas
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return image
+    
+    def _save_disk(self, key, image):
+        """
+        Menulis hasil ke disk secara atomik lalu memangkas folder jika melebihi batas
+        """
+        path = self._disk_path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                np.save(f, image, allow_pickle=False)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        
+        self.disk_bytes += os.path.getsize(path)
+        if self.disk_bytes > self.max_disk_bytes:
+            self._trim_disk()
+    
+    def _trim_disk(self):
+        """
+        Menghapus file cache yang paling lama tidak dipakai hingga di bawah batas disk
+        """
+        # Folder bisa dipakai bersama beberapa proses, jadi ukuran dihitung ulang dari isinya
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_disk_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self.disk_bytes = total
+    
+    def get(self, key):
+        """
+        Mengambil hasil tersimpan, dari memori atau dari disk jika cache_dir diisi
+        
+        Args:
+            key (tuple): Kunci entri
+            
+        Returns:
+            numpy.ndarray: Gambar tersimpan, atau None jika tidak ada
+        """
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                return image
+        
+        if not self.cache_dir:
+            return None
+        image = self._load_disk(key)
+        if image is not None:
+            self.put(key, image, persist=False)
+        return image
+    
+    def put(self, key, image, persist=True):
+        """
+        Menyimpan hasil dan membuang entri lama jika melebihi batas memori
+        
+        Args:
+            key (tuple): Kunci entri
+            image (numpy.ndarray): Gambar yang disimpan
+            persist (bool): Tulis juga ke disk jika cache_dir diisi (default: True)
+        """
+        # Entri dibuat read-only agar pemanggil tidak mengubah isi cache secara tidak sengaja
+        image.flags.writeable = False
+        
+        if persist and self.cache_dir:
+            self._save_disk(key, image)
+        
+        if image.nbytes > self.max_bytes:
+            return
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old.nbytes
+            
+            self._entries[key] = image
+            self.current_bytes += image.nbytes
+            
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+    
+    def clear(self):
+        """
+        Menghapus semua entri cache di memori (file di disk tidak disentuh)
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def _grayscale_source(self, key):
+        return bool(key) and key[0][0] in self.image_processor.GRAYSCALE_STEPS
+    
+    def load_source(self, image_path, steps):
+        """
+        Men-decode gambar sumber persis seperti yang dipakai run untuk pipeline ini
+        
+        Args:
+            image_path (str): Path ke file gambar
+            steps (list): Daftar langkah pipeline
+            
+        Returns:
+            numpy.ndarray: Gambar sumber (grayscale jika langkah pertama hanya butuh grayscale)
+        """
+        key = self.image_processor.pipeline_key(steps)
+        return self.image_processor.load_image(image_path, grayscale=self._grayscale_source(key))
+    
+    def run(self, image_path, steps, source=None):
+        """
+        Menjalankan pipeline dengan memakai ulang prefix pipeline yang sudah tersimpan
+        
+        Setiap hasil antara disimpan, sehingga mengubah langkah terakhir saja
+        hanya menjalankan ulang langkah tersebut.
+        
+        Args:
+            image_path (str): Path ke file gambar
+            steps (list): Daftar langkah pipeline
+            source (numpy.ndarray, optional): Hasil load_source yang sudah ada, agar
+                                              gambar tidak di-decode dua kali
+            
+        Returns:
+            numpy.ndarray: Gambar hasil pipeline (read-only)
+        """
+        key = self.image_processor.pipeline_key(steps)
+        grayscale = self._grayscale_source(key)
+        base = (self.source_hash(image_path), 'gray' if grayscale else 'color')
+        
+        # Cari prefix terpanjang yang sudah tersimpan
+        image = None
+        done = len(key)
+        while done >= 0:
+            image = self.get(base + (key[:done],))
+            if image is not None:
+                break
+            done -= 1
+        
+        if image is not None and done == len(key):
+            self.hits += 1
+            metrics.count('preprocess_cache_hits')
+            return image
+        
+        self.misses += 1
+        metrics.count('preprocess_cache_misses')
+        
+        if image is None:
+            image = source if source is not None else self.image_processor.load_image(image_path, grayscale=grayscale)
+            self.put(base + ((),), image)
+            done = 0
+        
+        for i in range(done, len(key)):
+            image = self.image_processor.apply_step(image, key[i])
+            self.put(base + (key[:i + 1],), image)
+        
+        return image
\ No newline at end of file
@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from .image_processor import ImageProcessor
+
+# Kandidat pipeline, diurutkan dari yang paling murah ke yang paling mahal
+DEFAULT_CANDIDATES = [
+    [('grayscale', {})],
+    [('grayscale', {}), ('threshold', {'method': 'otsu'})],
+    [('grayscale', {}), ('threshold', {'method': 'adaptive', 'block_size': 11, 'c': 2})],
+    [('grayscale', {}), ('threshold', {'method': 'adaptive', 'block_size': 31, 'c': 10})],
+    [('grayscale', {}), ('threshold', {'method': 'otsu'}), ('deskew', {})],
+    [('grayscale', {}), ('denoise', {}), ('threshold', {'method': 'otsu'})],
+    [('grayscale', {}), ('denoise', {}), ('threshold', {'method': 'adaptive', 'block_size': 11, 'c': 2}),
+     ('deskew', {})],
+]
+
+
+class PreprocessTuner:
+    """
+    Kelas untuk memilih pipeline pemrosesan gambar secara otomatis per kelas dokumen
+    """
+    
+    def __init__(self, ocr_engine, image_processor=None, profile_path=None, candidates=None,
+                 sample_size=3, tolerance=2.0, lang='eng', config=''):
+        """
+        Inisialisasi Preprocess Tuner
+        
+        Args:
+            ocr_engine (OCREngine): Instance OCREngine untuk menilai kandidat
+            image_processor (ImageProcessor, optional): Instance ImageProcessor
+            profile_path (str, optional): File JSON tempat profil disimpan.
+                                          Default 'output/preprocess_profiles.json'.
+            candidates (list, optional): Daftar kandidat pipeline
+            sample_size (int): Jumlah halaman contoh untuk uji coba (default: 3)
+            tolerance (float): Selisih confidence yang masih dianggap setara (default: 2.0)
+            lang (str): Kode bahasa untuk OCR (default: 'eng')
+            config (str): Konfigurasi tambahan untuk Tesseract
+        """
+        self.ocr_engine = ocr_engine
+        self.image_processor = image_processor or ImageProcessor()
+        self.profile_path = profile_path or os.path.join('output', 'preprocess_profiles.json')
+        self.candidates = candidates or DEFAULT_CANDIDATES
+        self.sample_size = sample_size
+        self.tolerance = tolerance
+        self.lang = lang
+        self.config = config
+        self._profiles = None
+    
+    def _load_profiles(self):
+        """
+        Memuat profil dari file JSON (sekali saja)
+        
+        Returns:
+            dict: Profil per fingerprint
+        """
+        if self._profiles is None:
+            self._profiles = {}
+            if os.path.exists(self.profile_path):
+                try:
+                    with open(self.profile_path, 'r', encoding='utf-8') as f:
+                        self._profiles = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Peringatan: profil pemrosesan tidak dapat dibaca: {str(e)}")
+        
+        return self._profiles
+    
+    def _save_profiles(self):
+        """
+        Menyimpan profil ke file JSON secara atomik
+        """
+        folder = os.path.dirname(self.profile_path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        
+        # Tulis ke file sementara lalu ganti, agar file tidak rusak jika proses terhenti
+        fd, temp_path = tempfile.mkstemp(suffix='.json', dir=folder)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._profiles, f, indent=2)
+        os.replace(temp_path, self.profile_path)
+    
+    def _as_image(self, image):
+        """
+        Memastikan input berupa gambar OpenCV
+        
+        Args:
+            image (str | numpy.ndarray): Path atau gambar
+            
+        Returns:
+            numpy.ndarray: Gambar dalam format OpenCV
+        """
+        if isinstance(image, np.ndarray):
+            return image
+        return self.image_processor.load_image(image)
+    
+    def features(self, image):
+        """
+        Menghitung ciri kasar gambar yang stabil untuk satu sumber dokumen
+        
+        Args:
+            image (str | numpy.ndarray): Path atau gambar
+            
+        Returns:
+            dict: Ciri gambar yang sudah dikuantisasi
+        """
+        # Path dan array selalu melewati decode yang sama (orientasi EXIF diterapkan)
+        # dan pengecilan yang sama, agar satu gambar selalu menghasilkan ciri yang sama
+        image = self._as_image(image)
+        h, w = image.shape[:2]
+        
+        # Ciri dihitung pada thumbnail agar murah
+        scale = 256.0 / max(h, w)
+        small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else image
+        gray = self.image_processor.grayscale(small)
+        
+        is_color = False
+        if small.ndim == 3:
+            channels = small.astype(np.int16)
+            is_color = bool(np.abs(channels[:, :, 0] - channels[:, :, 2]).mean() > 8)
+        
+        sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+        
+        return {
+            'megapixels': int(round(np.log2(max(h * w, 1) / 1e6) * 2)),
+            'aspect': round(w / float(h), 1),
+            'color': is_color,
+            'brightness': int(gray.mean() // 32),
+            'contrast': int(gray.std() // 16),
+            'sharpness': int(np.log2(sharpness + 1)),
+        }
+    
+    def fingerprint(self, image):
+        """
+        Menghitung fingerprint kelas dokumen dari sebuah gambar
+        
+        Args:
+            image (str | numpy.ndarray): Path atau gambar
+            
+        Returns:
+            str: Fingerprint kelas dokumen
+        """
+        features = self.features(image)
+        raw = json.dumps(features, sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+    
+    def _score(self, image, steps, lang, config):
+        """
+        Menjalankan satu kandidat pipeline dan OCR pada satu gambar
+        
+        Returns:
+            tuple: (rata-rata confidence kata, jumlah kata, durasi detik)
+        """
+        start = time.perf_counter()
+        processed = self.image_processor.apply_pipeline(image, steps)
+        data = self.ocr_engine.image_to_data(processed, lang, config)
+        elapsed = time.perf_counter() - start
+        
+        if data is None or data.empty:
+            return 0.0, 0, elapsed
+        
+        words = data[(data['conf'].astype(float) >= 0) & (data['text'].astype(str).str.strip() != '')]
+        if words.empty:
+            return 0.0, 0, elapsed
+        
+        return float(words['conf'].astype(float).mean()), len(words), elapsed
+    
+    def _sample(self, images):
+        """
+        Mengambil contoh halaman yang tersebar merata dari daftar gambar
+        """
+        images = list(images)
+        if len(images) <= self.sample_size:
+            return images
+        
+        idx = np.linspace(0, len(images) - 1, self.sample_size).round().astype(int)
+        return [images[i] for i in sorted(set(idx))]
+    
+    def tune(self, images, lang=None, config=None):
+        """
+        Mencoba semua kandidat pada contoh halaman dan menyimpan pemenangnya
+        
+        Args:
+            images (list): Daftar path atau gambar dari satu kelas dokumen
+            lang (str, optional): Kode bahasa untuk OCR
+            config (str, optional): Konfigurasi tambahan untuk Tesseract
+            
+        Returns:
+            dict: Profil pemenang
+        """
+        lang = lang or self.lang
+        config = self.config if config is None else config
+        
+        sample = [self._as_image(image) for image in self._sample(images)]
+        if not sample:
+            raise ValueError("Tidak ada gambar untuk tuning")
+        
+        # _sample selalu menyertakan gambar pertama, yang juga dipakai get_pipeline
+        # sebagai kunci pencarian
+        fingerprint = self.fingerprint(sample[0])
+        
+        results = []
+        for steps in self.candidates:
+            scores = [self._score(image, steps, lang, config) for image in sample]
+            results.append({
+                'steps': [list(step) for step in steps],
+                'mean_conf': float(np.mean([s[0] for s in scores])),
+                'words': int(sum(s[1] for s in scores)),
+                'seconds': float(sum(s[2] for s in scores)),
+            })
+        
+        # Kandidat yang kehilangan banyak kata tidak dianggap bagus walau confidence tinggi
+        max_words = max(r['words'] for r in results)
+        eligible = [r for r in results if r['words'] >= 0.5 * max_words] or results
+        
+        # Pilih pipeline termurah yang confidence-nya setara dengan yang terbaik
+        best_conf = max(r['mean_conf'] for r in eligible)
+        good = [r for r in eligible if r['mean_conf'] >= best_conf - self.tolerance]
+        winner = min(good, key=lambda r: r['seconds'])
+        
+        profile = dict(winner)
+        profile['features'] = self.features(sample[0])
+        profile['candidates'] = results
+        profile['updated'] = datetime.now().isoformat(timespec='seconds')
+        
+        self._load_profiles()[fingerprint] = profile
+        self._save_profiles()
+        
+        return profile
+    
+    def get_profile(self, image):
+        """
+        Mendapatkan profil tersimpan untuk kelas dokumen dari sebuah gambar
+        
+        Args:
+            image (str | numpy.ndarray): Path atau gambar
+            
+        Returns:
+            dict: Profil tersimpan, atau None jika belum pernah di-tuning
+        """
+        return self._load_profiles().get(self.fingerprint(image))
+    
+    def get_pipeline(self, images, lang=None, config=None):
+        """
+        Mendapatkan pipeline untuk dokumen, melakukan tuning jika kelasnya belum dikenal
+        
+        Args:
+            images (list): Daftar path atau gambar dari satu dokumen
+            lang (str, optional): Kode bahasa untuk OCR
+            config (str, optional): Konfigurasi tambahan untuk Tesseract
+            
+        Returns:
+            list: Daftar langkah pipeline berupa (nama, parameter)
+        """
+        images = list(images)
+        if not images:
+            raise ValueError("Tidak ada gambar untuk menentukan pipeline")
+        
+        # Decode gambar pertama sekali saja untuk pencarian profil dan tuning
+        images[0] = self._as_image(images[0])
+        profile = self.get_profile(images[0])
+        if profile is None:
+            profile = self.tune(images, lang, config)
+        
+        return [(name, dict(params)) for name, params in profile['steps']]
+    
+    def process(self, image, lang=None, config=None):
+        """
+        Memproses satu gambar dengan pipeline yang sesuai kelas dokumennya
+        
+        Args:
+            image (str | numpy.ndarray): Path atau gambar
+            lang (str, optional): Kode bahasa untuk OCR
+            config (str, optional): Konfigurasi tambahan untuk Tesseract
+            
+        Returns:
+            numpy.ndarray: Gambar hasil pemrosesan
+        """
+        image = self._as_image(image)
+        steps = self.get_pipeline([image], lang, config)
+        return self.image_processor.apply_pipeline(image, steps)
\ No newline at end of file
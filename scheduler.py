@@ -0,0 +1,480 @@
+import re
+import sys
+import threading
+
+import fitz  # PyMuPDF
+
+from .image_processor import ImageProcessor
+from .metrics import metrics
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Penjadwalan OCR berdasarkan anggaran memori (RSS).
+# Setiap file diperkirakan kebutuhan memorinya dari dimensi piksel dan langkah
+# pipeline, lalu hanya dijalankan jika total perkiraan file yang sedang berjalan
+# masih di bawah anggaran. Puncak memori yang terukur di worker dipakai untuk
+# mengoreksi perkiraan berikutnya, sehingga konkurensi menyesuaikan diri.
+
+MB = 1024 * 1024
+
+# Tesseract: model bahasa dan buffer tetap, ditambah beberapa salinan gambar
+# Leptonica (asli, grayscale, biner, dan gambar kerja layout analysis)
+TESSERACT_BASE_BYTES = 48 * MB
+TESSERACT_BYTES_PER_PIXEL = 6
+
+# Memori privat proses worker yang tidak terkait ukuran gambar (modul, pandas, cache)
+WORKER_OVERHEAD_BYTES = 64 * MB
+
+# Jumlah salinan gambar kerja yang hidup bersamaan saat langkah berjalan
+# (input, output, dan buffer sementara OpenCV)
+STEP_FACTORS = {
+    'grayscale': 2,
+    'denoise': 3,
+    'threshold': 2,
+    'adaptive_threshold': 3,
+    'deskew': 4,
+    'remove_borders': 3,
+    'crop_content': 2,
+    'resize': 2,
+}
+
+# Perkiraan cadangan untuk file yang tidak bisa dibaca ukurannya: A4 300 dpi grayscale
+DEFAULT_PAGE_SIZE = (2480, 3508)
+
+# Batas jumlah halaman PDF yang dibaca ukurannya saat memperkirakan
+MAX_SAMPLED_PAGES = 64
+
+SIZE_UNITS = {'': 1, 'k': 1024, 'm': MB, 'g': 1024 * MB, 't': 1024 * 1024 * MB}
+
+
+def parse_size(text):
+    """
+    Membaca ukuran memori seperti '512M', '4G', atau '1.5GiB' menjadi byte
+    
+    Args:
+        text (str): Ukuran dengan satuan opsional K/M/G/T (kelipatan 1024)
+        
+    Returns:
+        int: Ukuran dalam byte
+    """
+    match = re.fullmatch(r'\s*([0-9]*\.?[0-9]+)\s*([kmgt]?)(i?b)?\s*', str(text).lower())
+    if not match:
+        raise ValueError(f"Ukuran memori tidak valid: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(value):
+    """
+    Menampilkan ukuran byte dalam MB untuk pesan status
+    """
+    return f"{value / MB:.0f} MB"
+
+
+def _proc_status_bytes(field):
+    """
+    Membaca nilai memori (kB) dari /proc/self/status, atau None jika tidak tersedia
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _maxrss_bytes(who):
+    if resource is None:
+        return None
+    value = resource.getrusage(who).ru_maxrss
+    # macOS melaporkan byte, Linux dan BSD lainnya kilobyte
+    return value if sys.platform == 'darwin' else value * 1024
+
+
+def current_rss():
+    """
+    RSS proses saat ini dalam byte, atau None jika tidak dapat dibaca
+    """
+    rss = _proc_status_bytes('VmRSS')
+    if rss is None and resource is not None:
+        rss = _maxrss_bytes(resource.RUSAGE_SELF)
+    return rss
+
+
+def peak_rss():
+    """
+    Puncak RSS proses (high-water mark) dalam byte, atau None jika tidak dapat dibaca
+    """
+    peak = _proc_status_bytes('VmHWM')
+    if peak is None and resource is not None:
+        peak = _maxrss_bytes(resource.RUSAGE_SELF)
+    return peak
+
+
+def reset_peak_rss():
+    """
+    Mengatur ulang high-water mark RSS proses (Linux 4.0+)
+    
+    Returns:
+        bool: True jika berhasil, sehingga puncak berikutnya hanya milik item baru
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def children_peak_rss():
+    """
+    RSS terbesar dari subprocess yang sudah selesai (misalnya Tesseract) dalam byte
+    """
+    if resource is None:
+        return None
+    return _maxrss_bytes(resource.RUSAGE_CHILDREN)
+
+
+class PeakTracker:
+    """
+    Mengukur puncak memori satu item di proses worker
+    
+    Bagian Python/OpenCV diukur dari high-water mark proses, bagian Tesseract
+    dari RSS maksimum subprocess. Nilai yang tidak bisa dipastikan milik item
+    ini dilaporkan sebagai None.
+    """
+    
+    def start(self):
+        """
+        Mencatat kondisi awal sebelum item diproses
+        
+        Returns:
+            PeakTracker: Instance ini
+        """
+        self.resettable = reset_peak_rss()
+        self.start_rss = current_rss()
+        self.start_peak = peak_rss()
+        self.start_children = children_peak_rss()
+        return self
+    
+    def result(self):
+        """
+        Returns:
+            dict: python_bytes (di atas RSS awal) dan tesseract_bytes, masing-masing bisa None
+        """
+        python_bytes = None
+        peak = peak_rss()
+        if peak is not None and self.start_rss is not None:
+            # Tanpa reset, high-water mark hanya bermakna jika naik selama item ini
+            if self.resettable or (self.start_peak is not None and peak > self.start_peak):
+                python_bytes = max(0, peak - self.start_rss)
+        
+        tesseract_bytes = None
+        children = children_peak_rss()
+        if children is not None and self.start_children is not None and children > self.start_children:
+            tesseract_bytes = children
+        
+        return {'python_bytes': python_bytes, 'tesseract_bytes': tesseract_bytes}
+
+
+class MemoryEstimator:
+    """
+    Memperkirakan kebutuhan memori OCR per file dari dimensi dan langkah pipeline
+    """
+    
+    def __init__(self, steps=None, dpi=300, image_processor=None):
+        """
+        Inisialisasi Memory Estimator
+        
+        Args:
+            steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+            dpi (int): DPI render halaman PDF (default: 300)
+            image_processor (ImageProcessor, optional): Instance ImageProcessor
+        """
+        self.steps = ImageProcessor.pipeline_key(steps or [])
+        self.dpi = dpi
+        self.image_processor = image_processor or ImageProcessor()
+    
+    def estimate_pixels(self, width, height, channels=3):
+        """
+        Memperkirakan puncak memori OCR satu halaman
+        
+        Args:
+            width (int): Lebar gambar dalam piksel
+            height (int): Tinggi gambar dalam piksel
+            channels (int): Jumlah kanal hasil decode atau render
+            
+        Returns:
+            dict: python (buffer gambar di worker), tesseract, dan total dalam byte
+        """
+        pixels = width * height
+        current = pixels * channels
+        # Buffer decode/render dan array hasil hidup bersamaan sesaat
+        peak = current * 2
+        
+        for name, params in self.steps:
+            params = dict(params)
+            if name == 'resize':
+                if params.get('scale') is not None:
+                    pixels = int(pixels * float(params['scale']) ** 2)
+                elif params.get('width') and params.get('height'):
+                    pixels = int(params['width']) * int(params['height'])
+                elif params.get('width'):
+                    pixels = int(pixels * (int(params['width']) / width) ** 2)
+                elif params.get('height'):
+                    pixels = int(pixels * (int(params['height']) / height) ** 2)
+                resized = pixels * channels
+                peak = max(peak, current + resized)
+                current = resized
+                continue
+            
+            peak = max(peak, current * STEP_FACTORS.get(name, 2))
+            if name in ImageProcessor.GRAYSCALE_STEPS:
+                channels = 1
+                current = pixels
+        
+        # OCREngine mengubah array ke PIL sebelum dikirim ke Tesseract
+        python = max(peak, current * 2)
+        tesseract = TESSERACT_BASE_BYTES + pixels * TESSERACT_BYTES_PER_PIXEL
+        return {'python': python, 'tesseract': tesseract, 'total': python + tesseract}
+    
+    def estimate_document(self, pdf_document):
+        """
+        Memperkirakan puncak memori OCR dokumen PDF (halaman terbesar)
+        
+        Halaman diproses satu per satu, sehingga puncaknya ditentukan halaman
+        terbesar, bukan jumlah halaman.
+        
+        Args:
+            pdf_document (fitz.Document): Dokumen PDF yang sudah dibuka
+            
+        Returns:
+            dict: python, tesseract, dan total dalam byte
+        """
+        scale = self.dpi / 72.0
+        width, height = 0, 0
+        for page_index in range(min(len(pdf_document), MAX_SAMPLED_PAGES)):
+            rect = pdf_document.load_page(page_index).rect
+            if rect.width * rect.height > width * height:
+                width, height = rect.width, rect.height
+        if not width:
+            return self.estimate_pixels(*DEFAULT_PAGE_SIZE, channels=1)
+        return self.estimate_pixels(int(width * scale), int(height * scale), channels=1)
+    
+    def estimate_file(self, path):
+        """
+        Memperkirakan puncak memori OCR satu file gambar atau PDF
+        
+        Hanya header file yang dibaca; piksel tidak di-decode.
+        
+        Args:
+            path (str): Path ke file
+            
+        Returns:
+            dict: python, tesseract, dan total dalam byte
+        """
+        try:
+            if path.lower().endswith('.pdf'):
+                with fitz.open(path) as pdf_document:
+                    return self.estimate_document(pdf_document)
+            
+            width, height = self.image_processor.image_size(path)
+            grayscale = bool(self.steps) and self.steps[0][0] in ImageProcessor.GRAYSCALE_STEPS
+            return self.estimate_pixels(width, height, channels=1 if grayscale else 3)
+        except Exception:
+            # File rusak tetap dijadwalkan; worker yang akan melaporkan error-nya
+            return self.estimate_pixels(*DEFAULT_PAGE_SIZE, channels=3)
+
+
+class MemoryScheduler:
+    """
+    Mengatur file yang boleh berjalan bersamaan agar total memori tidak melebihi anggaran
+    
+    Anggaran dikurangi RSS proses utama dan overhead tetap setiap worker; sisanya
+    dibagi ke file yang sedang berjalan menurut perkiraan MemoryEstimator dikali
+    faktor koreksi. Faktor koreksi langsung naik jika puncak terukur melebihi
+    perkiraan, dan turun perlahan jika perkiraan terlalu besar.
+    """
+    
+    def __init__(self, budget_bytes, max_workers, worker_overhead=WORKER_OVERHEAD_BYTES,
+                 lookahead=16, smoothing=0.3, min_ratio=0.5, max_ratio=4.0):
+        """
+        Inisialisasi Memory Scheduler
+        
+        Args:
+            budget_bytes (int): Anggaran RSS total dalam byte (proses utama dan semua worker)
+            max_workers (int): Batas atas jumlah file yang berjalan bersamaan
+            worker_overhead (int): Memori tetap per proses worker dalam byte
+            lookahead (int): Jumlah file antrean yang diperiksa jika file terdepan belum muat (default: 16)
+            smoothing (float): Bobot observasi baru saat faktor koreksi turun (default: 0.3)
+            min_ratio (float): Faktor koreksi minimum (default: 0.5)
+            max_ratio (float): Faktor koreksi maksimum (default: 4.0)
+        """
+        self.budget = int(budget_bytes)
+        self.worker_overhead = int(worker_overhead)
+        self.lookahead = max(1, lookahead)
+        self.smoothing = smoothing
+        self.min_ratio = min_ratio
+        self.max_ratio = max_ratio
+        self.ratio = 1.0
+        
+        base = current_rss() or 0
+        minimum = self.worker_overhead + TESSERACT_BASE_BYTES
+        if self.budget < base + minimum:
+            raise ValueError(f"Anggaran memori {format_size(self.budget)} terlalu kecil, "
+                             f"minimal {format_size(base + minimum)}")
+        # Worker menganggur tetap memakan overhead, jadi jangan buat lebih banyak dari yang muat
+        self.max_workers = max(1, min(max_workers, (self.budget - base) // minimum))
+        
+        self._reserved = {}
+        self._condition = threading.Condition()
+        self._head_skips = 0
+        self.peak_item = 0
+    
+    def limit(self):
+        """
+        Memori yang tersedia untuk file yang berjalan: anggaran dikurangi RSS proses utama dan overhead worker
+        """
+        return self.budget - (current_rss() or 0) - self.max_workers * self.worker_overhead
+    
+    def _fits(self, cost):
+        if not self._reserved:
+            # File tunggal selalu boleh berjalan agar antrean tidak macet
+            return True
+        if len(self._reserved) >= self.max_workers:
+            return False
+        return sum(reserved for reserved, _ in self._reserved.values()) + cost <= self.limit()
+    
+    def _reserve(self, key, estimate):
+        cost = int(estimate['total'] * self.ratio)
+        self._reserved[key] = (cost, estimate)
+        metrics.count('scheduler_admitted')
+        return cost
+    
+    def try_acquire(self, key, estimate):
+        """
+        Memesan memori untuk satu file tanpa menunggu
+        
+        Args:
+            key: Penanda file, dipakai lagi saat release
+            estimate (dict): Hasil MemoryEstimator
+            
+        Returns:
+            bool: True jika file boleh dijalankan
+        """
+        with self._condition:
+            if not self._fits(int(estimate['total'] * self.ratio)):
+                return False
+            self._reserve(key, estimate)
+            return True
+    
+    def acquire(self, key, estimate, cancelled=None, poll=0.5):
+        """
+        Memesan memori untuk satu file, menunggu sampai muat (untuk worker thread)
+        
+        Args:
+            key: Penanda file, dipakai lagi saat release
+            estimate (dict): Hasil MemoryEstimator
+            cancelled (threading.Event, optional): Berhenti menunggu jika di-set
+            poll (float): Jeda pemeriksaan ulang dalam detik (default: 0.5)
+            
+        Returns:
+            bool: True jika memori dipesan, False jika dibatalkan
+        """
+        with self._condition:
+            waited = False
+            while not self._fits(int(estimate['total'] * self.ratio)):
+                if cancelled is not None and cancelled.is_set():
+                    return False
+                waited = True
+                self._condition.wait(poll)
+            if waited:
+                metrics.count('scheduler_waits')
+            self._reserve(key, estimate)
+            return True
+    
+    def pick(self, pending, estimate_of):
+        """
+        Mengambil file berikutnya dari antrean yang muat dalam anggaran
+        
+        File terdepan diutamakan. Jika belum muat, file lebih kecil di belakangnya
+        boleh mendahului, tetapi paling banyak lookahead kali berturut-turut agar
+        file besar tidak tertunda selamanya.
+        
+        Args:
+            pending (collections.deque): Antrean file; item yang dipilih dihapus dari antrean
+            estimate_of (callable): Mengembalikan perkiraan (dict) untuk satu item
+            
+        Returns:
+            Item yang sudah dipesan memorinya, atau None jika belum ada yang muat
+        """
+        with self._condition:
+            for index in range(min(len(pending), self.lookahead)):
+                if index > 0 and self._head_skips >= self.lookahead:
+                    break
+                item = pending[index]
+                estimate = estimate_of(item)
+                if not self._fits(int(estimate['total'] * self.ratio)):
+                    continue
+                
+                del pending[index]
+                self._head_skips = 0 if index == 0 else self._head_skips + 1
+                self._reserve(item, estimate)
+                return item
+        
+        metrics.count('scheduler_deferred')
+        return None
+    
+    def release(self, key, observed=None):
+        """
+        Melepas memori yang dipesan dan mengoreksi perkiraan dari puncak terukur
+        
+        Args:
+            key: Penanda file yang dipakai saat acquire
+            observed (dict, optional): Hasil PeakTracker.result() dari worker
+        """
+        with self._condition:
+            entry = self._reserved.pop(key, None)
+            if entry is not None and observed:
+                self._learn(entry[1], observed)
+            self._condition.notify_all()
+    
+    def _learn(self, estimate, observed):
+        python_bytes = observed.get('python_bytes')
+        tesseract_bytes = observed.get('tesseract_bytes')
+        if python_bytes is None and tesseract_bytes is None:
+            return
+        
+        # Bagian yang tidak terukur dianggap sesuai perkiraan
+        actual = ((estimate['python'] if python_bytes is None else python_bytes) +
+                  (estimate['tesseract'] if tesseract_bytes is None else tesseract_bytes))
+        self.peak_item = max(self.peak_item, actual)
+        
+        ratio = actual / float(estimate['total'])
+        if ratio > self.ratio:
+            self.ratio = ratio
+        else:
+            self.ratio = (1 - self.smoothing) * self.ratio + self.smoothing * ratio
+        self.ratio = min(self.max_ratio, max(self.min_ratio, self.ratio))
+    
+    def stats(self):
+        """
+        Status anggaran memori
+        
+        Returns:
+            dict: budget, limit, reserved, running, max_workers, ratio, dan peak_item dalam byte
+        """
+        with self._condition:
+            return {
+                'budget': self.budget,
+                'limit': self.limit(),
+                'reserved': sum(cost for cost, _ in self._reserved.values()),
+                'running': len(self._reserved),
+                'max_workers': self.max_workers,
+                'ratio': round(self.ratio, 3),
+                'peak_item': self.peak_item,
+            }
\ No newline at end of file
@@ -0,0 +1,286 @@
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT NOT NULL UNIQUE,
+    path TEXT,
+    added TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    UNIQUE (doc_id, page)
+);
+CREATE TABLE IF NOT EXISTS words (
+    page_id INTEGER NOT NULL REFERENCES pages(id) ON DELETE CASCADE,
+    token TEXT NOT NULL,
+    text TEXT NOT NULL,
+    left INTEGER,
+    top INTEGER,
+    width INTEGER,
+    height INTEGER,
+    conf REAL
+);
+CREATE INDEX IF NOT EXISTS words_page_token ON words (page_id, token);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    text, content='pages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts (pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+# Kata kunci operator FTS5 yang bukan istilah pencarian
+FTS_OPERATORS = {'AND', 'OR', 'NOT', 'NEAR'}
+
+
+def normalize_token(text):
+    """
+    Menormalkan teks seperti tokenizer unicode61: huruf kecil dan tanpa diakritik
+    
+    Args:
+        text (str): Teks asli
+        
+    Returns:
+        str: Teks yang dinormalkan
+    """
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """
+    Memecah teks menjadi token seperti tokenizer unicode61
+    
+    Karakter selain huruf dan angka (termasuk garis bawah) adalah pemisah,
+    sehingga satu kata OCR seperti "e-mail" atau "Rp1.234" menghasilkan
+    beberapa token, persis seperti yang disimpan FTS5 untuk teks halaman.
+    
+    Args:
+        text (str): Teks asli
+        
+    Returns:
+        list: Daftar token yang dinormalkan
+    """
+    return [token for token in re.split(r'[\W_]+', normalize_token(text)) if token]
+
+
+class SearchIndex:
+    """
+    Kelas untuk indeks pencarian teks lengkap hasil OCR menggunakan SQLite FTS5
+    """
+    
+    def __init__(self, index_path):
+        """
+        Inisialisasi Search Index
+        
+        Args:
+            index_path (str): Path ke file database SQLite
+        """
+        self.index_path = index_path
+        self.conn = sqlite3.connect(index_path)
+        self.conn.row_factory = sqlite3.Row
+        
+        # WAL membuat pencarian tetap berjalan saat dokumen baru ditambahkan
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+    
+    def close(self):
+        """
+        Menutup koneksi database
+        """
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def has_document(self, doc_key):
+        """
+        Mengecek apakah dokumen sudah ada di indeks
+        
+        Args:
+            doc_key (str): Kunci unik dokumen
+            
+        Returns:
+            bool: True jika dokumen sudah diindeks
+        """
+        row = self.conn.execute("SELECT 1 FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+        return row is not None
+    
+    def _word_rows(self, page_id, data):
+        """
+        Menyusun baris tabel words dari DataFrame image_to_data
+        """
+        if 'level' in data.columns:
+            data = data[data['level'] == 5]
+        data = data[data['text'].notna()]
+        
+        # Satu baris per token agar setiap token FTS5 punya kotak untuk disorot
+        rows = []
+        for text, left, top, width, height, conf in zip(
+                data['text'].astype(str), data['left'].astype(int), data['top'].astype(int),
+                data['width'].astype(int), data['height'].astype(int), data['conf'].astype(float)):
+            for token in dict.fromkeys(tokenize(text)):
+                rows.append((page_id, token, text, left, top, width, height, conf))
+        return rows
+    
+    def _insert_document(self, doc_key, pages, path=None):
+        """
+        Menyisipkan satu dokumen (menggantikan versi lama) di dalam transaksi aktif
+        """
+        self.conn.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+        cursor = self.conn.execute(
+            "INSERT INTO documents (doc_key, path, added) VALUES (?, ?, ?)",
+            (doc_key, path, datetime.now().isoformat(timespec='seconds'))
+        )
+        doc_id = cursor.lastrowid
+        
+        for page, text, data in pages:
+            # Teks halaman disusun dari kata-kata jika tidak diberikan
+            if text is None and data is not None:
+                text = ' '.join(data['text'].dropna().astype(str))
+            
+            cursor = self.conn.execute(
+                "INSERT INTO pages (doc_id, page, text) VALUES (?, ?, ?)", (doc_id, page, text or '')
+            )
+            
+            if data is not None and not data.empty:
+                self.conn.executemany(
+                    "INSERT INTO words (page_id, token, text, left, top, width, height, conf) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._word_rows(cursor.lastrowid, data)
+                )
+    
+    def add_document(self, doc_key, pages, path=None):
+        """
+        Menambahkan atau memperbarui satu dokumen di indeks
+        
+        Args:
+            doc_key (str): Kunci unik dokumen
+            pages (iterable): Tuple (nomor_halaman, teks, DataFrame image_to_data) per halaman.
+                              Teks atau DataFrame boleh None.
+            path (str, optional): Path file sumber
+        """
+        try:
+            with self.conn:
+                self._insert_document(doc_key, pages, path)
+        except Exception as e:
+            raise Exception(f"Error saat menambahkan dokumen ke indeks: {str(e)}")
+    
+    def add_documents(self, documents):
+        """
+        Menambahkan banyak dokumen dalam satu transaksi
+        
+        Args:
+            documents (iterable): Tuple (doc_key, path, pages) per dokumen
+            
+        Returns:
+            int: Jumlah dokumen yang ditambahkan
+        """
+        try:
+            count = 0
+            with self.conn:
+                for doc_key, path, pages in documents:
+                    self._insert_document(doc_key, pages, path)
+                    count += 1
+            return count
+        except Exception as e:
+            raise Exception(f"Error saat menambahkan dokumen ke indeks: {str(e)}")
+    
+    def remove_document(self, doc_key):
+        """
+        Menghapus dokumen dari indeks
+        
+        Args:
+            doc_key (str): Kunci unik dokumen
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+    
+    def _query_terms(self, query):
+        """
+        Mengambil istilah pencarian dari query FTS5 untuk menyorot kotak kata
+        
+        Returns:
+            tuple: (set token persis, set prefix token)
+        """
+        exact, prefixes = set(), set()
+        for term, star in re.findall(r'(\w+)(\*?)', query):
+            if term in FTS_OPERATORS:
+                continue
+            tokens = tokenize(term)
+            # Seperti FTS5, tanda * hanya berlaku untuk token terakhir istilah
+            if star and tokens:
+                prefixes.add(tokens.pop())
+            exact.update(tokens)
+        return exact, prefixes
+    
+    def _boxes(self, page_id, exact, prefixes):
+        """
+        Mengambil kotak kata di halaman yang cocok dengan istilah pencarian
+        """
+        conditions, params = [], [page_id]
+        if exact:
+            conditions.append(f"token IN ({', '.join('?' * len(exact))})")
+            params.extend(exact)
+        for prefix in prefixes:
+            conditions.append("token LIKE ?")
+            params.append(prefix.replace('%', '').replace('_', '') + '%')
+        if not conditions:
+            return []
+        
+        rows = self.conn.execute(
+            "SELECT DISTINCT text, left, top, width, height, conf FROM words "
+            f"WHERE page_id = ? AND ({' OR '.join(conditions)})", params
+        )
+        return [dict(row) for row in rows]
+    
+    def search(self, query, limit=20, with_boxes=True):
+        """
+        Mencari halaman yang cocok dengan query FTS5
+        
+        Args:
+            query (str): Query FTS5, misalnya 'faktur AND pajak' atau 'kontra*'
+            limit (int): Jumlah hasil maksimum (default: 20)
+            with_boxes (bool): Sertakan kotak kata untuk disorot (default: True)
+            
+        Returns:
+            list: Daftar dict berisi doc_key, path, page, score, snippet, dan boxes
+        """
+        try:
+            rows = self.conn.execute(
+                "SELECT p.id AS page_id, d.doc_key, d.path, p.page, bm25(pages_fts) AS score, "
+                "snippet(pages_fts, 0, '[', ']', '...', 12) AS snippet "
+                "FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+                "JOIN documents d ON d.id = p.doc_id "
+                "WHERE pages_fts MATCH ? ORDER BY score LIMIT ?",
+                (query, limit)
+            ).fetchall()
+            
+            exact, prefixes = self._query_terms(query)
+            
+            results = []
+            for row in rows:
+                result = dict(row)
+                page_id = result.pop('page_id')
+                if with_boxes:
+                    result['boxes'] = self._boxes(page_id, exact, prefixes)
+                results.append(result)
+            
+            return results
+        except Exception as e:
+            raise Exception(f"Error saat mencari di indeks: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,714 @@
+import io
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+from PIL import Image
+
+from .ocr_engine import OCREngine
+from .image_processor import ImageProcessor
+from .pdf_handler import PDFHandler
+from .cli import parse_steps
+from .metrics import metrics
+from .scheduler import MemoryEstimator, MemoryScheduler, DEFAULT_PAGE_SIZE, parse_size
+
+# Layanan OCR HTTP lokal tanpa dependensi web framework.
+# Contoh: python -m app.server --port 8080
+#   curl --data-binary @scan.png "localhost:8080/ocr?lang=ind"
+#   curl --data-binary @dokumen.pdf "localhost:8080/jobs"        -> {"id": ...}
+#   curl "localhost:8080/jobs/<id>/stream"                       -> NDJSON per halaman
+
+# PyMuPDF tidak thread-safe; akses dokumen diserialkan, OCR tetap paralel
+_fitz_lock = threading.Lock()
+
+# Parameter langkah pipeline yang boleh diatur klien HTTP beserta tipe dan
+# batasnya. Nilai angka dijepit ke rentang ini seperti dpi, karena misalnya
+# resize:scale=50 pada halaman 300 DPI bisa menghabiskan memori server.
+STEP_LIMITS = {
+    'resize': {'width': (int, 16, 8000), 'height': (int, 16, 8000), 'scale': (float, 0.1, 4.0)},
+    'threshold': {'method': ('binary', 'adaptive', 'otsu'), 'block_size': (int, 3, 255), 'c': (float, -100, 100)},
+    'adaptive_threshold': {'block_size': (int, 3, 255), 'c': (float, -100, 100)},
+    'remove_borders': {'margin': (int, 0, 500)},
+    'crop_content': {'margin': (int, 0, 500), 'min_density': (float, 0.0, 0.5)},
+}
+
+
+def limit_steps(steps):
+    """
+    Memeriksa dan menjepit parameter langkah pipeline dari klien HTTP
+    
+    Args:
+        steps (list): Daftar langkah hasil parse_steps
+        
+    Returns:
+        list: Daftar langkah dengan parameter yang sudah dibatasi
+        
+    Raises:
+        ValueError: Jika parameter tidak diizinkan atau tipenya salah
+    """
+    limited = []
+    for name, kwargs in steps:
+        allowed = STEP_LIMITS.get(name, {})
+        params = {}
+        for key, value in kwargs.items():
+            if key not in allowed:
+                raise ValueError(f"Parameter {key} tidak diizinkan untuk langkah {name}")
+            spec = allowed[key]
+            if isinstance(spec[0], str):
+                if value not in spec:
+                    raise ValueError(f"Nilai {key} untuk langkah {name} harus salah satu dari: {', '.join(spec)}")
+                params[key] = value
+                continue
+            
+            cast, low, high = spec
+            if isinstance(value, str) or (cast is int and isinstance(value, float) and not value.is_integer()):
+                raise ValueError(f"Nilai {key} untuk langkah {name} harus berupa {'bilangan bulat' if cast is int else 'angka'}")
+            params[key] = min(high, max(low, cast(value)))
+        
+        # Ukuran blok threshold adaptif harus ganjil
+        if 'block_size' in params:
+            params['block_size'] |= 1
+        limited.append((name, params))
+    return limited
+
+
+class OCRJob:
+    """
+    Satu permintaan OCR (gambar atau PDF) beserta hasil per halaman
+    """
+    
+    def __init__(self, data, is_pdf, params):
+        """
+        Inisialisasi job
+        
+        Args:
+            data (bytes): Isi file yang dikirim
+            is_pdf (bool): True jika data berupa PDF
+            params (dict): lang, config, steps, dpi, skip_blank, words
+        """
+        self.id = uuid.uuid4().hex
+        self.data = data
+        self.is_pdf = is_pdf
+        self.params = params
+        self.status = 'queued'
+        self.pages = []
+        self.total_pages = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancelled = threading.Event()
+        self.condition = threading.Condition()
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'error', 'cancelled')
+    
+    def add_page(self, page):
+        with self.condition:
+            self.pages.append(page)
+            self.condition.notify_all()
+    
+    def finish(self, status, error=None):
+        with self.condition:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+            # Data masukan tidak dibutuhkan lagi setelah selesai
+            self.data = None
+            self.condition.notify_all()
+    
+    def wait(self, timeout=None):
+        """
+        Menunggu job selesai
+        
+        Returns:
+            bool: True jika job selesai sebelum timeout
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.is_finished, timeout)
+    
+    def wait_pages(self, sent, timeout=None):
+        """
+        Menunggu halaman setelah indeks sent atau job selesai
+        
+        Returns:
+            tuple: (halaman baru, job sudah selesai)
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: len(self.pages) > sent or self.is_finished, timeout)
+            return self.pages[sent:], self.is_finished
+    
+    def summary(self, with_pages=True):
+        """
+        Ringkasan job untuk respons JSON
+        """
+        with self.condition:
+            result = {
+                'id': self.id,
+                'status': self.status,
+                'pages_done': len(self.pages),
+                'total_pages': self.total_pages,
+                'error': self.error,
+                'queued_seconds': round((self.started or time.time()) - self.created, 3),
+                'seconds': round((self.finished or time.time()) - self.started, 3) if self.started else None,
+            }
+            if with_pages:
+                result['pages'] = list(self.pages)
+            return result
+
+
+class OCRService:
+    """
+    Antrean OCR terbatas dengan pool worker untuk layanan HTTP
+    
+    Worker berupa thread: Tesseract berjalan sebagai subprocess dan OpenCV
+    melepas GIL, sehingga beberapa halaman tetap di-OCR paralel di semua core.
+    """
+    
+    def __init__(self, workers=None, queue_size=32, max_jobs=1000, tesseract_cmd=None,
+                 default_lang='eng', default_dpi=300, memory_budget=None):
+        """
+        Inisialisasi OCR Service
+        
+        Args:
+            workers (int, optional): Jumlah worker (default: jumlah CPU)
+            queue_size (int): Jumlah job menunggu maksimum sebelum menolak dengan 429 (default: 32)
+            max_jobs (int): Jumlah job selesai yang disimpan untuk polling (default: 1000)
+            tesseract_cmd (str, optional): Path ke executable Tesseract
+            default_lang (str): Bahasa OCR jika tidak diberikan (default: 'eng')
+            default_dpi (int): DPI render PDF jika tidak diberikan (default: 300)
+            memory_budget (int, optional): Anggaran RSS proses dalam byte. Jika diisi, job
+                                           hanya dimulai jika perkiraan memorinya muat.
+        """
+        self.ocr_engine = OCREngine(tesseract_cmd)
+        self.image_processor = ImageProcessor()
+        self.pdf_handler = PDFHandler(self.ocr_engine, self.image_processor)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.max_jobs = max_jobs
+        self.default_lang = default_lang
+        self.default_dpi = default_dpi
+        
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._active = 0
+        self._threads = []
+        # Worker berupa thread dalam satu proses, jadi tidak ada overhead per worker
+        self.scheduler = MemoryScheduler(memory_budget, self.workers, worker_overhead=0) if memory_budget else None
+        self.counters = {'accepted': 0, 'rejected': 0, 'done': 0, 'failed': 0, 'pages': 0}
+    
+    def start(self):
+        """
+        Menjalankan thread worker
+        """
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"ocr-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def shutdown(self):
+        """
+        Menghentikan worker setelah job yang sedang berjalan selesai
+        """
+        # Batalkan job yang masih menunggu agar klien tidak menunggu selamanya
+        while True:
+            try:
+                job = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish('cancelled')
+        
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def parse_params(self, query):
+        """
+        Membaca parameter OCR dari query string
+        
+        Hanya psm dan oem yang diteruskan ke Tesseract; opsi bebas tidak
+        diterima agar klien tidak bisa mengatur file output Tesseract.
+        Parameter langkah pipeline dibatasi oleh STEP_LIMITS sehingga nilai
+        yang salah ditolak dengan 400, bukan gagal di tengah job.
+        
+        Args:
+            query (dict): Hasil parse_qs
+            
+        Returns:
+            dict: lang, config, steps, dpi, skip_blank, words
+        """
+        def get(name, default=None):
+            return query.get(name, [default])[0]
+        
+        config = []
+        for option in ('psm', 'oem'):
+            value = get(option)
+            if value is not None:
+                config.append(f"--{option} {int(value)}")
+        
+        lang = get('lang', self.default_lang)
+        if not re.fullmatch(r'[A-Za-z0-9_]+(\+[A-Za-z0-9_]+)*', lang):
+            raise ValueError(f"Kode bahasa tidak valid: {lang}")
+        
+        return {
+            'lang': lang,
+            'config': ' '.join(config),
+            'steps': limit_steps(parse_steps(get('steps', ''))),
+            'dpi': min(600, max(72, int(get('dpi', self.default_dpi)))),
+            'skip_blank': get('skip_blank', '0') in ('1', 'true', 'yes'),
+            'words': get('words', '0') in ('1', 'true', 'yes'),
+        }
+    
+    def submit(self, data, is_pdf, params, register=True):
+        """
+        Memasukkan job ke antrean tanpa menunggu
+        
+        Args:
+            data (bytes): Isi file
+            is_pdf (bool): True jika data berupa PDF
+            params (dict): Parameter dari parse_params
+            register (bool): Simpan job agar bisa di-poll (default: True)
+            
+        Returns:
+            OCRJob: Job yang diantrekan, atau None jika antrean penuh
+        """
+        job = OCRJob(data, is_pdf, params)
+        try:
+            self.queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.counters['rejected'] += 1
+            metrics.count('http_rejected')
+            return None
+        
+        with self._lock:
+            self.counters['accepted'] += 1
+            if register:
+                self.jobs[job.id] = job
+                self._prune_jobs()
+        return job
+    
+    def _prune_jobs(self):
+        """
+        Membuang job selesai paling lama jika jumlah job melebihi max_jobs
+        """
+        excess = len(self.jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.is_finished][:excess]:
+            del self.jobs[job_id]
+    
+    def get_job(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+    
+    def cancel_job(self, job_id):
+        """
+        Membatalkan job; halaman yang sudah selesai tetap tersedia
+        
+        Returns:
+            OCRJob: Job yang dibatalkan, atau None jika tidak ditemukan
+        """
+        job = self.get_job(job_id)
+        if job is not None:
+            job.cancelled.set()
+        return job
+    
+    def stats(self):
+        """
+        Statistik antrean dan worker
+        """
+        with self._lock:
+            stats = dict(self.counters, queued=self.queue.qsize(), queue_size=self.queue.maxsize,
+                         active=self._active, workers=self.workers, jobs=len(self.jobs))
+        if self.scheduler is not None:
+            stats['memory'] = self.scheduler.stats()
+        return stats
+    
+    def estimate_job(self, job):
+        """
+        Memperkirakan puncak memori job dari header gambar atau ukuran halaman PDF
+        
+        Returns:
+            dict: python, tesseract, dan total dalam byte
+        """
+        estimator = MemoryEstimator(job.params['steps'], job.params['dpi'], self.image_processor)
+        try:
+            if job.is_pdf:
+                with _fitz_lock:
+                    with fitz.open(stream=job.data, filetype='pdf') as pdf_document:
+                        estimate = estimator.estimate_document(pdf_document)
+            else:
+                with Image.open(io.BytesIO(job.data)) as pil_image:
+                    estimate = estimator.estimate_pixels(*pil_image.size, channels=3)
+        except Exception:
+            estimate = estimator.estimate_pixels(*DEFAULT_PAGE_SIZE, channels=3)
+        # Isi file yang diunggah juga tinggal di memori selama job berjalan
+        estimate['python'] += len(job.data)
+        estimate['total'] += len(job.data)
+        return estimate
+    
+    def _worker_loop(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            
+            if job.cancelled.is_set():
+                job.finish('cancelled')
+                continue
+            
+            # Tunggu sampai memori job muat; job lain tetap berjalan dan melepas memori
+            if self.scheduler is not None and not self.scheduler.acquire(job.id, self.estimate_job(job), job.cancelled):
+                job.finish('cancelled')
+                continue
+            
+            with self._lock:
+                self._active += 1
+            job.status = 'running'
+            job.started = time.time()
+            metrics.observe('queue_wait', job.started - job.created)
+            try:
+                with metrics.span('job', kind='pdf' if job.is_pdf else 'image'):
+                    self._run_job(job)
+                status, error = ('cancelled', None) if job.cancelled.is_set() else ('done', None)
+            except Exception as e:
+                status, error = 'error', str(e)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                if self.scheduler is not None:
+                    self.scheduler.release(job.id)
+            
+            with self._lock:
+                self.counters['done' if status == 'done' else 'failed'] += 1
+                self.counters['pages'] += len(job.pages)
+            job.finish(status, error)
+    
+    def _iter_pages(self, job):
+        """
+        Mengiterasi halaman job sebagai (nomor halaman, gambar atau None untuk halaman kosong)
+        """
+        if not job.is_pdf:
+            image = cv2.imdecode(np.frombuffer(job.data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                raise Exception("Data bukan gambar yang dapat dibaca")
+            job.total_pages = 1
+            yield 1, None if job.params['skip_blank'] and self.image_processor.is_blank(image) else image
+            return
+        
+        with _fitz_lock:
+            pdf_document = fitz.open(stream=job.data, filetype='pdf')
+            job.total_pages = len(pdf_document)
+        try:
+            for page_index in range(job.total_pages):
+                if job.cancelled.is_set():
+                    return
+                # Render di bawah lock, OCR di luar lock
+                with _fitz_lock:
+                    page = pdf_document.load_page(page_index)
+                    if job.params['skip_blank'] and self.pdf_handler.is_blank_page(page):
+                        image = None
+                    else:
+                        image = self.pdf_handler.render_page(page, dpi=job.params['dpi'], grayscale=True)
+                yield page_index + 1, image
+        finally:
+            with _fitz_lock:
+                pdf_document.close()
+    
+    def _run_job(self, job):
+        params = job.params
+        for page_num, image in self._iter_pages(job):
+            started = time.perf_counter()
+            page = {'page': page_num, 'text': ''}
+            
+            if image is not None:
+                if params['steps']:
+                    image = self.image_processor.apply_pipeline(image, params['steps'])
+                data = self.ocr_engine.image_to_data(image, params['lang'], params['config'], words_only=False)
+                page['text'] = self.ocr_engine.data_to_text(data)
+                
+                if params['words']:
+                    words = data[(data['level'] == 5) & data['text'].notna()]
+                    page['words'] = [
+                        {'text': str(row.text), 'left': int(row.left), 'top': int(row.top),
+                         'width': int(row.width), 'height': int(row.height), 'conf': float(row.conf)}
+                        for row in words.itertuples(index=False)
+                    ]
+            
+            page['seconds'] = round(time.perf_counter() - started, 3)
+            job.add_page(page)
+            
+            if job.cancelled.is_set():
+                break
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handler HTTP untuk endpoint /ocr, /jobs, /health, dan /metrics
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    server_version = 'TesseractOCR/1.0'
+    
+    @property
+    def service(self):
+        return self.server.service
+    
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+    
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_error_json(self, status, message, headers=None):
+        self.send_json(status, {'error': message}, headers)
+    
+    def read_body(self, max_bytes):
+        """
+        Membaca body request; mengembalikan None jika respons error sudah dikirim
+        """
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            self.send_error_json(400, "Body kosong; kirim isi file gambar atau PDF")
+            return None
+        if length > max_bytes:
+            # Tutup koneksi agar sisa body yang tidak dibaca tidak dianggap request berikutnya
+            self.close_connection = True
+            self.send_error_json(413, f"Ukuran file melebihi batas {max_bytes} byte")
+            return None
+        return self.rfile.read(length)
+    
+    def _submit(self, register):
+        """
+        Membaca body dan parameter lalu memasukkan job ke antrean
+        
+        Returns:
+            OCRJob: Job yang diantrekan, atau None jika respons error sudah dikirim
+        """
+        parts = urlsplit(self.path)
+        try:
+            params = self.service.parse_params(parse_qs(parts.query))
+        except ValueError as e:
+            self.close_connection = True
+            self.send_error_json(400, str(e))
+            return None
+        
+        max_bytes = self.server.max_job_bytes if register else self.server.max_sync_bytes
+        data = self.read_body(max_bytes)
+        if data is None:
+            return None
+        
+        is_pdf = data[:5] == b'%PDF-'
+        if is_pdf and not register:
+            self.send_error_json(415, "Gunakan POST /jobs untuk PDF")
+            return None
+        
+        job = self.service.submit(data, is_pdf, params, register=register)
+        if job is None:
+            self.send_error_json(429, "Antrean OCR penuh, coba lagi nanti", {'Retry-After': '1'})
+        return job
+    
+    def do_POST(self):
+        path = urlsplit(self.path).path.rstrip('/')
+        
+        if path == '/ocr':
+            job = self._submit(register=False)
+            if job is None:
+                return
+            if not job.wait(self.server.sync_timeout):
+                job.cancelled.set()
+                self.send_error_json(504, "OCR melebihi batas waktu")
+                return
+            result = job.summary()
+            self.send_json(200 if job.status == 'done' else 500, {
+                'status': result['status'],
+                'error': result['error'],
+                'text': '\f'.join(page['text'] for page in result['pages']),
+                'pages': result['pages'],
+                'queued_seconds': result['queued_seconds'],
+                'seconds': result['seconds'],
+            })
+        elif path == '/jobs':
+            job = self._submit(register=True)
+            if job is not None:
+                self.send_json(202, {'id': job.id, 'status': job.status, 'url': f"/jobs/{job.id}"},
+                               {'Location': f"/jobs/{job.id}"})
+        else:
+            self.send_error_json(404, "Endpoint tidak ditemukan")
+    
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip('/')
+        parts = path.split('/')
+        
+        if path == '/health':
+            self.send_json(200, dict(self.service.stats(), status='ok'))
+        elif path == '/metrics':
+            body = metrics.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif len(parts) in (3, 4) and parts[1] == 'jobs':
+            job = self.service.get_job(parts[2])
+            if job is None:
+                self.send_error_json(404, "Job tidak ditemukan")
+            elif len(parts) == 3:
+                self.send_json(200, job.summary())
+            elif parts[3] == 'stream':
+                self.stream_job(job)
+            else:
+                self.send_error_json(404, "Endpoint tidak ditemukan")
+        else:
+            self.send_error_json(404, "Endpoint tidak ditemukan")
+    
+    def do_DELETE(self):
+        parts = urlsplit(self.path).path.rstrip('/').split('/')
+        if len(parts) == 3 and parts[1] == 'jobs':
+            job = self.service.cancel_job(parts[2])
+            if job is None:
+                self.send_error_json(404, "Job tidak ditemukan")
+            else:
+                self.send_json(202, {'id': job.id, 'status': job.status})
+        else:
+            self.send_error_json(404, "Endpoint tidak ditemukan")
+    
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+    
+    def stream_job(self, job):
+        """
+        Mengirim hasil per halaman sebagai NDJSON segera setelah halaman selesai
+        
+        Baris terakhir berisi ringkasan job dengan "final": true.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        sent = 0
+        try:
+            while True:
+                pages, finished = job.wait_pages(sent, timeout=15)
+                if not pages and not finished:
+                    # Baris kosong menjaga koneksi tetap hidup saat halaman panjang diproses
+                    self.write_chunk(b"\n")
+                    continue
+                
+                for page in pages:
+                    self.write_chunk(json.dumps(page, ensure_ascii=False).encode('utf-8') + b"\n")
+                sent += len(pages)
+                
+                if finished and sent >= len(job.pages):
+                    summary = dict(job.summary(with_pages=False), final=True)
+                    self.write_chunk(json.dumps(summary, ensure_ascii=False).encode('utf-8') + b"\n")
+                    self.write_chunk(b"")
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            # Klien memutus koneksi; job tetap berjalan dan bisa di-poll
+            self.close_connection = True
+
+
+def create_server(service, host='127.0.0.1', port=8080, max_sync_bytes=10 * 1024 * 1024,
+                  max_job_bytes=200 * 1024 * 1024, sync_timeout=120, quiet=False):
+    """
+    Membuat server HTTP untuk OCR Service
+    
+    Args:
+        service (OCRService): Service yang sudah dijalankan
+        host (str): Alamat bind (default: '127.0.0.1')
+        port (int): Port (default: 8080)
+        max_sync_bytes (int): Ukuran body maksimum untuk POST /ocr
+        max_job_bytes (int): Ukuran body maksimum untuk POST /jobs
+        sync_timeout (float): Batas waktu tunggu POST /ocr dalam detik (default: 120)
+        quiet (bool): Matikan log per request (default: False)
+        
+    Returns:
+        ThreadingHTTPServer: Server yang siap dijalankan dengan serve_forever()
+    """
+    server = ThreadingHTTPServer((host, port), OCRRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.max_sync_bytes = max_sync_bytes
+    server.max_job_bytes = max_job_bytes
+    server.sync_timeout = sync_timeout
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.server', description="Layanan OCR HTTP lokal")
+    parser.add_argument('--host', default='127.0.0.1', help="Alamat bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="Port (default: 8080)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Jumlah worker (default: jumlah CPU)")
+    parser.add_argument('--queue-size', type=int, default=32, help="Panjang antrean sebelum 429 (default: 32)")
+    parser.add_argument('--lang', default='eng', help="Bahasa OCR default (default: eng)")
+    parser.add_argument('--dpi', type=int, default=300, help="DPI render PDF default (default: 300)")
+    parser.add_argument('--max-sync-mb', type=float, default=10, help="Ukuran maksimum POST /ocr dalam MB")
+    parser.add_argument('--max-job-mb', type=float, default=200, help="Ukuran maksimum POST /jobs dalam MB")
+    parser.add_argument('--sync-timeout', type=float, default=120, help="Batas waktu POST /ocr dalam detik")
+    parser.add_argument('--tesseract-cmd', help="Path ke executable Tesseract")
+    parser.add_argument('--memory-budget', type=parse_size, default=None, metavar='SIZE',
+                        help="Batas RSS proses, misalnya 4G; job menunggu sampai memorinya muat")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Matikan log per request")
+    parser.add_argument('--metrics', action='store_true', help="Kumpulkan metrik per tahap untuk GET /metrics")
+    parser.add_argument('--metrics-log', metavar='PATH', help="Tulis span dan counter sebagai log JSON")
+    args = parser.parse_args(argv)
+    
+    if args.metrics or args.metrics_log:
+        metrics.enable(log_path=args.metrics_log)
+    
+    # Setiap worker menjalankan Tesseract sendiri; thread OpenMP tambahan hanya berebut core
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    
+    try:
+        service = OCRService(workers=args.workers, queue_size=args.queue_size, tesseract_cmd=args.tesseract_cmd,
+                             default_lang=args.lang, default_dpi=args.dpi, memory_budget=args.memory_budget)
+    except ValueError as e:
+        parser.error(str(e))
+    service.start()
+    server = create_server(service, args.host, args.port, int(args.max_sync_mb * 1024 * 1024),
+                           int(args.max_job_mb * 1024 * 1024), args.sync_timeout, args.quiet)
+    
+    print(f"Layanan OCR berjalan di http://{args.host}:{args.port} dengan {service.workers} worker",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1 @@
+# Pengujian otomatis untuk paket app
\ No newline at end of file
@@ -0,0 +1,28 @@
+from ..batch_processor import CrashTracker
+
+
+def test_crash_with_several_running_only_marks_suspects():
+    tracker = CrashTracker(max_crashes=2)
+    assert tracker.crashed(['a.png', 'b.png', 'c.png']) == []
+    assert tracker.suspects == {'a.png', 'b.png', 'c.png'}
+    assert tracker.counts == {}
+
+
+def test_suspects_run_alone():
+    tracker = CrashTracker()
+    tracker.crashed(['a.png', 'b.png'])
+    assert tracker.can_submit('a.png', [])
+    assert not tracker.can_submit('a.png', ['x.png'])
+    # Selama tersangka berjalan, file lain menunggu
+    assert not tracker.can_submit('x.png', ['a.png'])
+    assert tracker.can_submit('x.png', ['y.png'])
+
+
+def test_file_fails_only_after_repeated_solo_crashes():
+    tracker = CrashTracker(max_crashes=2)
+    tracker.crashed(['a.png', 'b.png'])
+    tracker.succeeded('b.png')
+    assert tracker.crashed(['a.png']) == []
+    assert tracker.crashed(['a.png']) == ['a.png']
+    assert 'a.png' not in tracker.suspects
+    assert 'b.png' not in tracker.suspects
\ No newline at end of file
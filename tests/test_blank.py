@@ -0,0 +1,82 @@
+import fitz  # PyMuPDF
+import numpy as np
+import pytest
+from PIL import Image
+
+from ..batch_processor import _init_worker, _iter_file_pages
+from ..image_processor import ImageProcessor
+from ..pdf_handler import PDFHandler
+
+ONE_LINE_TEXTS = ["Total: Rp 1.234.567", "Signed: J. Doe, 12 March 2024", "Approved"]
+
+
+def text_page(document, text, fontsize=10):
+    page = document.new_page(width=595, height=842)  # A4
+    if text:
+        page.insert_text(fitz.Point(72, 400), text, fontsize=fontsize, fontname='helv')
+    return page
+
+
+def scanned_page(document, text, dpi=200, noise=0.0, seed=0):
+    """
+    Halaman tanpa lapisan teks: hanya gambar hasil render, seperti PDF hasil scan
+    """
+    source = fitz.open()
+    pix = text_page(source, text).get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), colorspace=fitz.csGRAY)
+    if noise:
+        image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).astype(np.float32)
+        image += np.random.default_rng(seed).normal(0, noise, image.shape)
+        pix = fitz.Pixmap(fitz.csGRAY, pix.width, pix.height, np.clip(image, 0, 255).astype(np.uint8).tobytes(), False)
+    page = document.new_page(width=595, height=842)
+    page.insert_image(page.rect, pixmap=pix)
+    return page
+
+
+@pytest.fixture
+def pdf_handler():
+    return PDFHandler(image_processor=ImageProcessor())
+
+
+@pytest.mark.parametrize('text', ONE_LINE_TEXTS)
+def test_one_line_text_layer_is_not_blank(pdf_handler, text):
+    document = fitz.open()
+    assert not pdf_handler.is_blank_page(text_page(document, text))
+
+
+@pytest.mark.parametrize('text', ONE_LINE_TEXTS)
+def test_one_line_scanned_page_is_not_blank(pdf_handler, text):
+    document = fitz.open()
+    page = scanned_page(document, text)
+    assert not page.get_text().strip()
+    assert not pdf_handler.is_blank_page(page)
+
+
+@pytest.mark.parametrize('text', ONE_LINE_TEXTS)
+def test_one_line_image_is_not_blank(pdf_handler, text):
+    document = fitz.open()
+    image = pdf_handler.render_page(text_page(document, text), dpi=300, grayscale=True)
+    assert not ImageProcessor().is_blank(image)
+
+
+def test_empty_page_is_blank(pdf_handler):
+    document = fitz.open()
+    assert pdf_handler.is_blank_page(text_page(document, ''))
+
+
+def test_noisy_scanned_blank_page_is_blank(pdf_handler):
+    document = fitz.open()
+    assert pdf_handler.is_blank_page(scanned_page(document, '', noise=8.0))
+
+
+def test_skip_blank_applies_to_images_and_tiff_frames(pdf_handler, tmp_path):
+    document = fitz.open()
+    pages = [Image.fromarray(pdf_handler.render_page(text_page(document, text), dpi=200, grayscale=True))
+             for text in ('', ONE_LINE_TEXTS[0])]
+    pages[0].save(tmp_path / 'kosong.png')
+    pages[0].save(tmp_path / 'dokumen.tif', save_all=True, append_images=pages[1:])
+    _init_worker()
+    
+    assert [image is None for _, _, image in _iter_file_pages(str(tmp_path / 'kosong.png'), [], 300, True)] == [True]
+    assert [image is None for _, _, image in _iter_file_pages(str(tmp_path / 'kosong.png'), [], 300, False)] == [False]
+    frames = _iter_file_pages(str(tmp_path / 'dokumen.tif'), [], 300, True)
+    assert [image is None for _, _, image in frames] == [True, False]
\ No newline at end of file
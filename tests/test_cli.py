@@ -0,0 +1,30 @@
+import pytest
+
+from ..cli import parse_steps
+
+
+def test_parse_steps_casts_values():
+    steps = parse_steps('grayscale, resize:scale=1.5,threshold:method=otsu:block_size=15')
+    assert steps == [('grayscale', {}), ('resize', {'scale': 1.5}),
+                     ('threshold', {'method': 'otsu', 'block_size': 15})]
+
+
+def test_parse_steps_empty_text():
+    assert parse_steps('') == []
+    assert parse_steps(None) == []
+
+
+def test_help_example_is_valid():
+    assert [name for name, _ in parse_steps('grayscale,resize:scale=1.5,threshold:method=otsu')] == [
+        'grayscale', 'resize', 'threshold']
+
+
+@pytest.mark.parametrize('text, message', [
+    ('blur', 'Langkah pipeline tidak dikenal'),
+    ('denoise:strength=10', 'Parameter tidak dikenal untuk langkah denoise'),
+    ('resize:scal=2', 'Parameter tidak dikenal untuk langkah resize'),
+    ('threshold:otsu', 'kunci=nilai'),
+])
+def test_parse_steps_rejects_invalid_steps(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_steps(text)
\ No newline at end of file
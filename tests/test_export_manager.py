@@ -0,0 +1,30 @@
+import fitz  # PyMuPDF
+
+from ..export_manager import ExportManager
+
+
+def page_texts(path):
+    with fitz.open(path) as pdf:
+        return [page.get_text().split() for page in pdf]
+
+
+def test_form_feed_starts_new_pdf_page(tmp_path):
+    path = str(tmp_path / 'hasil.pdf')
+    ExportManager().export_pdf("Halaman satu\fHalaman dua\f\fHalaman empat\f", path)
+    
+    # Halaman kosong di tengah dipertahankan, '\f' penutup tidak menambah halaman
+    assert page_texts(path) == [['Halaman', 'satu'], ['Halaman', 'dua'], [], ['Halaman', 'empat']]
+
+
+def test_text_without_form_feed_stays_on_one_page(tmp_path):
+    path = str(tmp_path / 'hasil.pdf')
+    ExportManager().export_pdf("Baris satu\nBaris dua", path, title="Judul")
+    assert page_texts(path) == [['Judul', 'Baris', 'satu', 'Baris', 'dua']]
+
+
+def test_batch_bookmarks_point_to_first_page_of_each_document(tmp_path):
+    path = str(tmp_path / 'hasil.pdf')
+    ExportManager().export_pdf_batch([('a.png', 'satu\fdua'), ('b.png', 'tiga')], path)
+    with fitz.open(path) as pdf:
+        assert len(pdf) == 3
+        assert pdf.get_toc() == [[1, 'a.png', 1], [1, 'b.png', 3]]
\ No newline at end of file
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pytest
+
+pytest.importorskip('PyQt6.QtWidgets')
+
+from .. import gui
+
+
+class FakeWidget:
+    """
+    Pengganti widget Qt dengan nilai tetap
+    """
+    
+    def __init__(self, text='eng', checked=True):
+        self.text = text
+        self.checked = checked
+    
+    def currentText(self):
+        return self.text
+    
+    def isChecked(self):
+        return self.checked
+    
+    def setEnabled(self, enabled):
+        pass
+    
+    def setValue(self, value):
+        pass
+    
+    def showMessage(self, message):
+        pass
+
+
+def make_window(tmp_path, autotune):
+    image = np.full((40, 60, 3), 255, dtype=np.uint8)
+    steps = [('grayscale', {})]
+    window = SimpleNamespace(
+        current_image_path=str(tmp_path / 'scan.png'), pdf_document=None, processed_image=None,
+        source_id=7, preview_profile=None, ocr_engine=None,
+        lang_combo=FakeWidget('ind'), autotune_cb=FakeWidget(checked=autotune),
+        ocr_btn=FakeWidget(), progress_bar=FakeWidget(), status_bar=FakeWidget(),
+        get_ocr_config=lambda: '--psm 3', get_pipeline_steps=lambda: steps,
+        tuner=mock.Mock(**{'get_pipeline.return_value': steps}),
+        preprocess_cache=mock.Mock(**{'run.return_value': image}),
+        ocr_finished=None, ocr_error=None,
+    )
+    window._process_image_task = gui.MainWindow._process_image_task.__get__(window)
+    return window
+
+
+@pytest.mark.parametrize('autotune', [False, True])
+def test_run_ocr_task_processes_unprocessed_image(tmp_path, autotune):
+    window = make_window(tmp_path, autotune)
+    with mock.patch.object(gui, 'OCRWorker') as worker:
+        gui.MainWindow.run_ocr(window)
+    
+    # Worker OCR menerima callable yang menjalankan pipeline di thread-nya
+    engine, task, lang, config = worker.call_args.args
+    assert (lang, config) == ('ind', '--psm 3')
+    image = task()
+    
+    window.preprocess_cache.run.assert_called_once_with(window.current_image_path, [('grayscale', {})])
+    assert image is window.preprocess_cache.run.return_value
+    assert window.preview_profile == ((7, [('grayscale', {})]) if autotune else None)
\ No newline at end of file
@@ -0,0 +1,68 @@
+from ..metrics import Metrics
+
+
+def make_metrics():
+    registry = Metrics(buckets=(0.1, 1.0))
+    # Diaktifkan langsung tanpa enable() agar variabel lingkungan OCR_METRICS tidak berubah
+    registry.enabled = True
+    return registry
+
+
+def test_disabled_registry_records_nothing():
+    registry = Metrics()
+    registry.count('pages')
+    with registry.span('ocr'):
+        pass
+    assert registry.snapshot() == {'counters': {}, 'histograms': {}}
+
+
+def test_render_prometheus_counters_and_histograms():
+    registry = make_metrics()
+    registry.count('pages', 2)
+    registry.count('files', status='ok')
+    registry.count('files', status='error')
+    registry.observe('preprocess', 0.05, step='denoise')
+    registry.observe('preprocess', 0.5, step='denoise')
+    registry.observe('preprocess', 3.0, error=True, step='denoise')
+    
+    lines = registry.render_prometheus().splitlines()
+    assert lines == [
+        '# TYPE ocr_files_total counter',
+        'ocr_files_total{status="error"} 1',
+        'ocr_files_total{status="ok"} 1',
+        '# TYPE ocr_pages_total counter',
+        'ocr_pages_total 2',
+        '# HELP ocr_span_seconds Durasi tahap pipeline OCR',
+        '# TYPE ocr_span_seconds histogram',
+        'ocr_span_seconds_bucket{span="preprocess",step="denoise",le="0.1"} 1',
+        'ocr_span_seconds_bucket{span="preprocess",step="denoise",le="1"} 2',
+        'ocr_span_seconds_bucket{span="preprocess",step="denoise",le="+Inf"} 3',
+        'ocr_span_seconds_sum{span="preprocess",step="denoise"} 3.550000',
+        'ocr_span_seconds_count{span="preprocess",step="denoise"} 3',
+        '# TYPE ocr_span_errors_total counter',
+        'ocr_span_errors_total{span="preprocess",step="denoise"} 1',
+    ]
+
+
+def test_render_prometheus_escapes_labels_and_dots():
+    registry = make_metrics()
+    registry.count('cache.hits', path='C:\\scan\\"a".png')
+    assert registry.render_prometheus(prefix='x_').splitlines() == [
+        '# TYPE x_cache_hits_total counter',
+        'x_cache_hits_total{path="C:\\\\scan\\\\\\"a\\".png"} 1',
+    ]
+
+
+def test_merge_worker_snapshot():
+    worker = make_metrics()
+    worker.count('pages', 3)
+    worker.observe('file', 0.2)
+    snapshot = worker.snapshot(reset=True)
+    assert worker.snapshot() == {'counters': {}, 'histograms': {}}
+    
+    main = make_metrics()
+    main.count('pages')
+    main.merge(snapshot)
+    main.merge(None)
+    assert main.snapshot()['counters'] == {('pages', ()): 4}
+    assert main.snapshot()['histograms'] == {('file', ()): [1, 0.2, 0, [0, 1]]}
\ No newline at end of file
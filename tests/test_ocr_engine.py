@@ -0,0 +1,55 @@
+import numpy as np
+import pytesseract
+import pytest
+
+from ..ocr_engine import OCREngine
+
+PAGE = np.full((40, 60), 255, dtype=np.uint8)
+HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def tsv(words):
+    """
+    Menyusun output TSV Tesseract: satu baris per kata dalam (nomor baris, teks)
+    """
+    rows = [HEADER, "1\t1\t0\t0\t0\t0\t0\t0\t600\t400\t-1\t", "2\t1\t1\t0\t0\t0\t10\t10\t500\t100\t-1\t",
+            "3\t1\t1\t1\t0\t0\t10\t10\t500\t100\t-1\t"]
+    for word_num, (line_num, text) in enumerate(words, start=1):
+        rows.append(f"5\t1\t1\t1\t{line_num}\t{word_num}\t{10 * word_num}\t{20 * line_num}\t8\t12\t91.5\t{text}")
+    return ('\n'.join(rows) + '\n').encode('utf-8')
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(pytesseract, 'get_tesseract_version', lambda: '5.0')
+    return OCREngine()
+
+
+def fake_tesseract(monkeypatch, words):
+    monkeypatch.setattr(pytesseract, 'image_to_data', lambda *args, **kwargs: tsv(words))
+
+
+def test_na_like_words_are_kept(engine, monkeypatch):
+    words = [(1, 'N/A'), (1, 'NA'), (1, 'NULL'), (1, 'nan'), (1, 'None'), (1, ' '), (1, '#N/A')]
+    fake_tesseract(monkeypatch, words)
+    
+    data = engine.image_to_data(PAGE)
+    assert list(data['text']) == ['N/A', 'NA', 'NULL', 'nan', 'None', '#N/A']
+    
+    # Baris struktur tetap ada tetapi tanpa teks
+    full = engine.image_to_data(PAGE, words_only=False)
+    assert full[full['level'] < 5]['text'].isna().all()
+    assert full['text'].notna().sum() == 6
+
+
+def test_numeric_only_words_stay_strings(engine, monkeypatch):
+    fake_tesseract(monkeypatch, [(1, '2023'), (1, '0042'), (2, '1.50')])
+    data = engine.image_to_data(PAGE)
+    assert list(data['text']) == ['2023', '0042', '1.50']
+    assert data['conf'].dtype.kind == 'f'
+
+
+def test_data_to_text_keeps_na_like_and_numeric_words(engine, monkeypatch):
+    fake_tesseract(monkeypatch, [(1, 'Total:'), (1, 'N/A'), (2, '2023'), (2, '0042'), (3, 'NULL'), (3, 'nan'), (3, ' ')])
+    text = engine.data_to_text(engine.image_to_data(PAGE, words_only=False))
+    assert text == "Total: N/A\n2023 0042\nNULL nan\n"
\ No newline at end of file
@@ -0,0 +1,41 @@
+import fitz  # PyMuPDF
+import pytest
+
+from ..metrics import metrics
+from ..pdf_handler import PDFDocument
+
+
+@pytest.fixture
+def collected():
+    metrics.reset()
+    metrics.enable()
+    yield lambda name: sum(value for (key, _), value in metrics.snapshot()['counters'].items() if key == name)
+    metrics.disable()
+    metrics.reset()
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = str(tmp_path / 'dokumen.pdf')
+    pdf = fitz.open()
+    for index in range(3):
+        pdf.new_page(width=200, height=300).insert_text(fitz.Point(20, 50), f"Halaman {index + 1}")
+    pdf.save(path)
+    pdf.close()
+    with PDFDocument(path) as document:
+        yield document
+
+
+def test_prefetch_is_not_counted_as_demand_miss(document, collected):
+    document.render(0, 100, 150)
+    document.prefetch([1, 2], 100, 150)
+    document._prefetcher.submit(lambda: None).result()
+    
+    assert collected('pdf_cache_misses') == 1
+    assert collected('pdf_prefetch_renders') == 2
+    
+    # Halaman hasil prefetch langsung tersedia saat dinavigasi
+    document.render(1, 100, 150)
+    document.render(0, 100, 150)
+    assert collected('pdf_cache_hits') == 2
+    assert collected('pdf_cache_misses') == 1
\ No newline at end of file
@@ -0,0 +1,105 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from ..batch_processor import _init_worker, _iter_file_pages, _worker_state
+from ..image_processor import ImageProcessor
+from ..preprocess_cache import PreprocessCache
+
+STEPS = [('grayscale', {}), ('threshold', {'method': 'otsu'})]
+
+
+class CountingProcessor(ImageProcessor):
+    """
+    ImageProcessor yang menghitung langkah pipeline yang benar-benar dijalankan
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.steps_run = 0
+    
+    def apply_step(self, image, step):
+        self.steps_run += 1
+        return super().apply_step(image, step)
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    image = np.full((200, 300, 3), 255, dtype=np.uint8)
+    cv2.putText(image, 'Halo', (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+    path = str(tmp_path / 'halo.png')
+    cv2.imwrite(path, image)
+    return path
+
+
+def test_disk_cache_is_reused_by_new_instance(tmp_path, image_path):
+    cache_dir = str(tmp_path / 'cache')
+    first = PreprocessCache(CountingProcessor(), cache_dir=cache_dir)
+    expected = first.run(image_path, STEPS)
+    assert first.image_processor.steps_run == 2
+    
+    # Instance baru (misalnya proses worker lain) membaca hasil dari disk tanpa menjalankan pipeline
+    second = PreprocessCache(CountingProcessor(), max_bytes=0, cache_dir=cache_dir)
+    assert np.array_equal(second.run(image_path, STEPS), expected)
+    assert second.image_processor.steps_run == 0
+    assert second.hits == 1
+    
+    # Mengubah langkah terakhir hanya menjalankan langkah itu dari prefix di disk
+    second.run(image_path, STEPS[:1] + [('threshold', {'method': 'binary'})])
+    assert second.image_processor.steps_run == 1
+
+
+def test_disk_cache_is_trimmed_to_limit(tmp_path, image_path):
+    cache_dir = str(tmp_path / 'cache')
+    cache = PreprocessCache(cache_dir=cache_dir, max_disk_bytes=150 * 1024)
+    for scale in (1.0, 1.1, 1.2, 1.3):
+        cache.run(image_path, [('resize', {'scale': scale})])
+    total = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+    assert total <= 150 * 1024
+    assert cache.disk_bytes == total
+
+
+def test_batch_worker_uses_disk_cache(tmp_path, image_path):
+    cache_dir = str(tmp_path / 'cache')
+    _init_worker(cache_dir=cache_dir)
+    try:
+        [(_, _, image)] = _iter_file_pages(image_path, STEPS, 300, False)
+        assert image.ndim == 2 and set(np.unique(image)) <= {0, 255}
+        assert os.listdir(cache_dir)
+        assert _worker_state['preprocess_cache'].misses == 1
+        
+        [(_, _, again)] = _iter_file_pages(image_path, STEPS, 300, False)
+        assert np.array_equal(again, image)
+        assert _worker_state['preprocess_cache'].hits == 1
+    finally:
+        _init_worker()
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_skip_blank_checks_source_before_pipeline(tmp_path, cached):
+    blank_path = str(tmp_path / 'kosong.png')
+    cv2.imwrite(blank_path, np.full((400, 300, 3), 255, dtype=np.uint8))
+    # Teks abu-abu muda hilang oleh threshold binary, tetapi sumbernya tidak kosong
+    faint = np.full((400, 300, 3), 255, dtype=np.uint8)
+    for row in range(3):
+        cv2.putText(faint, 'Halo dunia', (10, 100 + 60 * row), cv2.FONT_HERSHEY_SIMPLEX, 1, (170, 170, 170), 2)
+    faint_path = str(tmp_path / 'samar.png')
+    cv2.imwrite(faint_path, faint)
+    steps = [('threshold', {'method': 'binary'})]
+    
+    _init_worker(cache_dir=str(tmp_path / 'cache') if cached else None)
+    try:
+        processor = _worker_state['image_processor']
+        assert processor.is_blank(processor.apply_pipeline(processor.load_image(faint_path), steps))
+        
+        [(_, _, image)] = _iter_file_pages(blank_path, steps, 300, True)
+        assert image is None
+        [(_, _, image)] = _iter_file_pages(faint_path, steps, 300, True)
+        assert image is not None
+        if cached:
+            # Halaman kosong tidak menjalankan pipeline maupun mengisi cache
+            assert _worker_state['preprocess_cache'].misses == 1
+    finally:
+        _init_worker()
\ No newline at end of file
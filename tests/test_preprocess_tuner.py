@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image, ImageDraw
+
+from ..image_processor import ImageProcessor
+from ..preprocess_tuner import PreprocessTuner
+
+
+class FakeOCREngine:
+    """
+    Pengganti OCREngine yang menghitung jumlah panggilan tanpa Tesseract
+    """
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def image_to_data(self, image, lang='eng', config=''):
+        self.calls += 1
+        return pd.DataFrame({'conf': [90.0, 85.0], 'text': ['halo', 'dunia']})
+
+
+def make_page(path, size=(1200, 1600), orientation=None, seed=0):
+    rng = np.random.default_rng(seed)
+    image = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = int(rng.integers(0, size[0] - 200)), int(rng.integers(0, size[1] - 20))
+        draw.rectangle((x, y, x + int(rng.integers(50, 200)), y + 12), fill='black')
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    image.save(path, exif=exif)
+    return str(path)
+
+
+@pytest.fixture
+def tuner(tmp_path):
+    return PreprocessTuner(FakeOCREngine(), profile_path=str(tmp_path / 'profiles.json'), sample_size=1)
+
+
+@pytest.mark.parametrize('orientation', [None, 1, 6, 8])
+def test_path_and_array_have_same_fingerprint(tuner, tmp_path, orientation):
+    path = make_page(tmp_path / 'page.jpg', orientation=orientation)
+    image = ImageProcessor().load_image(path)
+    assert tuner.fingerprint(path) == tuner.fingerprint(image)
+
+
+def test_tuned_profile_is_reused_for_same_file(tuner, tmp_path):
+    path = make_page(tmp_path / 'page.jpg', orientation=6)
+    
+    steps = tuner.get_pipeline([path])
+    calls = tuner.ocr_engine.calls
+    assert calls == len(tuner.candidates)
+    
+    # Panggilan berikutnya dengan path, array, maupun tuner baru tidak tuning ulang
+    assert tuner.get_pipeline([path]) == steps
+    assert tuner.get_pipeline([ImageProcessor().load_image(path)]) == steps
+    reloaded = PreprocessTuner(tuner.ocr_engine, profile_path=tuner.profile_path, sample_size=1)
+    assert reloaded.get_pipeline([path]) == steps
+    assert tuner.ocr_engine.calls == calls
\ No newline at end of file
@@ -0,0 +1,107 @@
+from collections import deque
+
+import pytest
+
+from .. import scheduler
+from ..scheduler import (MB, TESSERACT_BASE_BYTES, TESSERACT_BYTES_PER_PIXEL, MemoryEstimator,
+                         MemoryScheduler, parse_size)
+
+GB = 1024 * MB
+
+
+@pytest.fixture(autouse=True)
+def fixed_rss(monkeypatch):
+    # RSS proses pengujian berubah-ubah; tetapkan agar batas anggaran deterministik
+    monkeypatch.setattr(scheduler, 'current_rss', lambda: 100 * MB)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1024', 1024),
+    ('512M', 512 * MB),
+    ('4g', 4 * GB),
+    ('1.5GiB', int(1.5 * GB)),
+    (' 2 kb ', 2048),
+])
+def test_parse_size(text, expected):
+    assert parse_size(text) == expected
+
+
+@pytest.mark.parametrize('text', ['', 'abc', '-1G', '4X', '1.2.3M'])
+def test_parse_size_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_size(text)
+
+
+def test_estimate_without_steps():
+    estimate = MemoryEstimator().estimate_pixels(1000, 1000, channels=1)
+    assert estimate['python'] == 2 * 1000 * 1000
+    assert estimate['tesseract'] == TESSERACT_BASE_BYTES + 1000 * 1000 * TESSERACT_BYTES_PER_PIXEL
+    assert estimate['total'] == estimate['python'] + estimate['tesseract']
+
+
+def test_estimate_follows_pipeline():
+    color = MemoryEstimator().estimate_pixels(1000, 1000, channels=3)
+    gray = MemoryEstimator([('grayscale', {})]).estimate_pixels(1000, 1000, channels=3)
+    half = MemoryEstimator([('resize', {'scale': 0.5})]).estimate_pixels(1000, 1000, channels=1)
+    double = MemoryEstimator([('resize', {'width': 2000})]).estimate_pixels(1000, 1000, channels=1)
+    
+    # Grayscale tidak mengubah jumlah piksel untuk Tesseract, resize mengubahnya kuadratik
+    assert gray['tesseract'] == color['tesseract']
+    assert half['tesseract'] == TESSERACT_BASE_BYTES + 250 * 1000 * TESSERACT_BYTES_PER_PIXEL
+    assert double['tesseract'] == TESSERACT_BASE_BYTES + 4 * 1000 * 1000 * TESSERACT_BYTES_PER_PIXEL
+    assert double['python'] > half['python']
+
+
+def test_estimate_unreadable_file_uses_default_page(tmp_path):
+    path = str(tmp_path / 'rusak.png')
+    with open(path, 'wb') as f:
+        f.write(b'bukan gambar')
+    estimate = MemoryEstimator().estimate_file(path)
+    assert estimate == MemoryEstimator().estimate_pixels(*scheduler.DEFAULT_PAGE_SIZE, channels=3)
+
+
+def test_budget_too_small_is_rejected():
+    with pytest.raises(ValueError):
+        MemoryScheduler(150 * MB, 4)
+
+
+def test_learn_raises_ratio_immediately_and_lowers_it_slowly():
+    memory = MemoryScheduler(4 * GB, 4, smoothing=0.5)
+    estimate = {'python': 100 * MB, 'tesseract': 100 * MB, 'total': 200 * MB}
+    
+    memory._learn(estimate, {'python_bytes': 300 * MB, 'tesseract_bytes': 100 * MB})
+    assert memory.ratio == pytest.approx(2.0)
+    assert memory.peak_item == 400 * MB
+    
+    memory._learn(estimate, {'python_bytes': 50 * MB, 'tesseract_bytes': 50 * MB})
+    assert memory.ratio == pytest.approx(1.25)
+
+
+def test_learn_uses_estimate_for_unmeasured_part_and_clamps():
+    memory = MemoryScheduler(4 * GB, 4, max_ratio=3.0)
+    estimate = {'python': 100 * MB, 'tesseract': 100 * MB, 'total': 200 * MB}
+    
+    memory._learn(estimate, {})
+    assert memory.ratio == 1.0
+    
+    memory._learn(estimate, {'python_bytes': 300 * MB})
+    assert memory.ratio == pytest.approx(2.0)
+    
+    memory._learn(estimate, {'python_bytes': 10 * GB, 'tesseract_bytes': None})
+    assert memory.ratio == 3.0
+
+
+def test_pick_lets_small_files_pass_a_large_head_with_bound():
+    memory = MemoryScheduler(2 * GB, 4, worker_overhead=0, lookahead=2)
+    size = {'running': 900 * MB, 'besar': 1500 * MB, 'kecil1': 100 * MB, 'kecil2': 100 * MB, 'kecil3': 100 * MB}
+    
+    def estimate_of(item):
+        return {'python': 0, 'tesseract': size[item], 'total': size[item]}
+    
+    pending = deque(['running', 'besar', 'kecil1', 'kecil2', 'kecil3'])
+    assert memory.pick(pending, estimate_of) == 'running'
+    assert memory.pick(pending, estimate_of) == 'kecil1'
+    assert memory.pick(pending, estimate_of) == 'kecil2'
+    # Batas lookahead tercapai: file besar di depan tidak boleh didahului lagi
+    assert memory.pick(pending, estimate_of) is None
+    assert list(pending) == ['besar', 'kecil3']
\ No newline at end of file
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from ..search_index import SearchIndex, normalize_token, tokenize
+
+
+def word_data(words):
+    return pd.DataFrame({
+        'level': [5] * len(words), 'text': words,
+        'left': [10 * i for i in range(len(words))], 'top': [5] * len(words),
+        'width': [8] * len(words), 'height': [12] * len(words), 'conf': [90.0] * len(words),
+    })
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SearchIndex(str(tmp_path / 'index.db')) as index:
+        yield index
+
+
+def test_normalize_token_folds_case_and_diacritics():
+    assert normalize_token('Café ÉLAN') == 'cafe elan'
+
+
+@pytest.mark.parametrize('text, tokens', [
+    ('e-mail', ['e', 'mail']),
+    ('Rp1.234.567,-', ['rp1', '234', '567']),
+    ('(Faktur)', ['faktur']),
+    ('nomor_seri', ['nomor', 'seri']),
+    ('Résumé', ['resume']),
+    ('---', []),
+])
+def test_tokenize_matches_unicode61(text, tokens):
+    assert tokenize(text) == tokens
+    
+    # Bandingkan dengan tokenizer FTS5 yang sebenarnya
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE VIRTUAL TABLE t USING fts5(x, tokenize='unicode61 remove_diacritics 2')")
+    conn.execute("CREATE VIRTUAL TABLE v USING fts5vocab(t, 'instance')")
+    conn.execute("INSERT INTO t (x) VALUES (?)", (text,))
+    assert [row[0] for row in conn.execute("SELECT term FROM v ORDER BY offset")] == tokens
+    conn.close()
+
+
+def test_boxes_found_for_split_words(index):
+    words = ['Kirim', 'ke', 'e-mail:', 'Budi_Santoso', 'Rp1.234']
+    index.add_document('doc', [(1, ' '.join(words), word_data(words))])
+    
+    for query, expected in [('mail', 'e-mail:'), ('santoso', 'Budi_Santoso'), ('"rp1 234"', 'Rp1.234'),
+                            ('santo*', 'Budi_Santoso')]:
+        results = index.search(query)
+        assert len(results) == 1, query
+        assert [box['text'] for box in results[0]['boxes']] == [expected], query
+
+
+def test_word_split_into_rows_per_token(index):
+    index.add_document('doc', [(1, None, word_data(['e-mail', 'e-e']))])
+    tokens = [row[0] for row in index.conn.execute("SELECT token FROM words ORDER BY rowid")]
+    assert tokens == ['e', 'mail', 'e']
\ No newline at end of file
@@ -0,0 +1,26 @@
+import pytest
+
+from ..cli import parse_steps
+from ..server import limit_steps
+
+
+def test_limit_steps_clamps_numbers():
+    steps = limit_steps(parse_steps('resize:scale=50,threshold:method=adaptive:block_size=1000:c=3,resize:width=1e6'))
+    assert steps == [('resize', {'scale': 4.0}),
+                     ('threshold', {'method': 'adaptive', 'block_size': 255, 'c': 3.0}),
+                     ('resize', {'width': 8000})]
+
+
+def test_limit_steps_makes_block_size_odd():
+    assert limit_steps(parse_steps('adaptive_threshold:block_size=10')) == [('adaptive_threshold', {'block_size': 11})]
+
+
+@pytest.mark.parametrize('text', [
+    'crop_content:max_side=100000',
+    'threshold:method=magic',
+    'resize:scale=besar',
+    'remove_borders:margin=2.5',
+])
+def test_limit_steps_rejects_invalid_params(text):
+    with pytest.raises(ValueError):
+        limit_steps(parse_steps(text))
\ No newline at end of file
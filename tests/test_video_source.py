@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+import pytest
+
+from ..video_source import DEFAULT_FPS, VideoOCR
+
+
+class FakeVideo:
+    """
+    Pengganti cv2.VideoCapture dengan FPS yang dilaporkan bebas dan frame yang sama terus
+    """
+    
+    def __init__(self, fps, frames=100):
+        self.fps = fps
+        self.frames = frames
+        self.position = 0
+    
+    def isOpened(self):
+        return True
+    
+    def get(self, prop):
+        return self.fps if prop == cv2.CAP_PROP_FPS else 0.0
+    
+    def grab(self):
+        self.position += 1
+        return self.position <= self.frames
+    
+    def read(self):
+        if not self.grab():
+            return False, None
+        image = np.full((120, 320, 3), 255, dtype=np.uint8)
+        cv2.putText(image, 'Slide', (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 3)
+        return True, image
+    
+    def release(self):
+        pass
+
+
+class FakeOCREngine:
+    def image_to_text(self, image, lang='eng', config=''):
+        return 'Slide'
+
+
+@pytest.mark.parametrize('fps', [0.0, -1.0, float('nan'), float('inf')])
+def test_invalid_fps_falls_back_to_default(monkeypatch, fps):
+    monkeypatch.setattr(cv2, 'VideoCapture', lambda path: FakeVideo(fps))
+    segments = VideoOCR(FakeOCREngine()).process('video.mp4')
+    
+    assert [segment['text'] for segment in segments] == ['Slide']
+    assert 0 < segments[0]['end'] <= 100 / DEFAULT_FPS
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+
+from ..watcher import FolderWatcher, WatchState, file_hash
+
+
+def write_file(path, data=b'isi gambar'):
+    with open(path, 'wb') as f:
+        f.write(data)
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def make_watcher(tmp_path):
+    return FolderWatcher([str(tmp_path / 'in')], str(tmp_path / 'out'), formats=('text',), workers=1, settle=0)
+
+
+def queue_files(watcher):
+    watcher.scan()
+    watcher.check_pending()
+    return [item[0] for item in watcher._ready]
+
+
+def test_state_survives_reopen(tmp_path):
+    path = str(tmp_path / 'state.db')
+    state = WatchState(path)
+    state.mark('/scan/a.png', 10, 123, 'abc', 'done', outputs=['/out/a.txt'])
+    state.close()
+    
+    state = WatchState(path)
+    row = state.get('/scan/a.png')
+    assert (row['status'], row['hash'], row['attempts']) == ('done', 'abc', 0)
+    assert state.counts() == {'done': 1}
+    state.close()
+
+
+def test_old_database_gains_attempts_column(tmp_path):
+    path = str(tmp_path / 'state.db')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                 "hash TEXT, status TEXT NOT NULL, error TEXT, outputs TEXT, updated TEXT)")
+    conn.execute("INSERT INTO files VALUES ('/scan/a.png', 1, 1, 'x', 'done', NULL, '[]', NULL)")
+    conn.commit()
+    conn.close()
+    
+    state = WatchState(path)
+    assert state.get('/scan/a.png')['attempts'] == 0
+    state.close()
+
+
+def test_restart_skips_done_and_retries_crashed(tmp_path):
+    (tmp_path / 'in').mkdir()
+    done_path = str(tmp_path / 'in' / 'done.png')
+    crashed_path = str(tmp_path / 'in' / 'crashed.png')
+    new_path = str(tmp_path / 'in' / 'new.png')
+    
+    watcher = make_watcher(tmp_path)
+    size, mtime_ns = write_file(done_path, b'sudah')
+    watcher.state.mark(done_path, size, mtime_ns, file_hash(done_path), 'done')
+    size, mtime_ns = write_file(crashed_path, b'crash')
+    watcher.state.mark(crashed_path, size, mtime_ns, file_hash(crashed_path), 'crashed', attempts=1)
+    watcher.close()
+    write_file(new_path, b'baru')
+    
+    # Daemon dijalankan ulang: file selesai dilewati, crash diulang dengan hitungan yang tersimpan
+    watcher = make_watcher(tmp_path)
+    assert sorted(queue_files(watcher)) == sorted([crashed_path, new_path])
+    item = next(item for item in watcher._ready if item[0] == crashed_path)
+    assert watcher._crashes.counts[item] == 1
+    assert watcher.state.get(crashed_path)['attempts'] == 1
+    watcher.close()
+
+
+def test_touched_file_with_same_content_is_not_reprocessed(tmp_path):
+    (tmp_path / 'in').mkdir()
+    path = str(tmp_path / 'in' / 'a.png')
+    size, mtime_ns = write_file(path)
+    
+    watcher = make_watcher(tmp_path)
+    watcher.state.mark(path, size, mtime_ns, file_hash(path), 'done')
+    os.utime(path, ns=(mtime_ns + 10 ** 9, mtime_ns + 10 ** 9))
+    
+    assert queue_files(watcher) == []
+    assert watcher.counters['skipped'] == 1
+    assert watcher.state.get(path)['mtime_ns'] == mtime_ns + 10 ** 9
+    watcher.close()
\ No newline at end of file
@@ -0,0 +1,63 @@
+import time
+
+import cv2
+import numpy as np
+
+from ..webcam_capture import FrameGate, WebcamCapture
+
+
+class FakeCapture:
+    """
+    Pengganti cv2.VideoCapture yang menghasilkan sejumlah frame dengan laju tetap
+    """
+    
+    def __init__(self, frames=5, interval=0.05):
+        self.frames = frames
+        self.interval = interval
+        self.count = 0
+    
+    def isOpened(self):
+        return True
+    
+    def set(self, prop, value):
+        return True
+    
+    def read(self):
+        time.sleep(self.interval)
+        if self.count >= self.frames:
+            return False, None
+        self.count += 1
+        return True, np.full((48, 64, 3), 255, dtype=np.uint8)
+    
+    def release(self):
+        pass
+
+
+class RecordingGate(FrameGate):
+    """
+    FrameGate yang mencatat berapa frame yang dinilai
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.updates = 0
+    
+    def update(self, frame, accept=True):
+        self.updates += 1
+        return super().update(frame, accept)
+
+
+def test_live_ocr_counts_each_camera_frame_once(monkeypatch):
+    capture = FakeCapture(frames=5)
+    monkeypatch.setattr(cv2, 'VideoCapture', lambda camera_id: capture)
+    webcam = WebcamCapture(threaded=True)
+    gate = RecordingGate(stable_frames=5, sharpness_threshold=0.0)
+    
+    try:
+        results = webcam.live_ocr(None, gate=gate, show=False, max_seconds=0.6)
+    finally:
+        webcam.stop()
+    
+    # Loop jauh lebih cepat dari kamera, tetapi setiap frame hanya dinilai sekali
+    assert gate.updates == capture.frames
+    assert results == []
\ No newline at end of file
@@ -0,0 +1,185 @@
+import math
+import difflib
+
+import cv2
+import numpy as np
+
+# FPS yang dipakai jika container video tidak melaporkan FPS yang valid
+DEFAULT_FPS = 25.0
+
+
+class VideoOCR:
+    """
+    Kelas untuk mengekstrak teks bertimestamp dari file video (rekaman layar, slide kuliah)
+    """
+    
+    def __init__(self, ocr_engine, image_processor=None, steps=None, lang='eng', config='',
+                 min_interval=0.5, max_interval=4.0, change_threshold=0.3, pixel_delta=40,
+                 text_similarity=0.9, analysis_width=320):
+        """
+        Inisialisasi VideoOCR
+        
+        Args:
+            ocr_engine (OCREngine): Instance OCREngine
+            image_processor (ImageProcessor, optional): Untuk menerapkan steps sebelum OCR
+            steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+            lang (str): Kode bahasa untuk OCR (default: 'eng')
+            config (str): Konfigurasi tambahan untuk Tesseract
+            min_interval (float): Jarak sampel terpendek dalam detik (default: 0.5)
+            max_interval (float): Jarak sampel terpanjang saat video diam (default: 4.0)
+            change_threshold (float): Persentase piksel berubah yang dianggap perubahan konten (default: 0.3)
+            pixel_delta (int): Selisih intensitas minimum agar piksel dihitung berubah (default: 40)
+            text_similarity (float): Rasio kemiripan teks untuk menggabungkan segmen (default: 0.9)
+            analysis_width (int): Lebar gambar analisis (default: 320)
+        """
+        self.ocr_engine = ocr_engine
+        self.image_processor = image_processor
+        self.steps = steps
+        self.lang = lang
+        self.config = config
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change_threshold = change_threshold
+        self.pixel_delta = pixel_delta
+        self.text_similarity = text_similarity
+        self.analysis_width = analysis_width
+        
+        # Statistik pemrosesan video terakhir
+        self.frames_sampled = 0
+        self.ocr_calls = 0
+    
+    def _small(self, frame):
+        """
+        Mengecilkan frame ke grayscale untuk analisis murah
+        """
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        scale = self.analysis_width / float(gray.shape[1])
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    def changed_percent(self, a, b):
+        """
+        Menghitung persentase piksel yang berubah di antara dua gambar analisis
+        
+        Persentase piksel (bukan rata-rata selisih) dipakai agar perubahan teks
+        kecil pada slide yang sebagian besar sama tetap terdeteksi.
+        
+        Args:
+            a (numpy.ndarray): Gambar grayscale
+            b (numpy.ndarray): Gambar grayscale pembanding, atau None
+            
+        Returns:
+            float: Persentase piksel berubah (100 jika b tidak ada)
+        """
+        if b is None or a.shape != b.shape:
+            return 100.0
+        return np.count_nonzero(cv2.absdiff(a, b) > self.pixel_delta) * 100.0 / a.size
+    
+    def _recognize(self, frame):
+        """
+        Menjalankan OCR pada satu frame
+        """
+        image = frame
+        if self.image_processor is not None and self.steps:
+            image = self.image_processor.apply_pipeline(image, self.steps)
+        
+        self.ocr_calls += 1
+        return self.ocr_engine.image_to_text(image, self.lang, self.config).strip()
+    
+    def iter_segments(self, video_path):
+        """
+        Mengiterasi segmen teks video saat segmen tersebut selesai
+        
+        Frame diambil dengan jarak adaptif: jarak dipersingkat saat isi frame
+        berubah dan diperpanjang hingga max_interval saat video diam. Frame
+        yang tidak diambil hanya di-grab tanpa decode warna. OCR hanya
+        dijalankan pada frame stabil yang berbeda dari frame terakhir yang
+        di-OCR, dan teks yang mirip digabung ke segmen yang sama.
+        
+        Args:
+            video_path (str): Path ke file video
+            
+        Yields:
+            dict: Segmen berisi start, end (detik), dan text
+        """
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise Exception(f"Tidak dapat membuka video: {video_path}")
+        
+        # Beberapa container melaporkan FPS 0, negatif, NaN, atau tak hingga
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if not math.isfinite(fps) or fps <= 0:
+            fps = DEFAULT_FPS
+        self.frames_sampled = 0
+        self.ocr_calls = 0
+        
+        interval = self.min_interval
+        frame_index = 0
+        prev_small = None
+        last_ocr_small = None
+        pending = True
+        current = None
+        
+        try:
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                
+                timestamp = frame_index / fps
+                self.frames_sampled += 1
+                
+                small = self._small(frame)
+                change = self.changed_percent(small, prev_small)
+                prev_small = small
+                
+                if change > self.change_threshold:
+                    # Isi frame sedang berubah: sampel lebih rapat dan tunggu sampai stabil
+                    interval = self.min_interval
+                    pending = True
+                elif pending:
+                    pending = False
+                    
+                    # Perubahan sementara (misalnya kursor lewat) tidak perlu di-OCR ulang
+                    if self.changed_percent(small, last_ocr_small) > self.change_threshold:
+                        last_ocr_small = small
+                        text = self._recognize(frame)
+                        
+                        similar = current is not None and difflib.SequenceMatcher(
+                            None, current['text'], text).ratio() >= self.text_similarity
+                        if not similar:
+                            if current is not None:
+                                yield current
+                            current = {'start': timestamp, 'end': timestamp, 'text': text} if text else None
+                else:
+                    # Video diam: perpanjang jarak sampel
+                    interval = min(self.max_interval, interval * 2)
+                
+                if current is not None:
+                    current['end'] = timestamp
+                
+                # Lewati frame di antara sampel tanpa retrieve/konversi
+                skip = max(1, int(round(interval * fps))) - 1
+                for _ in range(skip):
+                    if not cap.grab():
+                        break
+                frame_index += skip + 1
+            
+            if current is not None:
+                yield current
+        finally:
+            cap.release()
+    
+    def process(self, video_path):
+        """
+        Mengekstrak semua segmen teks dari file video
+        
+        Args:
+            video_path (str): Path ke file video
+            
+        Returns:
+            list: Daftar segmen berisi start, end (detik), dan text
+        """
+        try:
+            return list(self.iter_segments(video_path))
+        except Exception as e:
+            raise Exception(f"Error saat memproses video: {str(e)}")
\ No newline at end of file
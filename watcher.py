@@ -0,0 +1,584 @@
+import os
+import sys
+import json
+import time
+import signal
+import hashlib
+import sqlite3
+import argparse
+import threading
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .batch_processor import (BatchProcessor, CrashTracker, IMAGE_EXTENSIONS, PDF_EXTENSIONS, EXPORT_FORMATS,
+                              ocr_file, _init_worker)
+from .cli import parse_steps
+from .metrics import metrics
+from .scheduler import parse_size
+
+# Daemon folder pantau: file baru dari scanner di-OCR otomatis.
+# Contoh: python -m app.watcher /srv/scan -o /srv/hasil -f text,hocr -j 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    outputs TEXT,
+    updated TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Status yang tidak perlu diproses ulang selama isi file tidak berubah.
+# 'crashed' (worker mati saat memproses file) sengaja tidak final: file diulang,
+# dibatasi kolom attempts, dan baru menjadi 'error' setelah max_crashes kali.
+FINAL_STATUSES = ('done', 'error')
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    Menghitung hash isi file secara bertahap tanpa memuat seluruh file
+    
+    Args:
+        path (str): Path ke file
+        chunk_size (int): Ukuran potongan baca dalam byte
+        
+    Returns:
+        str: Hash BLAKE2b dalam heksadesimal
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class WatchState:
+    """
+    Kelas untuk menyimpan status file yang sudah diproses di SQLite
+    """
+    
+    def __init__(self, state_path):
+        """
+        Inisialisasi Watch State
+        
+        Args:
+            state_path (str): Path ke file database SQLite
+        """
+        self.state_path = state_path
+        # Watcher boleh dibuat di satu thread lalu dijalankan di thread lain
+        self.conn = sqlite3.connect(state_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        
+        # Database dari versi sebelumnya belum memiliki kolom attempts
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        if 'attempts' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE files ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    
+    def close(self):
+        """
+        Menutup koneksi database
+        """
+        self.conn.close()
+    
+    def get(self, path):
+        """
+        Mengambil status satu file
+        
+        Returns:
+            sqlite3.Row: Baris status, atau None jika file belum pernah dilihat
+        """
+        return self.conn.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+    
+    def mark(self, path, size, mtime_ns, file_hash, status, error=None, outputs=None, attempts=0):
+        """
+        Menyimpan status file
+        
+        Args:
+            path (str): Path file
+            size (int): Ukuran file saat diproses
+            mtime_ns (int): Waktu modifikasi file saat diproses
+            file_hash (str): Hash isi file
+            status (str): 'queued', 'done', 'crashed', atau 'error'
+            error (str, optional): Pesan error
+            outputs (list, optional): Path file hasil ekspor
+            attempts (int): Jumlah crash worker saat memproses isi file ini (default: 0)
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, hash, status, error, outputs, updated, attempts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, file_hash, status, error, json.dumps(outputs or []),
+                 datetime.now().isoformat(timespec='seconds'), attempts)
+            )
+    
+    def touch(self, path, size, mtime_ns):
+        """
+        Memperbarui ukuran dan waktu modifikasi file yang isinya tidak berubah
+        """
+        with self.conn:
+            self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (size, mtime_ns, path))
+    
+    def counts(self):
+        """
+        Jumlah file per status
+        """
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
+
+
+class FolderWatcher:
+    """
+    Kelas untuk memantau folder dan meng-OCR file baru atau berubah dengan pool proses
+    
+    Pemindaian memakai polling yang dipangkas dengan mtime folder: setiap siklus
+    hanya folder yang mtime-nya berubah yang dibaca ulang isinya, sehingga pohon
+    folder besar yang diam hanya membutuhkan satu stat per folder. File baru
+    menunggu sampai ukuran dan mtime-nya stabil selama settle detik agar file
+    yang masih ditulis scanner tidak ikut diproses.
+    """
+    
+    def __init__(self, directories, output_dir, formats=('text',), state_path=None, workers=None,
+                 lang='eng', config='', steps=None, dpi=300, skip_blank=False, tesseract_cmd=None,
+                 interval=2.0, settle=3.0, full_scan_interval=600, recursive=True, export_manager=None,
+                 memory_budget=None, max_crashes=2, cache_dir=None):
+        """
+        Inisialisasi Folder Watcher
+        
+        Args:
+            directories (list): Folder yang dipantau
+            output_dir (str): Folder untuk menyimpan hasil ekspor
+            formats (iterable): Format ekspor, kunci dari EXPORT_FORMATS (default: ('text',))
+            state_path (str, optional): Path database status (default: .ocr_watch.db di output_dir)
+            workers (int, optional): Jumlah proses worker. Default jumlah core CPU.
+            lang (str): Kode bahasa untuk OCR (default: 'eng')
+            config (str): Konfigurasi tambahan untuk Tesseract
+            steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+            dpi (int): DPI render halaman PDF (default: 300)
+            skip_blank (bool): Lewati halaman kosong pada PDF maupun gambar (default: False)
+            tesseract_cmd (str, optional): Path ke executable tesseract
+            interval (float): Jeda antar siklus polling dalam detik (default: 2.0)
+            settle (float): Lama ukuran file harus stabil sebelum diproses (default: 3.0)
+            full_scan_interval (float): Jeda pemindaian penuh untuk menangkap file yang
+                                        diubah di tempat, 0 untuk mematikan (default: 600)
+            recursive (bool): Pantau subfolder (default: True)
+            export_manager (ExportManager, optional): Instance ExportManager
+            memory_budget (int, optional): Anggaran RSS total dalam byte untuk MemoryScheduler
+            max_crashes (int): Berapa kali sebuah file boleh membuat worker mati sebelum
+                               ditandai error, termasuk antar restart daemon (default: 2)
+            cache_dir (str, optional): Folder PreprocessCache di disk untuk hasil pipeline gambar
+        """
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                raise ValueError(f"Folder tidak ditemukan: {directory}")
+        
+        self.batch = BatchProcessor(output_dir, formats=formats, workers=workers, lang=lang, config=config,
+                                    steps=steps, dpi=dpi, skip_blank=skip_blank, tesseract_cmd=tesseract_cmd,
+                                    export_manager=export_manager, memory_budget=memory_budget,
+                                    max_crashes=max_crashes, cache_dir=cache_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.state = WatchState(state_path or os.path.join(self.output_dir, '.ocr_watch.db'))
+        
+        self.interval = interval
+        self.settle = settle
+        self.full_scan_interval = full_scan_interval
+        self.recursive = recursive
+        
+        # Folder yang dikenal: path -> (mtime_ns atau None untuk dibaca ulang, daftar subfolder)
+        self._dirs = {}
+        # File yang menunggu stabil: path -> (size, mtime_ns, sejak)
+        self._pending = {}
+        # File stabil yang siap dikirim ke worker: (path, size, mtime_ns, hash)
+        self._ready = deque()
+        self._running = {}
+        # Path di _ready dan _running, agar tidak diantrekan dua kali
+        self._inflight = set()
+        # Perkiraan memori per path untuk MemoryScheduler
+        self._estimates = {}
+        self._crashes = CrashTracker(self.batch.max_crashes)
+        # Item yang sedang berjalan saat pool rusak, menunggu _recover
+        self._crashed = []
+        self._broken = False
+        self._executor = None
+        self._last_full_scan = 0.0
+        self._stop = threading.Event()
+        self.counters = {'scanned_dirs': 0, 'done': 0, 'failed': 0, 'skipped': 0}
+    
+    def stop(self):
+        """
+        Menghentikan loop pemantauan setelah siklus berjalan
+        """
+        self._stop.set()
+    
+    def _root_for(self, path):
+        """
+        Folder acuan struktur output: folder pantau, atau induknya jika ada beberapa folder pantau
+        """
+        for directory in self.directories:
+            if path.startswith(directory + os.sep):
+                return directory if len(self.directories) == 1 else os.path.dirname(directory)
+        return os.path.dirname(path)
+    
+    def _is_candidate(self, entry):
+        name = entry.name
+        if name.startswith(('.', '~')):
+            return False
+        return name.lower().endswith(IMAGE_EXTENSIONS + PDF_EXTENSIONS)
+    
+    def _scan_dir(self, directory, now):
+        """
+        Membaca isi satu folder yang berubah dan mencatat file kandidat baru
+        """
+        self.counters['scanned_dirs'] += 1
+        metrics.count('watch_scanned_dirs')
+        subdirs = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return subdirs
+        
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    # Jangan pantau folder output sendiri jika berada di dalam folder pantau
+                    if self.recursive and not entry.name.startswith('.') and entry.path != self.output_dir:
+                        subdirs.append(entry.path)
+                elif entry.is_file() and self._is_candidate(entry) and entry.path not in self._pending:
+                    stat = entry.stat()
+                    if not self._is_processed(entry.path, stat):
+                        self._pending[entry.path] = (stat.st_size, stat.st_mtime_ns, now)
+            except OSError:
+                continue
+        return subdirs
+    
+    def _is_processed(self, path, stat):
+        """
+        Mengecek dari database apakah file dengan ukuran dan mtime ini sudah diproses
+        """
+        if path in self._inflight:
+            return True
+        row = self.state.get(path)
+        return (row is not None and row['status'] in FINAL_STATUSES
+                and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns)
+    
+    def scan(self):
+        """
+        Satu siklus pemindaian: hanya folder yang mtime-nya berubah yang dibaca ulang
+        """
+        now = time.monotonic()
+        if self.full_scan_interval and now - self._last_full_scan >= self.full_scan_interval:
+            # Pemindaian penuh berkala menangkap file yang ditimpa di tempat tanpa mengubah folder
+            self._dirs = {}
+            self._last_full_scan = now
+        
+        wall_now = time.time_ns()
+        stack = list(self.directories)
+        seen = set()
+        while stack:
+            directory = stack.pop()
+            seen.add(directory)
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            
+            known = self._dirs.get(directory)
+            if known is None or known[0] != mtime_ns:
+                subdirs = self._scan_dir(directory, now)
+                # Perubahan dalam resolusi mtime yang sama bisa terlewat; baca ulang siklus berikutnya
+                recent = wall_now - mtime_ns < 2 * 10 ** 9
+                self._dirs[directory] = (None if recent else mtime_ns, subdirs)
+            else:
+                subdirs = known[1]
+            stack.extend(subdirs)
+        
+        # Lupakan folder yang sudah dihapus
+        for directory in set(self._dirs) - seen:
+            del self._dirs[directory]
+    
+    def check_pending(self):
+        """
+        Memindahkan file yang ukurannya sudah stabil ke antrean siap proses
+        """
+        now = time.monotonic()
+        for path, (size, mtime_ns, since) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # File dihapus atau dipindahkan sebelum selesai ditulis
+                del self._pending[path]
+                continue
+            
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self._pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+            if stat.st_size == 0 or now - since < self.settle:
+                continue
+            
+            del self._pending[path]
+            try:
+                digest = file_hash(path)
+            except OSError:
+                continue
+            
+            # Isi sama dengan yang sudah diproses (misalnya hanya di-touch): cukup perbarui mtime
+            row = self.state.get(path)
+            if row is not None and row['status'] in FINAL_STATUSES and row['hash'] == digest:
+                self.state.touch(path, size, mtime_ns)
+                self.counters['skipped'] += 1
+                metrics.count('watch_unchanged_files')
+                continue
+            
+            # Jumlah crash sebelumnya tetap berlaku selama isinya sama, juga setelah restart
+            attempts = row['attempts'] if row is not None and row['hash'] == digest else 0
+            item = (path, size, mtime_ns, digest)
+            if attempts:
+                self._crashes.counts[item] = attempts
+            self.state.mark(path, size, mtime_ns, digest, 'queued', attempts=attempts)
+            self._ready.append(item)
+            self._inflight.add(path)
+    
+    def _estimate(self, item):
+        path = item[0]
+        if path not in self._estimates:
+            self._estimates[path] = self.batch.estimator.estimate_file(path)
+        return self._estimates[path]
+    
+    def _create_executor(self):
+        batch = self.batch
+        return ProcessPoolExecutor(max_workers=batch.workers, initializer=_init_worker,
+                                   initargs=(batch.tesseract_cmd, None, True, batch.cache_dir))
+    
+    def _submit(self):
+        batch = self.batch
+        while self._ready and len(self._running) < batch.workers and not self._broken:
+            if not self._crashes.can_submit(self._ready[0], self._running.values()):
+                break  # Tersangka crash dijalankan sendirian
+            if batch.scheduler is None:
+                item = self._ready.popleft()
+            else:
+                item = batch.scheduler.pick(self._ready, self._estimate)
+                if item is None:
+                    break
+            path, size, mtime_ns, digest = item
+            try:
+                future = self._executor.submit(ocr_file, path, batch.lang, batch.config, batch.steps,
+                                               batch.dpi, batch.skip_blank, batch.scheduler is not None)
+            except BrokenProcessPool:
+                # Pool rusak oleh worker yang mati; item ini belum sempat berjalan
+                self._ready.appendleft(item)
+                if batch.scheduler is not None:
+                    batch.scheduler.release(item)
+                self._broken = True
+                break
+            self._running[future] = item
+    
+    def _finish(self, future):
+        """
+        Menyimpan hasil satu file yang selesai
+        
+        Returns:
+            dict: Ringkasan file, atau None jika worker mati (ditangani _recover)
+        """
+        item = self._running.pop(future)
+        path, size, mtime_ns, digest = item
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            self._crashed.append(item)
+            return None
+        except Exception as e:
+            result = {'path': path, 'status': 'error', 'pages': [], 'seconds': 0.0, 'error': str(e)}
+        self._inflight.discard(path)
+        self._crashes.succeeded(item)
+        metrics.merge(result.pop('metrics', None))
+        if self.batch.scheduler is not None:
+            self.batch.scheduler.release(item, result.pop('memory', None))
+            self._estimates.pop(path, None)
+        
+        outputs = []
+        if result['status'] == 'ok':
+            try:
+                outputs = self.batch.export(result, root=self._root_for(path))
+            except Exception as e:
+                result['status'] = 'error'
+                result['error'] = str(e)
+        
+        status = 'done' if result['status'] == 'ok' else 'error'
+        self.state.mark(path, size, mtime_ns, digest, status, result['error'], outputs)
+        self.counters['done' if status == 'done' else 'failed'] += 1
+        return {'path': path, 'status': status, 'pages': len(result['pages']),
+                'seconds': result['seconds'], 'outputs': outputs, 'error': result['error']}
+    
+    def _recover(self):
+        """
+        Membuat pool baru setelah worker mati dan mengantrekan ulang file yang sedang berjalan
+        
+        Returns:
+            list: Ringkasan file yang menyerah setelah max_crashes kali
+        """
+        items = self._crashed + list(self._running.values())
+        self._crashed = []
+        self._running.clear()
+        self._broken = False
+        self._executor.shutdown(wait=True)
+        self._executor = self._create_executor()
+        metrics.count('worker_restarts')
+        
+        max_crashes = self.batch.max_crashes
+        failed = self._crashes.crashed(items)
+        summaries = []
+        for item in reversed(items):
+            path, size, mtime_ns, digest = item
+            if self.batch.scheduler is not None:
+                self.batch.scheduler.release(item)
+            
+            if item in failed:
+                error = f"Proses worker berhenti tidak normal {max_crashes} kali saat memproses file ini"
+                self.state.mark(path, size, mtime_ns, digest, 'error', error, attempts=max_crashes)
+                self._inflight.discard(path)
+                self._estimates.pop(path, None)
+                self.counters['failed'] += 1
+                summaries.append({'path': path, 'status': 'error', 'pages': 0, 'seconds': 0.0,
+                                  'outputs': [], 'error': error})
+                continue
+            
+            if len(items) == 1:
+                # Hanya file ini yang berjalan, jadi pasti penyebabnya; status bisa diulang
+                self.state.mark(path, size, mtime_ns, digest, 'crashed', "Proses worker berhenti tidak normal",
+                                attempts=self._crashes.counts[item])
+            self._ready.appendleft(item)
+        return summaries
+    
+    def run(self, on_file_done=None, max_cycles=None):
+        """
+        Menjalankan loop pemantauan sampai stop() dipanggil
+        
+        Args:
+            on_file_done (callable, optional): Dipanggil dengan dict ringkasan per file
+            max_cycles (int, optional): Berhenti setelah sejumlah siklus (untuk pengujian)
+        """
+        def report(summaries):
+            for summary in summaries:
+                if summary is not None and on_file_done is not None:
+                    on_file_done(summary)
+        
+        cycles = 0
+        self._executor = self._create_executor()
+        try:
+            while not self._stop.is_set():
+                self.scan()
+                self.check_pending()
+                self._submit()
+                
+                # Tunggu hasil atau jeda polling, mana yang lebih dulu
+                deadline = time.monotonic() + self.interval
+                while (self._running or self._broken) and not self._stop.is_set():
+                    done = set()
+                    if self._running:
+                        done, _ = wait(self._running, timeout=max(0.0, deadline - time.monotonic()),
+                                       return_when=FIRST_COMPLETED)
+                    report([self._finish(future) for future in done])
+                    if self._crashed or self._broken:
+                        # Satu worker mati merusak seluruh pool: buat ulang, jangan hentikan daemon
+                        report(self._recover())
+                    elif not done:
+                        break
+                    self._submit()
+                self._stop.wait(max(0.0, deadline - time.monotonic()))
+                
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+            
+            # Selesaikan file yang sedang berjalan agar statusnya tercatat; file yang
+            # terkena crash tetap berstatus queued dan diulang saat daemon berjalan lagi
+            report([self._finish(future) for future in list(self._running)])
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def close(self):
+        self.state.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.watcher', description="Pantau folder dan OCR file baru")
+    parser.add_argument('directories', nargs='+', help="Folder yang dipantau")
+    parser.add_argument('-o', '--output-dir', required=True, help="Folder output")
+    parser.add_argument('-f', '--format', default='text',
+                        help=f"Format ekspor dipisah koma: {', '.join(EXPORT_FORMATS)} (default: text)")
+    parser.add_argument('--state', help="Path database status (default: OUTPUT_DIR/.ocr_watch.db)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Jumlah proses worker")
+    parser.add_argument('-l', '--lang', default='eng', help="Kode bahasa Tesseract (default: eng)")
+    parser.add_argument('--psm', type=int, default=None, help="Page segmentation mode Tesseract")
+    parser.add_argument('--config', default='', help="Konfigurasi tambahan Tesseract")
+    parser.add_argument('--steps', default='', help="Langkah pipeline, misalnya grayscale,resize:scale=1.5,threshold:method=otsu")
+    parser.add_argument('--dpi', type=int, default=300, help="DPI render halaman PDF (default: 300)")
+    parser.add_argument('--skip-blank', action='store_true', help="Lewati OCR halaman kosong (PDF maupun gambar)")
+    parser.add_argument('--interval', type=float, default=2.0, help="Jeda polling dalam detik (default: 2)")
+    parser.add_argument('--settle', type=float, default=3.0, help="Lama file harus stabil dalam detik (default: 3)")
+    parser.add_argument('--full-scan', type=float, default=600, help="Jeda pemindaian penuh dalam detik (default: 600)")
+    parser.add_argument('--no-recursive', action='store_true', help="Jangan pantau subfolder")
+    parser.add_argument('--tesseract-cmd', help="Path ke executable Tesseract")
+    parser.add_argument('--memory-budget', type=parse_size, default=None, metavar='SIZE',
+                        help="Batas RSS total, misalnya 4G; jumlah file bersamaan disesuaikan agar muat")
+    parser.add_argument('--cache-dir', help="Folder cache hasil pipeline gambar di disk")
+    parser.add_argument('--metrics', metavar='PATH', help="Tulis metrik Prometheus ke file ini setiap file selesai")
+    parser.add_argument('--metrics-log', metavar='PATH', help="Tulis span dan counter sebagai log JSON")
+    args = parser.parse_args(argv)
+    
+    if args.metrics or args.metrics_log:
+        metrics.enable(log_path=args.metrics_log)
+    
+    config = args.config
+    if args.psm is not None:
+        config = f"--psm {args.psm} {config}".strip()
+    
+    try:
+        watcher = FolderWatcher(
+            args.directories, args.output_dir, formats=[fmt.strip() for fmt in args.format.split(',') if fmt.strip()],
+            state_path=args.state, workers=args.workers, lang=args.lang, config=config,
+            steps=parse_steps(args.steps), dpi=args.dpi, skip_blank=args.skip_blank, tesseract_cmd=args.tesseract_cmd,
+            interval=args.interval, settle=args.settle, full_scan_interval=args.full_scan,
+            recursive=not args.no_recursive, memory_budget=args.memory_budget, cache_dir=args.cache_dir
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    def on_signal(signum, frame):
+        print("Berhenti setelah file yang sedang berjalan selesai...", file=sys.stderr, flush=True)
+        watcher.stop()
+    
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+    
+    def on_file_done(summary):
+        line = f"[{summary['status']}] {summary['path']} ({summary['pages']} halaman, {summary['seconds']:.2f} detik)"
+        if summary['error']:
+            line += f": {summary['error']}"
+        print(line, file=sys.stderr, flush=True)
+        if args.metrics:
+            metrics.write_prometheus(args.metrics)
+    
+    print(f"Memantau {', '.join(watcher.directories)} -> {watcher.output_dir}", file=sys.stderr, flush=True)
+    try:
+        watcher.run(on_file_done=on_file_done)
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -1,24 +1,168 @@
 import cv2
 import numpy as np
 import os
+import time
+import queue
 import tempfile
+import threading
+from collections import deque
 from datetime import datetime
 
+from .metrics import metrics
+
+class FrameGate:
+    """
+    Kelas untuk memilih frame yang layak di-OCR berdasarkan ketajaman dan kestabilan
+    """
+    
+    def __init__(self, sharpness_threshold=100.0, motion_threshold=4.0, stable_frames=5,
+                 change_threshold=8.0, analysis_width=320):
+        """
+        Inisialisasi FrameGate
+        
+        Args:
+            sharpness_threshold (float): Variansi Laplacian minimum frame yang tajam (default: 100.0)
+            motion_threshold (float): Rata-rata selisih piksel antar frame yang dianggap bergerak (default: 4.0)
+            stable_frames (int): Jumlah frame stabil berturut-turut sebelum OCR (default: 5)
+            change_threshold (float): Selisih minimum terhadap frame terakhir yang di-OCR (default: 8.0)
+            analysis_width (int): Lebar gambar analisis (default: 320)
+        """
+        self.sharpness_threshold = sharpness_threshold
+        self.motion_threshold = motion_threshold
+        self.stable_frames = stable_frames
+        self.change_threshold = change_threshold
+        self.analysis_width = analysis_width
+        
+        self._prev = None
+        self._stable = 0
+        self._best = None
+        self._last_recognized = None
+    
+    def _small(self, frame):
+        """
+        Mengecilkan frame ke grayscale untuk analisis murah
+        """
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        scale = self.analysis_width / float(gray.shape[1])
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray
+    
+    def _difference(self, a, b):
+        """
+        Rata-rata selisih absolut dua gambar analisis
+        """
+        if a is None or b is None or a.shape != b.shape:
+            return float('inf')
+        return float(cv2.absdiff(a, b).mean())
+    
+    def sharpness(self, frame):
+        """
+        Mengukur ketajaman frame dengan variansi Laplacian
+        
+        Args:
+            frame (numpy.ndarray): Frame gambar
+            
+        Returns:
+            float: Nilai ketajaman (semakin besar semakin tajam)
+        """
+        return float(cv2.Laplacian(self._small(frame), cv2.CV_64F).var())
+    
+    def reset(self):
+        """
+        Melupakan scene terakhir sehingga frame stabil berikutnya di-OCR lagi
+        """
+        self._stable = 0
+        self._best = None
+        self._last_recognized = None
+    
+    def update(self, frame, accept=True):
+        """
+        Menilai frame baru dan menentukan apakah ada frame yang siap di-OCR
+        
+        Selama scene stabil, frame paling tajam disimpan sebagai kandidat.
+        Kandidat diserahkan sekali per scene setelah cukup frame stabil dan
+        hanya jika isinya berbeda dari frame terakhir yang di-OCR.
+        
+        Args:
+            frame (numpy.ndarray): Frame gambar
+            accept (bool): False jika worker OCR sedang sibuk sehingga kandidat ditahan
+            
+        Returns:
+            tuple: (frame siap OCR atau None, dict status)
+        """
+        small = self._small(frame)
+        motion = self._difference(small, self._prev)
+        self._prev = small
+        
+        status = {'motion': motion, 'sharpness': None, 'state': 'moving'}
+        
+        if motion > self.motion_threshold:
+            self._stable = 0
+            self._best = None
+            return None, status
+        
+        self._stable += 1
+        sharpness = float(cv2.Laplacian(small, cv2.CV_64F).var())
+        status['sharpness'] = sharpness
+        status['state'] = 'stabilizing'
+        
+        if self._best is None or sharpness > self._best[2]:
+            self._best = (frame, small, sharpness)
+        
+        if self._stable < self.stable_frames:
+            return None, status
+        
+        best_frame, best_small, best_sharpness = self._best
+        if best_sharpness < self.sharpness_threshold:
+            status['state'] = 'blurry'
+            return None, status
+        
+        if self._difference(best_small, self._last_recognized) <= self.change_threshold:
+            status['state'] = 'unchanged'
+            return None, status
+        
+        if not accept:
+            status['state'] = 'busy'
+            return None, status
+        
+        self._last_recognized = best_small
+        self._best = None
+        status['state'] = 'submitted'
+        return best_frame, status
+
+
 class WebcamCapture:
     """
     Kelas untuk menangani pengambilan gambar dari webcam
     """
     
-    def __init__(self, camera_id=0):
+    def __init__(self, camera_id=0, threaded=False, buffer_size=1):
         """
         Inisialisasi WebcamCapture
         
         Args:
             camera_id (int): ID kamera (default: 0)
+            threaded (bool): Baca kamera terus-menerus di thread latar belakang
+                             sehingga get_frame selalu mengembalikan frame terbaru (default: False)
+            buffer_size (int): Jumlah frame terbaru yang disimpan di mode threaded (default: 1)
         """
         self.camera_id = camera_id
         self.cap = None
         self.is_running = False
+        
+        self.threaded = threaded
+        self._frames = deque(maxlen=max(1, buffer_size))
+        self._frame_ready = threading.Condition()
+        self._thread = None
+        self._next_id = 0
+        self._last_delivered_id = -1
+        self._started_at = None
+        
+        # Penghitung untuk memantau kesehatan kamera
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
     
     def start(self):
         """
@@ -33,6 +177,14 @@ class WebcamCapture:
                 raise Exception("Tidak dapat membuka webcam")
             
             self.is_running = True
+            self._started_at = time.monotonic()
+            
+            if self.threaded:
+                # Buffer internal OpenCV dikecilkan; pengurasan dilakukan oleh thread pembaca
+                self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                self._thread = threading.Thread(target=self._grab_loop, name="WebcamGrabber", daemon=True)
+                self._thread.start()
+            
             return True
         except Exception as e:
             print(f"Error saat memulai webcam: {str(e)}")
@@ -42,64 +194,245 @@ class WebcamCapture:
         """
         Menghentikan webcam
         """
+        self.is_running = False
+        
+        if self._thread is not None:
+            with self._frame_ready:
+                self._frame_ready.notify_all()
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        
         if self.cap is not None:
             self.cap.release()
-            self.is_running = False
+        
+        self._frames.clear()
+    
+    def _grab_loop(self):
+        """
+        Membaca kamera terus-menerus dan menyimpan frame terbaru (dijalankan di thread)
+        """
+        while self.is_running:
+            ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+            
+            if not ret:
+                self.read_failures += 1
+                metrics.count('webcam_read_failures')
+                time.sleep(0.01)
+                continue
+            
+            with self._frame_ready:
+                self._frames.append((frame, timestamp, self._next_id))
+                self._next_id += 1
+                self.frames_read += 1
+                self._frame_ready.notify_all()
+    
+    def _deliver(self, entry, with_info):
+        """
+        Mencatat frame yang diserahkan ke pemanggil dan menyusun hasilnya
+        """
+        frame, timestamp, frame_id = entry
+        
+        # Frame di antara penyerahan sebelumnya dan frame ini tidak pernah dipakai
+        if frame_id > self._last_delivered_id:
+            self.frames_dropped += max(0, frame_id - self._last_delivered_id - 1)
+            self._last_delivered_id = frame_id
+        
+        if not with_info:
+            return frame
+        
+        return frame, {
+            'timestamp': timestamp,
+            'age': time.monotonic() - timestamp,
+            'frame_id': frame_id,
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+        }
     
-    def get_frame(self):
+    def stats(self):
+        """
+        Mendapatkan statistik pembacaan kamera
+        
+        Returns:
+            dict: Jumlah frame terbaca, terbuang, gagal, dan laju frame rata-rata
+        """
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'read_failures': self.read_failures,
+            'fps': self.frames_read / elapsed if elapsed > 0 else 0.0,
+        }
+    
+    def get_recent_frames(self):
+        """
+        Mendapatkan semua frame yang masih ada di buffer mode threaded
+        
+        Returns:
+            list: Daftar (frame, timestamp) dari yang terlama ke terbaru
+        """
+        with self._frame_ready:
+            return [(frame, timestamp) for frame, timestamp, _ in self._frames]
+    
+    def get_frame(self, with_info=False, timeout=2.0, newer_than=None):
         """
         Mendapatkan frame dari webcam
         
+        Pada mode threaded, frame terbaru langsung dikembalikan tanpa menunggu
+        kamera; hanya frame pertama setelah start yang perlu ditunggu. Dengan
+        newer_than, pemanggil menunggu frame yang benar-benar baru sehingga
+        frame yang sama tidak diproses dua kali.
+        
+        Args:
+            with_info (bool): Kembalikan juga info timestamp dan penghitung (default: False)
+            timeout (float): Batas waktu menunggu frame dalam detik (default: 2.0)
+            newer_than (int, optional): frame_id terakhir yang sudah dipakai pemanggil
+            
         Returns:
-            numpy.ndarray: Frame gambar
+            numpy.ndarray: Frame gambar, atau tuple (frame, info) jika with_info=True
         """
         if not self.is_running:
             self.start()
         
+        if self.threaded:
+            last_id = -1 if newer_than is None else newer_than
+            
+            def ready():
+                return (self._frames and self._frames[-1][2] > last_id) or not self.is_running
+            
+            with self._frame_ready:
+                if not ready():
+                    self._frame_ready.wait_for(ready, timeout)
+                if not self._frames or self._frames[-1][2] <= last_id:
+                    raise Exception("Tidak dapat membaca frame dari webcam")
+                return self._deliver(self._frames[-1], with_info)
+        
         ret, frame = self.cap.read()
         if not ret:
             raise Exception("Tidak dapat membaca frame dari webcam")
         
+        self.frames_read += 1
+        entry = (frame, time.monotonic(), self._next_id)
+        self._next_id += 1
+        return self._deliver(entry, with_info)
+    
+    @staticmethod
+    def prepare_frame(frame, roi=None, grayscale=False):
+        """
+        Memotong dan mengkonversi frame di memori tanpa encode ke file
+        
+        Args:
+            frame (numpy.ndarray): Frame BGR dari webcam
+            roi (tuple, optional): Area (x, y, width, height) yang diambil
+            grayscale (bool): Konversi ke grayscale (default: False)
+            
+        Returns:
+            numpy.ndarray: Frame hasil potongan/konversi
+        """
+        if roi is not None:
+            x, y, w, h = (int(v) for v in roi)
+            height, width = frame.shape[:2]
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(width, x + w), min(height, y + h)
+            if x1 <= x0 or y1 <= y0:
+                raise ValueError(f"ROI di luar frame: {roi}")
+            frame = frame[y0:y1, x0:x1]
+        
+        if grayscale and frame.ndim == 3:
+            # cvtColor sekaligus menghasilkan array baru yang kontigu
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        return np.ascontiguousarray(frame)
+    
+    def capture_frame(self, roi=None, grayscale=False, save_path=None):
+        """
+        Mengambil satu frame webcam sebagai array di memori
+        
+        Frame mentah dapat langsung diberikan ke ImageProcessor dan OCREngine
+        tanpa kompresi JPEG. File hanya ditulis jika save_path diberikan.
+        
+        Args:
+            roi (tuple, optional): Area (x, y, width, height) yang diambil
+            grayscale (bool): Konversi ke grayscale (default: False)
+            save_path (str, optional): Path untuk menyimpan salinan frame
+            
+        Returns:
+            numpy.ndarray: Frame BGR atau grayscale
+        """
+        with metrics.span('webcam.capture'):
+            frame = self.prepare_frame(self.get_frame(), roi, grayscale)
+        metrics.count('webcam_frames_captured')
+        
+        if save_path is not None:
+            if not cv2.imwrite(save_path, frame):
+                raise Exception(f"Tidak dapat menyimpan gambar ke: {save_path}")
+        
         return frame
     
+    def capture_and_ocr(self, ocr_engine, lang='eng', config='', roi=None, grayscale=True,
+                        image_processor=None, steps=None, save_path=None):
+        """
+        Mengambil frame webcam dan langsung menjalankan OCR di memori
+        
+        Args:
+            ocr_engine (OCREngine): Instance OCREngine
+            lang (str): Kode bahasa untuk OCR (default: 'eng')
+            config (str): Konfigurasi tambahan untuk Tesseract
+            roi (tuple, optional): Area (x, y, width, height) yang diambil
+            grayscale (bool): Konversi ke grayscale sebelum OCR (default: True)
+            image_processor (ImageProcessor, optional): Untuk menerapkan steps sebelum OCR
+            steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+            save_path (str, optional): Path untuk menyimpan salinan frame
+            
+        Returns:
+            tuple: (teks hasil OCR, frame yang di-OCR)
+        """
+        frame = self.capture_frame(roi, grayscale, save_path)
+        
+        image = frame
+        if image_processor is not None and steps:
+            image = image_processor.apply_pipeline(image, steps)
+        
+        return ocr_engine.image_to_text(image, lang, config), image
+    
     def capture_image(self, output_path=None):
         """
         Mengambil gambar dari webcam dan menyimpannya
         
+        Untuk OCR langsung tanpa menulis file, gunakan capture_frame.
+        
         Args:
             output_path (str, optional): Path untuk menyimpan gambar.
-                                        Jika None, akan dibuat file sementara.
+                                        Jika None, akan dibuat file PNG sementara.
             
         Returns:
             str: Path ke file gambar yang disimpan
         """
-        if not self.is_running:
-            self.start()
-        
-        # Ambil frame
-        frame = self.get_frame()
-        
-        # Tentukan path output
+        # Tentukan path output (PNG agar tidak ada artefak kompresi)
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            with tempfile.NamedTemporaryFile(suffix=f'_{timestamp}.jpg', delete=False) as temp_file:
+            with tempfile.NamedTemporaryFile(suffix=f'_{timestamp}.png', delete=False) as temp_file:
                 output_path = temp_file.name
         
-        # Simpan gambar
-        cv2.imwrite(output_path, frame)
+        self.capture_frame(save_path=output_path)
         
         return output_path
     
-    def preview(self, window_name="Webcam Preview", process_func=None):
+    def preview(self, window_name="Webcam Preview", process_func=None, return_frame=False,
+                roi=None, grayscale=False):
         """
         Menampilkan preview webcam
         
         Args:
             window_name (str): Nama jendela preview
             process_func (callable, optional): Fungsi untuk memproses frame
+            return_frame (bool): Kembalikan frame di memori tanpa menyimpan file (default: False)
+            roi (tuple, optional): Area (x, y, width, height) yang diambil, ditandai di preview
+            grayscale (bool): Konversi frame yang diambil ke grayscale (default: False)
             
         Returns:
-            str: Path ke file gambar yang diambil, atau None jika dibatalkan
+            str: Path ke file gambar yang diambil, atau numpy.ndarray jika return_frame=True.
+                 None jika dibatalkan.
         """
         if not self.is_running:
             self.start()
@@ -107,12 +440,13 @@ class WebcamCapture:
         cv2.namedWindow(window_name)
         print("Tekan SPACE untuk mengambil gambar atau ESC untuk membatalkan")
         
-        captured_image_path = None
+        captured = None
         
         while True:
             # Ambil frame
-            ret, frame = self.cap.read()
-            if not ret:
+            try:
+                frame = self.get_frame()
+            except Exception:
                 break
             
             # Proses frame jika ada fungsi pemrosesan
@@ -121,6 +455,12 @@ class WebcamCapture:
             else:
                 display_frame = frame
             
+            if roi is not None:
+                x, y, w, h = (int(v) for v in roi)
+                if display_frame is frame:
+                    display_frame = frame.copy()
+                cv2.rectangle(display_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            
             # Tampilkan frame
             cv2.imshow(window_name, display_frame)
             
@@ -133,17 +473,133 @@ class WebcamCapture:
             
             # SPACE untuk mengambil gambar
             elif key == 32:
+                captured = self.prepare_frame(frame, roi, grayscale)
+                if return_frame:
+                    break
+                
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 output_dir = os.path.join(tempfile.gettempdir(), "webcam_capture")
                 os.makedirs(output_dir, exist_ok=True)
-                output_path = os.path.join(output_dir, f"capture_{timestamp}.jpg")
+                output_path = os.path.join(output_dir, f"capture_{timestamp}.png")
                 
-                cv2.imwrite(output_path, frame)
-                captured_image_path = output_path
+                cv2.imwrite(output_path, captured)
+                captured = output_path
                 print(f"Gambar disimpan ke: {output_path}")
                 break
         
         # Tutup jendela preview
         cv2.destroyWindow(window_name)
         
-        return captured_image_path
\ No newline at end of file
+        return captured
+    
+    def live_ocr(self, ocr_engine, lang='eng', config='', on_result=None, image_processor=None,
+                 steps=None, gate=None, window_name="Live OCR", show=True, max_seconds=None):
+        """
+        Menjalankan OCR terus-menerus pada frame webcam yang tajam dan stabil
+        
+        Frame hanya dikirim ke worker OCR latar belakang sekali per scene,
+        sehingga CPU tidak terpakai untuk frame yang bergerak atau tidak berubah.
+        Tekan ESC untuk berhenti.
+        
+        Args:
+            ocr_engine (OCREngine): Instance OCREngine
+            lang (str): Kode bahasa untuk OCR (default: 'eng')
+            config (str): Konfigurasi tambahan untuk Tesseract
+            on_result (callable, optional): Dipanggil dari thread worker dengan dict hasil
+                                            (text, timestamp, latency, sharpness)
+            image_processor (ImageProcessor, optional): Untuk menerapkan steps sebelum OCR
+            steps (list, optional): Langkah pipeline pemrosesan sebelum OCR
+            gate (FrameGate, optional): Pengaturan gating frame
+            window_name (str): Nama jendela preview
+            show (bool): Tampilkan preview dengan overlay hasil (default: True)
+            max_seconds (float, optional): Berhenti otomatis setelah durasi ini
+            
+        Returns:
+            list: Semua hasil OCR secara berurutan
+        """
+        if not self.is_running:
+            self.start()
+        
+        gate = gate or FrameGate()
+        jobs = queue.Queue(maxsize=1)
+        results = []
+        busy = threading.Event()
+        
+        def worker():
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                
+                frame, submitted_at, sharpness = job
+                try:
+                    image = frame
+                    if image_processor is not None and steps:
+                        image = image_processor.apply_pipeline(image, steps)
+                    text = ocr_engine.image_to_text(image, lang, config)
+                    result = {
+                        'text': text,
+                        'timestamp': submitted_at,
+                        'latency': time.monotonic() - submitted_at,
+                        'sharpness': sharpness,
+                    }
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+                except Exception as e:
+                    print(f"Error saat menjalankan live OCR: {str(e)}")
+                finally:
+                    busy.clear()
+        
+        thread = threading.Thread(target=worker, name="LiveOCRWorker", daemon=True)
+        thread.start()
+        
+        if show:
+            cv2.namedWindow(window_name)
+        started = time.monotonic()
+        frame_id = None
+        
+        try:
+            while max_seconds is None or time.monotonic() - started < max_seconds:
+                # Pada mode threaded, tunggu frame baru agar frame yang sama tidak
+                # dihitung berkali-kali sebagai frame stabil oleh FrameGate
+                timeout = 2.0 if max_seconds is None else max(0.0, min(2.0, started + max_seconds - time.monotonic()))
+                try:
+                    frame, info = self.get_frame(with_info=True, timeout=timeout, newer_than=frame_id)
+                except Exception:
+                    break
+                frame_id = info['frame_id']
+                
+                candidate, status = gate.update(frame, accept=not busy.is_set())
+                if candidate is not None:
+                    busy.set()
+                    jobs.put((candidate, time.monotonic(), status['sharpness']))
+                
+                if not show:
+                    continue
+                
+                # Overlay status gating dan beberapa baris hasil terakhir
+                display_frame = frame.copy()
+                label = f"{status['state']}  motion={status['motion']:.1f}"
+                if status['sharpness'] is not None:
+                    label += f"  sharp={status['sharpness']:.0f}"
+                cv2.putText(display_frame, label, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                
+                if results:
+                    lines = [line for line in results[-1]['text'].splitlines() if line.strip()][:8]
+                    for i, line in enumerate(lines):
+                        cv2.putText(display_frame, line[:60], (10, 55 + 22 * i),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 160, 0), 2)
+                
+                cv2.imshow(window_name, display_frame)
+                
+                # ESC untuk keluar
+                if cv2.waitKey(1) == 27:
+                    break
+        finally:
+            jobs.put(None)
+            thread.join()
+            if show:
+                cv2.destroyWindow(window_name)
+        
+        return results
\ No newline at end of file